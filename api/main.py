@@ -5,6 +5,7 @@ import pandas as pd
 import geopandas as gpd
 import json
 import os
+import sys
 
 app = FastAPI()
 
@@ -17,6 +18,50 @@ GEO_FILE = os.path.join(BASE_DIR, 'data', 'geo', 'vic_lgas_2026.json')
 # Database Initialization
 engine = create_engine(DATABASE_URL)
 
+# Simulation engine modules
+sys.path.insert(0, os.path.join(BASE_DIR, 'engine'))
+from state_model import VictoriaState
+from event_search import search_events
+from semantic_search import SemanticIndex
+from rolling_correlation import RollingCorrelationStore, STATS_PATH as ROLLING_STATS_PATH
+from lga_profiles import LGAProfileIndex, PROFILES_PATH
+
+victoria = VictoriaState()
+semantic_index = None  # Opened on first use (chromadb client / numpy index)
+
+# Rolling correlation statistics are maintained by ingest; reload when the file changes
+_rolling_cache = {"mtime": None, "store": None}
+
+def get_rolling_store():
+    if not os.path.exists(ROLLING_STATS_PATH):
+        raise HTTPException(status_code=404, detail="Rolling correlation statistics not built yet")
+    mtime = os.path.getmtime(ROLLING_STATS_PATH)
+    if _rolling_cache["mtime"] != mtime:
+        _rolling_cache["store"] = RollingCorrelationStore.load(ROLLING_STATS_PATH)
+        _rolling_cache["mtime"] = mtime
+    return _rolling_cache["store"]
+
+# LGA profile index is rebuilt by ingest; same reload-on-change policy
+_profile_cache = {"mtime": None, "index": None}
+
+def get_profile_index():
+    if not os.path.exists(PROFILES_PATH):
+        raise HTTPException(status_code=404, detail="LGA profile index not built yet")
+    mtime = os.path.getmtime(PROFILES_PATH)
+    if _profile_cache["mtime"] != mtime:
+        _profile_cache["index"] = LGAProfileIndex.load(PROFILES_PATH)
+        _profile_cache["mtime"] = mtime
+    return _profile_cache["index"]
+
+# Friction table is cached on `victoria`; refresh it when an ingest writes the database
+_friction_cache = {"mtime": None}
+
+def get_friction_table():
+    mtime = os.path.getmtime(DB_PATH) if os.path.exists(DB_PATH) else None
+    refresh = _friction_cache["mtime"] != mtime
+    _friction_cache["mtime"] = mtime
+    return victoria.get_friction_table(refresh=refresh)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -63,10 +108,12 @@ def get_state_stats(year: int):
             }
 
 @app.get("/api/v1/map/{year}/{metric_id}")
-def get_map_layer(year: int, metric_id: int):
+def get_map_layer(year: int, metric_id: int, include_lisa: bool = False):
     """
     Returns a GeoJSON FeatureCollection with 'metric_value' and 'normalized_score'.
     metric_id refers to category_id in temporal_stats.
+    include_lisa: adds precomputed 'lisa_cluster' (HH/LL/HL/LH/ns), 'lisa_i' and 'lisa_p' per LGA,
+                  and the layer's global Moran's I as 'spatial_autocorrelation'.
     """
     try:
         # 1. Load GeoJSON (Spatial Layer)
@@ -117,14 +164,131 @@ def get_map_layer(year: int, metric_id: int):
         # Handle NaN from join
         merged['normalized_score'] = merged['normalized_score'].fillna(0).clip(0, 1)
 
-        # 6. Convert to GeoJSON
+        # 6. Hotspots (precomputed at ingest by engine/spatial_autocorrelation.py)
+        moran = None
+        if include_lisa:
+            with engine.connect() as conn:
+                lisa = pd.read_sql(text("""
+                    SELECT lga_code, cluster AS lisa_cluster, local_i AS lisa_i, p_value AS lisa_p
+                    FROM lisa_clusters WHERE year = :y AND category_id = :c
+                """), conn, params={"y": year, "c": metric_id})
+                moran = conn.execute(text("""
+                    SELECT n, morans_i, expected_i, z_score, p_value
+                    FROM spatial_autocorrelation WHERE year = :y AND category_id = :c
+                """), {"y": year, "c": metric_id}).mappings().first()
+            merged = merged.merge(lisa.rename(columns={'lga_code': 'lisa_code'}),
+                                  left_on='LGA_CODE', right_on='lisa_code', how='left').drop(columns='lisa_code')
+            merged['lisa_cluster'] = merged['lisa_cluster'].fillna('ns')
+
+        # 7. Convert to GeoJSON
         # We need to return a Python dict that FastAPI can serialize
-        return json.loads(merged.to_json())
+        layer = json.loads(merged.to_json())
+        if include_lisa:
+            layer['spatial_autocorrelation'] = dict(moran) if moran else None
+        return layer
 
     except Exception as e:
         print(f"Error serving map: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/v1/friction/{year}")
+def get_friction_layer(year: int):
+    """
+    Commute stress for every LGA as a GeoJSON FeatureCollection, shaped like the metric map layer
+    ('metric_value' = stress score 0-100, 'normalized_score' = stress / 100) plus the friction breakdown.
+    """
+    try:
+        if not os.path.exists(GEO_FILE):
+             raise HTTPException(status_code=404, detail="GeoJSON file not found")
+
+        gdf = gpd.read_file(GEO_FILE)
+
+        # Batched for all LGAs/years and cached until the database changes
+        table = get_friction_table()
+        df_year = table.xs(year, level='year').reset_index() if year in table.index.get_level_values('year') else pd.DataFrame(columns=['lga_name'] + list(table.columns))
+
+        merged = gdf.merge(df_year, left_on='LGA_NAME', right_on='lga_name', how='left').drop(columns='lga_name')
+        merged['metric_value'] = merged['commute_stress_score'].fillna(0)
+        merged['normalized_score'] = (merged['metric_value'] / 100.0).clip(0, 1)
+
+        return json.loads(merged.to_json())
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error serving friction layer: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/v1/correlations/rolling")
+def get_rolling_correlation(source: int, target: int, window: int = 10, region: str = "State"):
+    """
+    Trailing-window correlation between two temporal_stats categories, one point per window end year.
+    region: 'State' or an LGA code.
+    """
+    store = get_rolling_store()
+    region_key = region if region == "State" else int(region) if region.isdigit() else region
+    if region_key not in store.regions:
+        raise HTTPException(status_code=404, detail=f"Unknown region '{region}'")
+    if source not in store.metrics or target not in store.metrics:
+        raise HTTPException(status_code=404, detail="Unknown metric id")
+    if window < 3:
+        raise HTTPException(status_code=400, detail="window must be at least 3 years")
+
+    series = store.rolling(source, target, window=window, region=region_key)
+    return {
+        "source": source,
+        "target": target,
+        "window": window,
+        "region": region,
+        "series": json.loads(series.to_json(orient="records")),
+    }
+
+@app.get("/api/v1/lga/similar")
+def similar_lgas(lga: str, year: int, k: int = 10, target_year: int = None):
+    """
+    Peer LGAs by indicator profile, e.g. lga=Wyndham&year=2010&target_year=2026 for councils that
+    look today like Wyndham did in 2010. lga: name or LGA code.
+    """
+    index = get_profile_index()
+    k = max(1, min(k, 100))
+    try:
+        hits = index.similar(lga, year, k=k, target_year=target_year)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    return {"lga": lga, "year": year, "target_year": target_year,
+            "results": json.loads(hits.to_json(orient="records"))}
+
+@app.get("/api/v1/events/search")
+def search_political_events(q: str, limit: int = 20, year_from: int = None, year_to: int = None):
+    """
+    Ranked full-text search over political event names, premiers and summaries.
+    Each word is matched as a prefix ('bush' finds 'bushfires'); all words must match.
+    """
+    limit = max(1, min(limit, 200))
+    try:
+        hits = search_events(q, limit=limit, year_from=year_from, year_to=year_to, engine=engine)
+    except Exception as e:
+        print(f"Error searching events: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"query": q, "results": json.loads(hits.to_json(orient="records"))}
+
+@app.get("/api/v1/events/similar")
+def similar_political_events(q: str, k: int = 10, source: str = None):
+    """
+    Semantic neighbours of free text, e.g. 'abolishing payroll tax' -> historical precedents.
+    Index is maintained by the politics ingest; this endpoint only embeds the query.
+    """
+    global semantic_index
+    k = max(1, min(k, 100))
+    try:
+        if semantic_index is None:
+            semantic_index = SemanticIndex(engine=engine)
+        hits = semantic_index.similar(q, k=k, source=source)
+    except Exception as e:
+        print(f"Error in semantic search: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"query": q, "results": json.loads(hits.to_json(orient="records"))}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,209 @@
+import pandas as pd
+import numpy as np
+from sqlalchemy import text
+from concurrent.futures import ProcessPoolExecutor
+import tempfile
+import os
+
+from policy_simulation import SimulationEngine, INDICATORS
+from correlation_engine import load_temporal_cube, STATE_REGION
+
+# Configuration
+BASE_DIR = os.getcwd()
+CACHE_DIR = os.path.join(BASE_DIR, 'data', 'processed')
+
+# --- Observed History per Simulation Indicator ---
+# ("temporal_stats", category_id) uses the statewide series; (table, column) reads an annual table.
+OBSERVED_SERIES = {
+    1: ("temporal_stats", 1),                  # CPI
+    9: ("state_budget", "total_revenue"),      # State tax revenue ~ total state revenue
+    11: ("temporal_stats", 11),                # ALP primary vote
+    38: ("temporal_stats", 34),                # Gini coefficient
+    41: ("temporal_stats", 41),                # PM2.5
+}
+
+# Recorded political events enter as an immediate shock: % change per impact_score point
+EVENT_SHOCK_LOADINGS = {5: 1.0}   # Business confidence moves ~1% per point of event impact
+
+DEFAULT_HORIZON = 5
+DEFAULT_CHUNK = 8
+
+# --- Worker State (shared memory-mapped panel, one graph per process) ---
+_PANEL = None
+_GRAPH = None
+
+def _init_worker(path, shape, graph):
+    global _PANEL, _GRAPH
+    _PANEL = np.memmap(path, dtype=np.float64, mode='r', shape=shape)
+    _GRAPH = graph
+
+def _forecast_chunk(origin_pos, event_shocks, horizon):
+    """
+    Forecasts for a batch of origins against the shared panel (year, indicator).
+    Origin o: base = level in o-1, shock = observed % move into o (as a step) + event shocks in o.
+    Returns forecast, actual and persistence levels, each (B, horizon + 1, N).
+    """
+    panel = _PANEL
+    n_years = panel.shape[0]
+    base = panel[origin_pos - 1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        move = np.where(base != 0, (panel[origin_pos] / base - 1.0) * 100.0, np.nan)
+    shocks = np.nan_to_num(move) + event_shocks
+
+    deviation = _GRAPH.propagate(shocks, horizon)
+    forecast = base[:, None, :] * (1.0 + deviation / 100.0)
+
+    # Actuals past the end of the record stay NaN (partial windows score fewer horizons)
+    steps = origin_pos[:, None] + np.arange(horizon + 1)[None, :]
+    actual = np.full(forecast.shape, np.nan)
+    inside = steps < n_years
+    actual[inside] = panel[steps[inside]]
+    persistence = np.broadcast_to(panel[origin_pos][:, None, :], forecast.shape).copy()
+    return forecast, actual, persistence
+
+def _run_chunk(args):
+    return _forecast_chunk(*args)
+
+class Backtest:
+    """
+    Rolling-origin backtest of SimulationEngine's interaction graph against the recorded history.
+    """
+    def __init__(self, sim: SimulationEngine = None, horizon: int = DEFAULT_HORIZON):
+        self.sim = sim or SimulationEngine()
+        self.engine = self.sim.engine
+        self.graph = self.sim.graph
+        self.horizon = horizon
+        self.years, self.panel = self.load_panel()
+        self.event_shocks = self.load_event_shocks()
+
+    def load_panel(self):
+        """(year, indicator) levels in graph order; NaN where an indicator has no history."""
+        ids = self.graph.indicator_ids
+        columns = {}
+
+        temporal = load_temporal_cube(self.engine)
+        if temporal is not None:
+            state = temporal['cube'][temporal['regions'].index(STATE_REGION)]
+            cats = list(temporal['metrics'])
+            for mid, (table, field) in OBSERVED_SERIES.items():
+                if table == 'temporal_stats' and field in cats:
+                    columns[mid] = pd.Series(state[:, cats.index(field)], index=temporal['years'])
+
+        for mid, (table, field) in OBSERVED_SERIES.items():
+            if table != 'temporal_stats':
+                df = pd.read_sql(text(f"SELECT year, {field} FROM {table}"), self.engine)
+                columns[mid] = df.set_index('year')[field].astype(float)
+
+        frame = pd.DataFrame(columns)
+        years = np.arange(frame.index.min(), frame.index.max() + 1) if len(frame) else np.empty(0, dtype=int)
+        frame = frame.reindex(index=years, columns=ids)
+        return years, frame.to_numpy(dtype=float)
+
+    def load_event_shocks(self):
+        """(year, indicator) immediate shocks from political_events in each year."""
+        events = pd.read_sql(text("SELECT year, SUM(impact_score) AS impact FROM political_events GROUP BY year"), self.engine)
+        impact = events.set_index('year')['impact'].reindex(self.years).fillna(0).to_numpy(dtype=float)
+        loadings = self.graph.vector({mid: w for mid, w in EVENT_SHOCK_LOADINGS.items() if mid in self.graph.index})
+        return impact[:, None] * loadings[None, :]
+
+    def origins(self):
+        """Every year with a previous year on record and at least one year to score."""
+        return self.years[1:-1]
+
+    def run(self, origins=None, workers: int = 0, chunk: int = DEFAULT_CHUNK):
+        """
+        Replays each origin window. workers > 0 spreads chunks of origins over a process pool that
+        shares one memory-mapped copy of the panel; workers = 0 runs in-process.
+        Returns dict with 'origins', 'indicator_ids' and forecast/actual/persistence arrays (O, H+1, N).
+        """
+        origins = np.asarray(self.origins() if origins is None else origins, dtype=np.int64)
+        pos = np.searchsorted(self.years, origins)
+        batches = [pos[i:i + chunk] for i in range(0, len(pos), chunk)]
+        jobs = [(b, self.event_shocks[b], self.horizon) for b in batches]
+
+        handle = tempfile.NamedTemporaryFile(dir=CACHE_DIR, prefix='backtest_panel_', suffix='.f8', delete=False)
+        handle.close()
+        try:
+            mm = np.memmap(handle.name, dtype=np.float64, mode='w+', shape=self.panel.shape)
+            mm[:] = self.panel
+            mm.flush()
+            del mm
+
+            init = (handle.name, self.panel.shape, self.graph)
+            if workers:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init) as pool:
+                    parts = list(pool.map(_run_chunk, jobs))
+            else:
+                _init_worker(*init)
+                parts = [_run_chunk(job) for job in jobs]
+        finally:
+            os.remove(handle.name)
+
+        if not parts:
+            empty = np.empty((0, self.horizon + 1, len(self.graph.indicator_ids)))
+            parts = [(empty, empty, empty)]
+        forecast, actual, persistence = (np.concatenate(p) for p in zip(*parts))
+        return {
+            "origins": origins,
+            "indicator_ids": list(self.graph.indicator_ids),
+            "forecast": forecast,
+            "actual": actual,
+            "persistence": persistence,
+        }
+
+    def metrics(self, result):
+        """
+        Error metrics per indicator x horizon (h >= 1), for the model and the persistence baseline.
+        Errors are in % of the origin's base level so indicators are comparable; MAPE is vs the actual.
+        skill = 1 - MAE / persistence MAE (positive = beats 'no change').
+        """
+        pos = np.searchsorted(self.years, result['origins'])
+        base = self.panel[pos - 1][:, None, :]
+        actual = result['actual']
+        rows = []
+        scored = {}
+        for label, pred in (("model", result['forecast']), ("persistence", result['persistence'])):
+            with np.errstate(invalid='ignore', divide='ignore'):
+                err = (pred - actual) / np.abs(base) * 100.0
+                ape = np.abs(pred - actual) / np.abs(actual) * 100.0
+            valid = ~np.isnan(err)
+            n = valid.sum(axis=0)
+            e = np.where(valid, err, 0.0)
+            ape_ok = valid & np.isfinite(ape)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                scored[label] = {
+                    "n": n,
+                    "mae": np.abs(e).sum(axis=0) / n,
+                    "rmse": np.sqrt((e ** 2).sum(axis=0) / n),
+                    "mape": np.where(ape_ok, ape, 0.0).sum(axis=0) / ape_ok.sum(axis=0),
+                    "bias": e.sum(axis=0) / n,
+                }
+
+        model, naive = scored["model"], scored["persistence"]
+        for h in range(1, actual.shape[1]):
+            for j, mid in enumerate(result['indicator_ids']):
+                if not model["n"][h, j]:
+                    continue
+                rows.append({
+                    "indicator": INDICATORS.get(mid, str(mid)),
+                    "horizon": h,
+                    "n": int(model["n"][h, j]),
+                    "mae": model["mae"][h, j],
+                    "rmse": model["rmse"][h, j],
+                    "mape": model["mape"][h, j],
+                    "bias": model["bias"][h, j],
+                    "persistence_mae": naive["mae"][h, j],
+                    "skill": 1.0 - model["mae"][h, j] / naive["mae"][h, j] if naive["mae"][h, j] > 0 else np.nan,
+                })
+        return pd.DataFrame(rows)
+
+if __name__ == "__main__":
+    import time
+
+    bt = Backtest()
+    t0 = time.perf_counter()
+    res = bt.run(workers=min(4, os.cpu_count() or 1))
+    elapsed = time.perf_counter() - t0
+    print(f"--- Backtest: {len(res['origins'])} origins x {bt.horizon}-yr horizon ({elapsed:.2f}s) ---")
+    with pd.option_context('display.width', 140):
+        print(bt.metrics(res).round(2).to_string(index=False))
@@ -0,0 +1,246 @@
+import pandas as pd
+import numpy as np
+from sqlalchemy import create_engine, text
+from datetime import datetime
+import os
+
+from correlation_engine import load_temporal_cube, near_constant, STATE_REGION
+from interaction_graph import EDGES_PATH, DEFAULT_MAX_LAG, MANUAL_VERSION, InteractionGraph, load_interaction_graph
+from regional_simulation import BASELINE_CATEGORIES
+
+# Configuration
+BASE_DIR = os.getcwd()
+DB_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'victoria_sim.db')
+DATABASE_URL = f"sqlite:///{DB_PATH}"
+
+# --- Estimator Settings ---
+# Ridge penalty on standardised regressors, per observation (scale-free across panel sizes)
+DEFAULT_RIDGE = 0.05
+# Fitted elasticities smaller than this are dropped from the graph
+MIN_COEFFICIENT = 0.05
+# Growth rates and level deviations off near-zero bases (e.g. EV density's first years) are winsorised to +/- this %
+GROWTH_CLIP = 100.0
+# Regressors whose spread is below this share of the median regressor spread are left out: dividing a
+# standardised coefficient by a near-zero sd (e.g. a smooth deterministic trend) turns noise into huge elasticities
+MIN_RELATIVE_SD = 0.1
+
+def _regional(temporal):
+    cube = temporal['cube']
+    if STATE_REGION in temporal['regions']:
+        # Statewide rows are an aggregate of the LGAs; pooling them would double-count
+        keep = [i for i, r in enumerate(temporal['regions']) if r != STATE_REGION]
+        cube = cube[keep] if keep else cube
+    # Near-constant series carry no signal, only rounding noise
+    return np.where(near_constant(cube)[:, None, :], np.nan, cube)
+
+def growth_panel(temporal, demean: bool = True):
+    """
+    Year-on-year % changes of every (region, metric) series, shape (R, T-1, M).
+    demean: subtract each series' mean growth (region fixed effects), so pooling
+    LGAs doesn't read shared trend levels as cross-effects.
+    """
+    cube = _regional(temporal)
+    prev, curr = cube[:, :-1], cube[:, 1:]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        growth = np.where(prev != 0, (curr / prev - 1.0) * 100.0, np.nan)
+    growth[~np.isfinite(growth)] = np.nan
+    growth = np.clip(growth, -GROWTH_CLIP, GROWTH_CLIP)
+    if demean:
+        with np.errstate(invalid='ignore'):
+            growth = growth - np.nanmean(growth, axis=1, keepdims=True)
+    return growth
+
+def level_panel(temporal):
+    """
+    % deviation of every (region, metric) level from its own log-linear trend, shape (R, T, M).
+    This is the simulator's notion of a deviation from baseline; non-positive values are gaps.
+    """
+    cube = _regional(temporal)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        logs = np.where(cube > 0, np.log(cube), np.nan)
+    observed = ~np.isnan(logs)
+    t = np.arange(cube.shape[1], dtype=float)[None, :, None]
+    n = observed.sum(axis=1, keepdims=True)
+    y = np.where(observed, logs, 0.0)
+    tt = np.where(observed, t, 0.0)
+    st, sy = tt.sum(axis=1, keepdims=True), y.sum(axis=1, keepdims=True)
+    stt, sty = (tt * tt).sum(axis=1, keepdims=True), (tt * y).sum(axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        denom = n * stt - st * st
+        slope = np.where(denom > 0, (n * sty - st * sy) / denom, 0.0)
+        intercept = (sy - slope * st) / n
+    deviation = 100.0 * (logs - intercept - slope * t)
+    deviation[(n < 3).repeat(cube.shape[1], axis=1)] = np.nan
+    return np.clip(deviation, -GROWTH_CLIP, GROWTH_CLIP)
+
+def lagged_design(regressors, targets, max_lag: int):
+    """
+    Stacks (region, year) rows. X holds every regressor metric at lags 0..max_lag (column = lag * M + metric),
+    Y the contemporaneous targets. regressors and targets are (R, T, M) on the same year grid.
+    """
+    n_reg, n_t, n_met = targets.shape
+    rows = n_t - max_lag
+    X = np.concatenate([regressors[:, max_lag - k:max_lag - k + rows, :] for k in range(max_lag + 1)], axis=2)
+    Y = targets[:, max_lag:, :]
+    return X.reshape(n_reg * rows, -1), Y.reshape(n_reg * rows, n_met)
+
+def fit_distributed_lags(temporal, max_lag: int = DEFAULT_MAX_LAG, ridge: float = DEFAULT_RIDGE):
+    """
+    Ridge distributed-lag regression of every metric's (demeaned) growth on every metric's level
+    deviation from trend at lags 0..max_lag, solved for all targets in one batched linear solve.
+
+    This is the form InteractionGraph.propagate uses: an edge with coefficient c and lag k moves the
+    target by c % in every year per 1 % the source stood off baseline k years earlier, because the
+    persistent deviation re-fires each year. Regressing growth on lagged growth would instead estimate a
+    one-off level response, which the simulator would then repeat every year.
+
+    Regressors are standardised and gaps mean-imputed; target rows with a gap are dropped, with targets
+    sharing a gap pattern sharing one Gram matrix. A target's own terms are excluded at every lag, so cross
+    coefficients are not conditional on persistence terms the exported graph leaves out; so are regressors
+    with less than MIN_RELATIVE_SD of the median regressor spread.
+    Returns dict with 'coef' (target, lag, source) in % per year per % deviation, 'r2' and 'n' per target,
+    plus metric labels.
+    """
+    growth = growth_panel(temporal)
+    X, Y = lagged_design(level_panel(temporal)[:, 1:], growth, max_lag)
+    n_met = Y.shape[1]
+    n_feat = X.shape[1]
+
+    mu = np.nanmean(X, axis=0)
+    sd = np.nanstd(X, axis=0)
+    usable = np.isfinite(sd) & (sd > 0)
+    if usable.any():
+        usable &= sd > MIN_RELATIVE_SD * np.median(sd[usable])
+    sd = np.where(usable, sd, 1.0)
+    Z = np.where(np.isnan(X), 0.0, (X - np.nan_to_num(mu)) / sd)
+    Z[:, ~usable] = 0.0
+
+    observed = ~np.isnan(Y)
+    Yz = np.where(observed, Y, 0.0)
+    patterns, group = np.unique(observed.T, axis=0, return_inverse=True)
+    group = group.ravel()
+
+    gram = np.empty((n_met, n_feat, n_feat))
+    rhs = np.empty((n_met, n_feat))
+    n_obs = observed.sum(axis=0)
+    for g, mask in enumerate(patterns):
+        members = np.flatnonzero(group == g)
+        Zg = Z[mask]
+        gram[members] = Zg.T @ Zg
+        rhs[members] = (Zg.T @ Yz[mask][:, members]).T
+
+    # Penalty scales with sample size; unusable/own-metric columns are pinned to zero
+    eye = np.eye(n_feat)
+    gram += ridge * np.maximum(n_obs, 1)[:, None, None] * eye
+    blocked = np.zeros((n_met, n_feat), dtype=bool)
+    blocked[:, ~usable] = True
+    own = np.arange(n_met)
+    for lag in range(max_lag + 1):
+        blocked[own, lag * n_met + own] = True  # column lag * M + metric == target
+    b_idx, f_idx = np.nonzero(blocked)
+    gram[b_idx, f_idx, :] = 0.0
+    gram[b_idx, :, f_idx] = 0.0
+    gram[b_idx, f_idx, f_idx] = 1.0
+    rhs[blocked] = 0.0
+
+    beta = np.linalg.solve(gram, rhs[..., None])[..., 0]
+    beta[n_obs == 0] = 0.0
+
+    resid = np.where(observed, Yz - Z @ beta.T, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        total = ((np.where(observed, Y, 0.0) ** 2).sum(axis=0))
+        r2 = 1.0 - (resid ** 2).sum(axis=0) / total
+
+    coef = (beta / sd[None, :]).reshape(n_met, max_lag + 1, n_met)
+    return {
+        "coef": coef,
+        "r2": r2,
+        "n": n_obs,
+        "metrics": np.asarray(temporal['metrics']),
+        "metric_names": list(temporal['metric_names']),
+        "max_lag": max_lag,
+        "ridge": ridge,
+    }
+
+def fitted_edges(fit, min_coef: float = MIN_COEFFICIENT):
+    """
+    Long (source_id, target_id, coefficient, lag_years) in temporal_stats category IDs. Own lags are
+    never fitted, so there are no self edges.
+    """
+    coef = fit['coef']
+    tgt, lag, src = np.nonzero(np.abs(coef) >= min_coef)
+    edges = pd.DataFrame({
+        "source_id": fit['metrics'][src],
+        "target_id": fit['metrics'][tgt],
+        "coefficient": coef[tgt, lag, src].round(4),
+        "lag_years": lag,
+    })
+    return edges.reset_index(drop=True)
+
+def to_simulation_edges(edges, base_graph: InteractionGraph, categories: dict = BASELINE_CATEGORIES):
+    """
+    Maps fitted category edges onto simulation indicator IDs (categories: {indicator: category}).
+    Edges between two observable indicators come from the fit; every base edge touching an
+    indicator without history is carried over unchanged.
+    """
+    to_indicator = {cat: mid for mid, cat in categories.items() if mid in base_graph.index}
+    fitted = edges[edges['source_id'].isin(to_indicator) & edges['target_id'].isin(to_indicator)].copy()
+    fitted['source_id'] = fitted['source_id'].map(to_indicator)
+    fitted['target_id'] = fitted['target_id'].map(to_indicator)
+    fitted['note'] = 'fitted'
+
+    observable = set(to_indicator.values())
+    base = base_graph.edges.copy()
+    carried = base[~(base['source_id'].isin(observable) & base['target_id'].isin(observable))].copy()
+    carried['note'] = f"carried from {base_graph.version or MANUAL_VERSION}"
+    return pd.concat([fitted, carried], ignore_index=True)
+
+def store_edge_version(edges, engine=None, version: str = None):
+    """Appends a graph version to interaction_edges and returns its name."""
+    engine = engine or create_engine(DATABASE_URL)
+    version = version or f"fit-{datetime.now():%Y%m%d-%H%M%S}"
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM interaction_edges WHERE version = :v"), {"v": version})
+    edges.assign(version=version)[['version', 'source_id', 'target_id', 'coefficient', 'lag_years', 'note']] \
+        .to_sql('interaction_edges', engine, if_exists='append', index=False)
+    return version
+
+def fit_interaction_graph(indicator_ids, engine=None, max_lag: int = DEFAULT_MAX_LAG, ridge: float = DEFAULT_RIDGE,
+                          min_coef: float = MIN_COEFFICIENT, version: str = None, path: str = EDGES_PATH):
+    """Fits, maps onto the simulation ontology and stores a new graph version. Returns (version, fit)."""
+    engine = engine or create_engine(DATABASE_URL)
+    temporal = load_temporal_cube(engine)
+    if temporal is None:
+        raise ValueError("temporal_stats is empty; nothing to fit")
+    fit = fit_distributed_lags(temporal, max_lag, ridge)
+    base = load_interaction_graph(indicator_ids, engine=engine, path=path, max_lag=max_lag)
+    edges = to_simulation_edges(fitted_edges(fit, min_coef), base)
+    # Validate against the ontology before anything is written
+    InteractionGraph(indicator_ids, edges, max_lag)
+    return store_edge_version(edges, engine, version), fit
+
+if __name__ == "__main__":
+    import time
+    from policy_simulation import INDICATORS, SimulationEngine
+
+    # Timing on a synthetic 50-metric x 80-LGA x 51-year panel
+    rng = np.random.default_rng(0)
+    synthetic = {
+        "cube": 100 * np.exp(np.cumsum(rng.normal(0.02, 0.05, (80, 51, 50)), axis=1)),
+        "regions": list(range(80)), "metrics": np.arange(50), "metric_names": [str(i) for i in range(50)],
+    }
+    t0 = time.perf_counter()
+    fit_distributed_lags(synthetic, max_lag=5)
+    print(f"--- Synthetic 50 metrics x 5 lags x 80 LGAs fitted in {time.perf_counter() - t0:.2f}s ---")
+
+    version, fit = fit_interaction_graph(list(INDICATORS))
+    edges = fitted_edges(fit)
+    print(f"\n--- Fitted {len(edges)} category edges; stored graph version '{version}' ---")
+    names = dict(zip(fit['metrics'], fit['metric_names']))
+    top = edges.reindex(edges['coefficient'].abs().sort_values(ascending=False).index).head(10)
+    print(top.assign(source=top['source_id'].map(names), target=top['target_id'].map(names)).to_string(index=False))
+
+    sim = SimulationEngine(version=version)
+    _, deltas = sim.run_scenario({9: -15.0, 5: 20.0})
+    print(f"\n2030 deviations with '{version}':")
+    print({INDICATORS[mid]: round(v, 2) for mid, v in deltas[2030].items()})
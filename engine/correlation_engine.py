@@ -1,8 +1,11 @@
 import pandas as pd
 import numpy as np
-from sqlalchemy import create_engine, text
+from scipy.special import stdtr
+from sqlalchemy import create_engine, inspect, text
 import os
 
+from master_annual import load_master_annual, refresh_master_annual
+
 # Configuration
 BASE_DIR = os.getcwd()
 DB_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'victoria_sim.db')
@@ -10,42 +13,9 @@ REPORT_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'correlation_findings.
 DATABASE_URL = f"sqlite:///{DB_PATH}"
 
 def load_data():
+    """Political events, the only raw table the engine reads directly (the rest comes via master_annual)."""
     engine = create_engine(DATABASE_URL)
-    
-    # Load Tables
-    econ_df = pd.read_sql("SELECT * FROM economic_indicators ORDER BY year", engine)
-    politics_df = pd.read_sql("SELECT * FROM political_events ORDER BY year", engine)
-    lga_df = pd.read_sql("SELECT * FROM lga_stats ORDER BY year", engine)
-    
-    return econ_df, politics_df, lga_df
-
-def process_data(econ_df, politics_df, lga_df):
-    # 1. Interpolate Economic Data to get annual resolution (1980-2024)
-    # create a full range of years
-    min_year = econ_df['year'].min()
-    max_year = econ_df['year'].max()
-    all_years = pd.DataFrame({'year': range(min_year, max_year + 1)})
-    
-    econ_annual = pd.merge(all_years, econ_df, on='year', how='left')
-    econ_annual = econ_annual.interpolate(method='linear')
-    
-    # 2. Aggregate Political Impact by Year
-    poly_agg = politics_df.groupby('year')['impact_score'].sum().reset_index()
-    poly_agg.rename(columns={'impact_score': 'total_political_impact'}, inplace=True)
-    
-    # 3. Aggregate LGA Prices by Year (Mean)
-    # Note: LGA data is very sparse (2020, 2024 only likely)
-    lga_agg = lga_df.groupby('year')['median_house_price'].mean().reset_index()
-    lga_agg.rename(columns={'median_house_price': 'avg_house_price'}, inplace=True)
-    
-    # 4. Merge All
-    master_df = pd.merge(econ_annual, poly_agg, on='year', how='left')
-    master_df = pd.merge(master_df, lga_agg, on='year', how='left')
-    
-    # Fill NaN for years with no events with 0 impact
-    master_df['total_political_impact'] = master_df['total_political_impact'].fillna(0)
-    
-    return master_df
+    return pd.read_sql("SELECT * FROM political_events ORDER BY year", engine)
 
 def calculate_correlations(df):
     # Select columns
@@ -53,7 +23,280 @@ def calculate_correlations(df):
     corr_matrix = df[cols].corr()
     return corr_matrix
 
-def get_event_ripple(event_query, politics_df, master_df):
+# --- All-Pairs Lagged Correlation (temporal_stats cube) ---
+STATE_REGION = 'State'
+# Spread below this fraction of a series' magnitude is rounding noise, not variation
+# (e.g. the year-on-year changes of a straight-line series)
+CONSTANT_TOL = 1e-9
+
+def load_temporal_cube(engine=None, min_year: int = None):
+    """
+    Pivots temporal_stats into a (region, year, metric) array.
+    Regions are LGA codes plus 'State' (statewide rows, or the LGA mean when none are stored).
+    min_year: only read years >= min_year (incremental consumers).
+    Returns dict with 'cube', 'regions', 'years', 'metrics' (category_ids) and 'metric_names',
+    or None when there are no rows.
+    """
+    engine = engine or create_engine(DATABASE_URL)
+    query = "SELECT year, lga_code, category_id, metric_name, value FROM temporal_stats"
+    params = {}
+    if min_year is not None:
+        query += " WHERE year >= :y"
+        params["y"] = int(min_year)
+    df = pd.read_sql(text(query), engine, params=params)
+    if df.empty:
+        return None
+
+    years = np.arange(df['year'].min(), df['year'].max() + 1)
+    metrics = np.sort(df['category_id'].unique())
+    names = df.drop_duplicates('category_id').set_index('category_id')['metric_name'].reindex(metrics)
+
+    local = df[df['lga_code'].notna()]
+    statewide = df[df['lga_code'].isna()]
+    if statewide.empty:
+        statewide = local.groupby(['year', 'category_id'], as_index=False)['value'].mean()
+
+    grid = local.pivot_table(index=['lga_code', 'year'], columns='category_id', values='value', aggfunc='mean')
+    regions = [int(c) for c in grid.index.get_level_values('lga_code').unique()]
+    grid = grid.reindex(pd.MultiIndex.from_product([regions, years], names=['lga_code', 'year']), columns=metrics)
+    cube = grid.to_numpy(dtype=float).reshape(len(regions), len(years), len(metrics))
+
+    state = statewide.pivot_table(index='year', columns='category_id', values='value', aggfunc='mean')
+    state = state.reindex(index=years, columns=metrics).to_numpy(dtype=float)
+
+    return {
+        "cube": np.concatenate([cube, state[None]], axis=0),
+        "regions": regions + [STATE_REGION],
+        "years": years,
+        "metrics": metrics,
+        "metric_names": names.fillna('').tolist(),
+    }
+
+def near_constant(cube, scale=None):
+    """
+    (R, M) mask of series in a (R, T, M) cube whose spread over time is within CONSTANT_TOL of
+    `scale` (default: the series' own mean magnitude). All-missing series count as constant.
+    """
+    observed = ~np.isnan(cube)
+    count = np.maximum(observed.sum(axis=1), 1)
+    x = np.where(observed, cube, 0.0)
+    mean = x.sum(axis=1) / count
+    spread = np.sqrt((np.where(observed, cube - mean[:, None, :], 0.0) ** 2).sum(axis=1) / count)
+    if scale is None:
+        scale = np.abs(x).sum(axis=1) / count
+    return ~(spread > CONSTANT_TOL * scale)
+
+def _masked_corr(a, b):
+    """
+    Pairwise-complete Pearson r between every column of a and every column of b, per region.
+    a, b: (R, T, M) with NaN gaps. Returns r, n as (R, M, M), using only batched matrix products.
+    """
+    ma, mb = ~np.isnan(a), ~np.isnan(b)
+    xa, xb = np.where(ma, a, 0.0), np.where(mb, b, 0.0)
+    ma, mb = ma.astype(float), mb.astype(float)
+    ta = lambda m: m.transpose(0, 2, 1)
+
+    n = ta(ma) @ mb
+    sx, sy = ta(xa) @ mb, ta(ma) @ xb
+    sxx, syy = ta(xa * xa) @ mb, ta(ma) @ (xb * xb)
+    sxy = ta(xa) @ xb
+
+    cov = n * sxy - sx * sy
+    vx, vy = n * sxx - sx ** 2, n * syy - sy ** 2
+    # Relative to the raw sums, so cancellation noise doesn't pass for variance
+    ok = (vx > CONSTANT_TOL * n * sxx) & (vy > CONSTANT_TOL * n * syy) & (n >= 3)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r = np.where(ok, cov / np.sqrt(np.maximum(vx * vy, 1e-300)), np.nan)
+    return np.clip(r, -1.0, 1.0), n
+
+def lagged_correlations(temporal, max_lag: int = 5, differenced: bool = True):
+    """
+    Correlates every metric against every other for lags -max_lag..+max_lag, per region.
+    Lag k > 0 means the source leads: corr(source[t], target[t + k]).
+    differenced: correlate year-on-year changes, so shared trends don't read as relationships.
+    Returns dict with 'r', 'n', 'p_value' shaped (region, lag, source, target), 'lags' and
+    'near_constant' (region, metric): series left out because they don't vary beyond rounding.
+    """
+    cube = temporal['cube']
+    level = near_constant(cube)
+    if differenced:
+        # Changes are judged against the size of the series itself: a straight line's
+        # year-on-year changes are constant up to ~1e-15 of its level
+        magnitude = np.abs(np.nan_to_num(cube)).sum(axis=1) / np.maximum((~np.isnan(cube)).sum(axis=1), 1)
+        cube = np.diff(cube, axis=1)
+        constant = level | near_constant(cube, magnitude)
+    else:
+        constant = level
+    cube = np.where(constant[:, None, :], np.nan, cube)
+    # Centre each series so the sums of squares stay well conditioned (masked series stay all-NaN)
+    count = np.maximum((~np.isnan(cube)).sum(axis=1, keepdims=True), 1)
+    cube = cube - np.nansum(cube, axis=1, keepdims=True) / count
+
+    n_reg, n_years, n_met = cube.shape
+    lags = np.arange(-max_lag, max_lag + 1)
+    r = np.full((n_reg, len(lags), n_met, n_met), np.nan)
+    n = np.zeros((n_reg, len(lags), n_met, n_met))
+
+    for k in range(0, min(max_lag, n_years - 3) + 1):
+        rk, nk = _masked_corr(cube[:, :n_years - k, :], cube[:, k:, :])
+        r[:, max_lag + k], n[:, max_lag + k] = rk, nk
+        # corr(s[t], g[t - k]) = corr(g[t], s[t + k])
+        r[:, max_lag - k], n[:, max_lag - k] = rk.transpose(0, 2, 1), nk.transpose(0, 2, 1)
+
+    # Two-sided t-test on r with n - 2 degrees of freedom
+    with np.errstate(invalid='ignore', divide='ignore'):
+        dof = np.maximum(n - 2, 1)
+        t = r * np.sqrt(dof / np.maximum(1 - r ** 2, 1e-12))
+        p = 2 * stdtr(dof, -np.abs(t))
+    p[n < 3] = np.nan
+
+    return {"r": r, "n": n, "p_value": p, "lags": lags, "near_constant": constant}
+
+def strongest_lagged_relationships(temporal, result, top: int = 20, min_n: int = 10, alpha: float = 0.05,
+                                   include_self: bool = False):
+    """
+    Ranks (region, source, target, lag) by |r|. p_adjusted is Bonferroni across all tests run.
+    Each relationship is listed once, with the leading metric as source (lag >= 0).
+    """
+    r, n, p = result['r'], result['n'], result['p_value']
+    n_met = r.shape[-1]
+    lags = result['lags'][None, :, None, None]
+    src_idx = np.arange(n_met)[None, None, :, None]
+    tgt_idx = np.arange(n_met)[None, None, None, :]
+
+    # (s -> g, -k) mirrors (g -> s, +k); keep lag > 0, and one ordering at lag 0
+    valid = (n >= min_n) & ~np.isnan(r) & ((lags > 0) | ((lags == 0) & (src_idx < tgt_idx)))
+    if 'near_constant' in result:
+        constant = result['near_constant']
+        valid &= ~constant[:, None, :, None] & ~constant[:, None, None, :]
+    if not include_self:
+        valid &= src_idx != tgt_idx
+
+    tests = valid.sum()
+    idx = np.flatnonzero(valid)
+    order = idx[np.argsort(-np.abs(r.ravel()[idx]))][:top]
+    reg, lag, src, tgt = np.unravel_index(order, r.shape)
+
+    names = temporal['metric_names']
+    out = pd.DataFrame({
+        "region": [temporal['regions'][i] for i in reg],
+        "source": [names[i] or str(temporal['metrics'][i]) for i in src],
+        "target": [names[i] or str(temporal['metrics'][i]) for i in tgt],
+        "lag": result['lags'][lag],
+        "r": r.ravel()[order].round(3),
+        "n": n.ravel()[order].astype(int),
+        "p_value": p.ravel()[order],
+    })
+    out['p_adjusted'] = np.minimum(out['p_value'] * max(tests, 1), 1.0)
+    out['significant'] = out['p_adjusted'] < alpha
+    return out
+
+# --- Event Study (every political event at once) ---
+# Window: the year before the event -> two years after (clamped to the last year on record)
+EVENT_PRE_OFFSET = -1
+EVENT_POST_OFFSET = 2
+# master_df columns that are not outcomes
+EVENT_EXCLUDE_COLUMNS = {'year', 'total_political_impact'}
+
+def _event_windows(event_years, years, pre_offset: int = EVENT_PRE_OFFSET, post_offset: int = EVENT_POST_OFFSET):
+    """
+    Row positions of each event's window on a sorted year axis.
+    pre must exist exactly; post is the last row at or before event_year + post_offset.
+    Returns (pre_pos, post_pos, valid).
+    """
+    years = np.asarray(years, dtype=np.int64)
+    event_years = np.asarray(event_years, dtype=np.int64)
+    pre_year = event_years + pre_offset
+    pre_pos = np.minimum(np.searchsorted(years, pre_year), len(years) - 1)
+    post_pos = np.searchsorted(years, event_years + post_offset, side='right') - 1
+    valid = (years[pre_pos] == pre_year) & (post_pos >= pre_pos)
+    return pre_pos, np.maximum(post_pos, 0), valid
+
+def _gather_windows(event_ids, event_years, years, values, regions, metrics,
+                    pre_offset: int = EVENT_PRE_OFFSET, post_offset: int = EVENT_POST_OFFSET):
+    """values: (region, year, metric). Returns long rows for every event x region x metric with data."""
+    pre_pos, post_pos, valid = _event_windows(event_years, years, pre_offset, post_offset)
+    e = np.flatnonzero(valid)
+    pre = values[:, pre_pos[e], :]
+    post = values[:, post_pos[e], :]
+    delta = post - pre
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pct = np.where(pre != 0, delta / pre * 100.0, np.nan)
+
+    keep = np.flatnonzero(~np.isnan(pre) & ~np.isnan(post))
+    ri, ei, mi = np.unravel_index(keep, pre.shape)
+    years = np.asarray(years)
+    return pd.DataFrame({
+        "event_id": np.asarray(event_ids)[e][ei],
+        "event_year": np.asarray(event_years)[e][ei],
+        "lga_code": pd.array(np.asarray(regions, dtype=object)[ri], dtype='Int64'),
+        "metric": np.asarray(metrics, dtype=object)[mi],
+        "pre_year": years[pre_pos[e]][ei],
+        "post_year": years[post_pos[e]][ei],
+        "pre_value": pre.ravel()[keep],
+        "post_value": post.ravel()[keep],
+        "delta": delta.ravel()[keep],
+        "pct_change": pct.ravel()[keep],
+    })
+
+def event_study(politics_df, master_df, temporal=None,
+                pre_offset: int = EVENT_PRE_OFFSET, post_offset: int = EVENT_POST_OFFSET):
+    """
+    Pre/post deltas for every political event across every statewide master_df column and,
+    when a temporal cube is given, every region x metric of temporal_stats.
+    One indexed gather per source; no per-event Python work.
+    Returns long rows matching the event_impacts table (lga_code NA = statewide).
+    """
+    ids, years = politics_df['id'].to_numpy(), politics_df['year'].to_numpy()
+
+    master = master_df.sort_values('year')
+    cols = [c for c in master.select_dtypes('number').columns if c not in EVENT_EXCLUDE_COLUMNS]
+    frames = [_gather_windows(ids, years, master['year'].to_numpy(), master[cols].to_numpy(dtype=float)[None],
+                              [None], cols, pre_offset, post_offset)]
+
+    if temporal is not None:
+        regions = [None if r == STATE_REGION else r for r in temporal['regions']]
+        names = [n or str(m) for n, m in zip(temporal['metric_names'], temporal['metrics'])]
+        frames.append(_gather_windows(ids, years, temporal['years'], temporal['cube'],
+                                      regions, names, pre_offset, post_offset))
+    return pd.concat(frames, ignore_index=True)
+
+def store_event_impacts(impacts, engine=None):
+    """Replaces the event_impacts table with a fresh event_study() result."""
+    engine = engine or create_engine(DATABASE_URL)
+    if inspect(engine).has_table('event_impacts'):
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM event_impacts"))
+    impacts.to_sql('event_impacts', engine, if_exists='append', index=False)
+
+def aggregate_event_impacts(engine=None, metric: str = None, lga_code: int = None):
+    """
+    Average response by metric and event direction, straight from event_impacts,
+    e.g. aggregate_event_impacts(metric='gsp_billions') for the mean GSP response to negative-impact events.
+    lga_code: None = statewide rows.
+    """
+    engine = engine or create_engine(DATABASE_URL)
+    clauses = ["i.lga_code IS NULL" if lga_code is None else "i.lga_code = :lga"]
+    if metric is not None:
+        clauses.append("i.metric = :metric")
+    query = text(f"""
+        SELECT i.metric,
+               CASE WHEN p.impact_score < 0 THEN 'negative'
+                    WHEN p.impact_score > 0 THEN 'positive' ELSE 'neutral' END AS impact_sign,
+               COUNT(*) AS events,
+               AVG(i.delta) AS mean_delta,
+               AVG(i.pct_change) AS mean_pct_change,
+               MIN(i.pct_change) AS min_pct_change,
+               MAX(i.pct_change) AS max_pct_change
+        FROM event_impacts i
+        JOIN political_events p ON p.id = i.event_id
+        WHERE {' AND '.join(clauses)}
+        GROUP BY i.metric, impact_sign
+        ORDER BY i.metric, impact_sign
+    """)
+    return pd.read_sql(query, engine, params={"lga": lga_code, "metric": metric})
+
+def get_event_ripple(event_query, politics_df, master_df, impacts=None):
     # Find Event
     event = politics_df[politics_df['event_name'].str.contains(event_query, case=False, na=False)]
     if event.empty:
@@ -63,44 +306,27 @@ def get_event_ripple(event_query, politics_df, master_df):
     year = event_row['year']
     name = event_row['event_name']
     
-    # Define Window: Year-1 to Year+2
-    start_year = year - 1
-    end_year = year + 2
-    
-    window = master_df[(master_df['year'] >= start_year) & (master_df['year'] <= end_year)].copy()
-    
-    if window.empty:
+    # Window: Year-1 to Year+2 (or the last year available), from the batch event study
+    start_year, end_year = year - 1, year + 2
+    if not master_df['year'].between(start_year, end_year).any():
         return f"No data available for event window {start_year}-{end_year}"
-
-    # Calculate Deltas (Year+2 vs Year-1)
-    # Handle missing data gracefully
-    try:
-        t_start = window[window['year'] == start_year].iloc[0]
-    except IndexError:
-        t_start = None
-        
-    try:
-        t_end = window[window['year'] == end_year].iloc[0]
-        # If End Year not reached (e.g. future), use max available
-        if t_end.empty:
-             t_end = window.iloc[-1]
-    except IndexError:
-        t_end = window.iloc[-1] if not window.empty else None
+    if impacts is None:
+        impacts = event_study(event.iloc[:1], master_df)
+    rows = impacts[(impacts['event_id'] == event_row['id']) & impacts['lga_code'].isna()].set_index('metric')
         
     summary = f"\n--- Impact Analysis: {name} ({year}) ---\n"
-    if t_start is not None and t_end is not None:
-        gsp_delta = ((t_end['gsp_billions'] - t_start['gsp_billions']) / t_start['gsp_billions']) * 100
-        unemp_delta = t_end['unemployment_rate'] - t_start['unemployment_rate']
+    if {'gsp_billions', 'unemployment_rate'} <= set(rows.index):
+        gsp = rows.loc['gsp_billions']
+        unemp_delta = rows.loc['unemployment_rate', 'delta']
         
         # House Price Check
-        if pd.notna(t_start['avg_house_price']) and pd.notna(t_end['avg_house_price']):
-            price_delta = ((t_end['avg_house_price'] - t_start['avg_house_price']) / t_start['avg_house_price']) * 100
-            price_str = f"{price_delta:+.1f}%"
+        if 'avg_house_price' in rows.index and pd.notna(rows.loc['avg_house_price', 'pct_change']):
+            price_str = f"{rows.loc['avg_house_price', 'pct_change']:+.1f}%"
         else:
             price_str = "Data N/A"
 
-        summary += f"Window: {int(t_start['year'])} -> {int(t_end['year'])}\n"
-        summary += f"GSP Growth: {gsp_delta:+.1f}%\n"
+        summary += f"Window: {int(gsp['pre_year'])} -> {int(gsp['post_year'])}\n"
+        summary += f"GSP Growth: {gsp['pct_change']:+.1f}%\n"
         summary += f"Unemployment Shift: {unemp_delta:+.1f} pts\n"
         summary += f"Regional House Price Shift: {price_str}\n"
         summary += f"Event Impact Score: {event_row['impact_score']}\n"
@@ -137,9 +363,12 @@ def generate_report(corr_matrix, findings_path):
 def run_engine():
     print("--- Initializing Correlation Engine ---")
     
-    # Load & Process
-    econ, poly, lga = load_data()
-    master = process_data(econ, poly, lga)
+    # Load the materialised annual view (built on first run, refreshed by ingest afterwards)
+    poly = load_data()
+    master = load_master_annual()
+    if master is None:
+        refresh_master_annual()
+        master = load_master_annual()
     
     # Analysis
     corr = calculate_correlations(master)
@@ -149,9 +378,21 @@ def run_engine():
     # Reports
     generate_report(corr, REPORT_PATH)
     
+    # Lagged all-pairs scan over temporal_stats
+    temporal = load_temporal_cube()
+    lagged = lagged_correlations(temporal, max_lag=5)
+    print("\n[Strongest Lagged Relationships (YoY changes, -5..+5 yrs)]")
+    print(strongest_lagged_relationships(temporal, lagged, top=10).to_string(index=False))
+    
+    # Event study: every political event x metric x region, stored for aggregate queries
+    impacts = event_study(poly, master, temporal)
+    store_event_impacts(impacts)
+    print(f"\n[Event Study] {len(impacts)} event impacts stored")
+    print(aggregate_event_impacts(metric='gsp_billions').to_string(index=False))
+    
     # Verifications
-    print(get_event_ripple("Kennett", poly, master))
-    print(get_event_ripple("COVID", poly, master))
+    print(get_event_ripple("Kennett", poly, master, impacts))
+    print(get_event_ripple("COVID", poly, master, impacts))
 
 if __name__ == "__main__":
     run_engine()
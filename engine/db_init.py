@@ -1,5 +1,5 @@
 import os
-from sqlalchemy import create_engine, Column, Integer, String, Float, Text, Boolean
+from sqlalchemy import create_engine, Column, Integer, String, Float, Text, Boolean, LargeBinary, Index
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 # Define database path
@@ -110,6 +110,16 @@ class ElectionResults(Base):
     seat_count = Column(Integer)
     opposition_leader = Column(String)
 
+class ElectoralDistricts(Base):
+    __tablename__ = 'electoral_districts'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    district_name = Column(String)
+    region = Column(String)      # Legislative Council region
+    lga_name = Column(String)    # LGA holding most of the district's electors
+    held_by = Column(String)     # ALP / LIB / NAT / GRN / IND
+    alp_tpp = Column(Float)      # ALP two-party-preferred % vs Coalition at the last election
+    margin = Column(Float)
+
 class MacroAdjusters(Base):
     __tablename__ = 'macro_adjusters'
     year = Column(Integer, primary_key=True)
@@ -160,6 +170,106 @@ class TemporalStats(Base):
     value = Column(Float)
     is_interpolated = Column(Boolean)
 
+class GapFillState(Base):
+    __tablename__ = 'gap_fill_state'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    lga_code = Column(Integer)  # NULL = statewide series
+    category_id = Column(Integer)
+    method = Column(String)
+    input_hash = Column(String)   # SHA-1 of the observed values the fill was computed from
+    output_hash = Column(String)  # SHA-1 of the fills written back
+
+class BoundaryCrosswalk(Base):
+    __tablename__ = 'boundary_crosswalk'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    source_key = Column(String, index=True)  # SHA-256 prefix of the historical boundary file
+    target_key = Column(String, index=True)  # SHA-256 prefix of the modern boundary file
+    old_lga = Column(String)
+    modern_lga = Column(String)
+    weight = Column(Float)
+
+# --- Simulation Graph ---
+class InteractionEdges(Base):
+    __tablename__ = 'interaction_edges'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    version = Column(String, default='manual')
+    source_id = Column(Integer)
+    target_id = Column(Integer)
+    coefficient = Column(Float)
+    lag_years = Column(Integer)
+    note = Column(Text)
+
+# --- Materialised Annual View (engine/master_annual.py) ---
+class MasterAnnual(Base):
+    __tablename__ = 'master_annual'
+    __table_args__ = (Index('ix_master_annual_year_metric', 'year', 'metric', unique=True),)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    year = Column(Integer)
+    metric = Column(String)
+    value = Column(Float)
+    source = Column(String)          # Table the value was derived from
+    is_interpolated = Column(Boolean)
+
+class EventImpacts(Base):
+    __tablename__ = 'event_impacts'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_id = Column(Integer, index=True)  # political_events.id
+    event_year = Column(Integer)
+    lga_code = Column(Integer)  # NULL = statewide
+    metric = Column(String, index=True)
+    pre_year = Column(Integer)
+    post_year = Column(Integer)
+    pre_value = Column(Float)
+    post_value = Column(Float)
+    delta = Column(Float)
+    pct_change = Column(Float)
+
+# --- LGA Indicator Profiles (engine/lga_profiles.py) ---
+class LgaClusters(Base):
+    __tablename__ = 'lga_clusters'
+    __table_args__ = (Index('ix_lga_clusters_code_year', 'lga_code', 'year', unique=True),)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    lga_code = Column(Integer)
+    lga_name = Column(String)
+    year = Column(Integer)
+    kmeans_cluster = Column(Integer)
+    ward_cluster = Column(Integer)
+
+# --- Spatial Autocorrelation (engine/spatial_autocorrelation.py) ---
+class SpatialAutocorrelation(Base):
+    __tablename__ = 'spatial_autocorrelation'
+    __table_args__ = (Index('ix_spatial_autocorrelation_metric_year', 'category_id', 'year', unique=True),)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    category_id = Column(Integer)
+    metric_name = Column(String)
+    year = Column(Integer)
+    n = Column(Integer)           # LGAs with a value and geometry
+    morans_i = Column(Float)
+    expected_i = Column(Float)    # -1 / (n - 1) under no autocorrelation
+    z_score = Column(Float)       # Against the permutation distribution
+    p_value = Column(Float)       # Pseudo p-value from permutations
+
+class LisaClusters(Base):
+    __tablename__ = 'lisa_clusters'
+    __table_args__ = (Index('ix_lisa_clusters_metric_year', 'category_id', 'year'),)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    lga_code = Column(Integer)
+    category_id = Column(Integer)
+    year = Column(Integer)
+    local_i = Column(Float)
+    quadrant = Column(String)     # HH / LH / LL / HL: own value vs neighbours, relative to the mean
+    p_value = Column(Float)
+    cluster = Column(String)      # Quadrant when significant, else 'ns'
+
+# --- Semantic Search ---
+class EmbeddingCache(Base):
+    __tablename__ = 'embedding_cache'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    model = Column(String, index=True)      # Embedding function name; vectors never mix across models
+    text_hash = Column(String, index=True)  # SHA-256 of the embedded text
+    dim = Column(Integer)
+    vector = Column(LargeBinary)            # float32 bytes
+
 def init_db():
     print(f"Update: Creating/Refreshing database tables at {DB_PATH}...")
     engine = create_engine(DATABASE_URL)
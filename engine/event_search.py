@@ -0,0 +1,102 @@
+import pandas as pd
+from sqlalchemy import create_engine, inspect, text
+import os
+import re
+
+# Configuration
+BASE_DIR = os.getcwd()
+DB_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'victoria_sim.db')
+DATABASE_URL = f"sqlite:///{DB_PATH}"
+
+# --- FTS5 index over political_events ---
+# External-content table: the text lives in political_events, the index stores tokens only.
+# Triggers keep it in step with row-level inserts/updates/deletes.
+FTS_TABLE = 'political_events_fts'
+FTS_COLUMNS = ('event_name', 'premier', 'summary')
+# bm25 column weights (event_name, premier, summary): title hits outrank passing mentions
+BM25_WEIGHTS = (10.0, 5.0, 1.0)
+
+FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        event_name, premier, summary,
+        content='political_events', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS political_events_fts_ai AFTER INSERT ON political_events BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, event_name, premier, summary)
+        VALUES (new.id, new.event_name, new.premier, new.summary);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS political_events_fts_ad AFTER DELETE ON political_events BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, event_name, premier, summary)
+        VALUES ('delete', old.id, old.event_name, old.premier, old.summary);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS political_events_fts_au AFTER UPDATE ON political_events BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, event_name, premier, summary)
+        VALUES ('delete', old.id, old.event_name, old.premier, old.summary);
+        INSERT INTO {FTS_TABLE}(rowid, event_name, premier, summary)
+        VALUES (new.id, new.event_name, new.premier, new.summary);
+    END""",
+]
+
+def ensure_event_index(engine=None, rebuild: bool = False):
+    """
+    Creates the FTS table and sync triggers if missing. rebuild=True re-reads every row from
+    political_events (used by bulk ingest, and on first creation over an existing table).
+    """
+    engine = engine or create_engine(DATABASE_URL)
+    created = not inspect(engine).has_table(FTS_TABLE)
+    with engine.begin() as conn:
+        for ddl in FTS_DDL:
+            conn.execute(text(ddl))
+        if rebuild or created:
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+def to_match_query(query: str):
+    """
+    User text -> safe FTS5 MATCH expression: every word becomes a quoted prefix term (AND-ed),
+    so operators and punctuation in the input can't break the query syntax.
+    Returns None when the text has no searchable words.
+    """
+    tokens = re.findall(r"\w+", query or "")
+    if not tokens:
+        return None
+    return " ".join(f'"{t}"*' for t in tokens)
+
+def search_events(query: str, limit: int = 20, year_from: int = None, year_to: int = None, engine=None):
+    """
+    Ranked matches over event_name, premier and summary (best first; lower bm25 = better).
+    Returns a DataFrame with the event columns, 'rank' and a highlighted 'snippet' of the summary.
+    """
+    engine = engine or create_engine(DATABASE_URL)
+    match = to_match_query(query)
+    if match is None:
+        return pd.DataFrame(columns=['id', 'year', 'event_name', 'premier', 'impact_score', 'summary', 'rank', 'snippet'])
+    if not inspect(engine).has_table(FTS_TABLE):
+        ensure_event_index(engine)
+
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+    clauses = [f"{FTS_TABLE} MATCH :q"]
+    params = {"q": match, "limit": int(limit)}
+    if year_from is not None:
+        clauses.append("p.year >= :y0")
+        params["y0"] = int(year_from)
+    if year_to is not None:
+        clauses.append("p.year <= :y1")
+        params["y1"] = int(year_to)
+
+    sql = text(f"""
+        SELECT p.id, p.year, p.event_name, p.premier, p.impact_score, p.summary,
+               bm25({FTS_TABLE}, {weights}) AS rank,
+               snippet({FTS_TABLE}, 2, '[', ']', '...', 12) AS snippet
+        FROM {FTS_TABLE}
+        JOIN political_events p ON p.id = {FTS_TABLE}.rowid
+        WHERE {' AND '.join(clauses)}
+        ORDER BY rank
+        LIMIT :limit
+    """)
+    return pd.read_sql(sql, engine, params=params)
+
+if __name__ == "__main__":
+    ensure_event_index(rebuild=True)
+    for q in ["Kennett", "bushfire", "gas supply", "covid lockdown"]:
+        print(f"\n--- '{q}' ---")
+        print(search_events(q, limit=5)[['year', 'event_name', 'rank', 'snippet']].to_string(index=False))
@@ -0,0 +1,237 @@
+import pandas as pd
+import numpy as np
+from sqlalchemy import text
+import os
+
+from policy_simulation import SimulationEngine
+
+# Configuration
+BASE_DIR = os.getcwd()
+DB_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'victoria_sim.db')
+DATABASE_URL = f"sqlite:///{DB_PATH}"
+
+# --- Ledger Layout ---
+# detailed_spending shares (% of expenditure); whatever they don't cover is 'other'
+PORTFOLIOS = {
+    "health": "health_spend_pct",
+    "education": "education_spend_pct",
+    "police_justice": "police_justice_spend_pct",
+    "infrastructure": "infrastructure_spend_pct",
+}
+OTHER_PORTFOLIO = "other"
+
+# --- Coupling to the Interaction Graph ---
+REVENUE_ID = 9      # State Tax Revenue deviation scales revenue
+HEADCOUNT_ID = 19   # Public Service Headcount deviation scales the wage bill...
+# ...of the portfolios where salaries dominate (share of spend that is wages)
+WAGE_SHARE = {"health": 0.6, "education": 0.65, "police_justice": 0.7, "other": 0.35}
+# Graph deviation (%) -> ledger deviation (%): elasticity, and the most the ledger line can move towards
+# it in a year (percentage points). A public service can't shed 60% of its staff in a year, so the wage
+# bill follows headcount at a capped pace until it gets there.
+LEDGER_COUPLING = {
+    REVENUE_ID: {"elasticity": 1.0, "yearly_band": 20.0},
+    HEADCOUNT_ID: {"elasticity": 1.0, "yearly_band": 3.0},
+}
+
+# --- Uncertainty ---
+HISTORY_YEARS = 10        # Growth rates / volatilities come from the last decade of the ledger
+RATE_STEP_SD = 0.35       # Yearly random-walk step of the average interest rate (percentage points)
+MAX_CONSOLIDATION = 0.15  # A deficit cap can cut program spending by at most this share in a year
+
+DEFAULT_DRAWS = 2000
+
+def growth_stats(series):
+    """
+    (centre, spread) of yearly growth: median and MAD-based sd, so one-off
+    steps in the ledger (e.g. a new spending program) don't read as volatility.
+    """
+    growth = series.pct_change().dropna().to_numpy(dtype=float)
+    if not len(growth):
+        return 0.0, 0.0
+    centre = float(np.median(growth))
+    return centre, float(1.4826 * np.median(np.abs(growth - centre)))
+
+class FiscalModel:
+    """
+    Year-by-year state ledger (revenue, portfolio spending, interest, deficit, debt) for
+    (scenario x draw) arrays at once. Scenario policy shocks run through the interaction graph
+    first; revenue follows the tax-revenue path and wage bills follow the headcount path, each
+    through LEDGER_COUPLING.
+    """
+    def __init__(self, sim: SimulationEngine = None):
+        self.sim = sim or SimulationEngine()
+        self.engine = self.sim.engine
+        self.graph = self.sim.graph
+        self.load_ledger()
+
+    def load_ledger(self):
+        with self.engine.connect() as conn:
+            budget = pd.read_sql(text("SELECT * FROM state_budget ORDER BY year"), conn).set_index('year')
+            spending = pd.read_sql(text("SELECT * FROM detailed_spending ORDER BY year"), conn).set_index('year')
+            econ = pd.read_sql(text("SELECT year, gsp_billions, state_debt_billions FROM economic_indicators ORDER BY year"),
+                               conn).set_index('year')
+            macro = pd.read_sql(text("SELECT year, interest_rate_average FROM macro_adjusters ORDER BY year"), conn).set_index('year')
+        if budget.empty:
+            raise ValueError("state_budget is empty; nothing to project from")
+
+        self.base_year = int(budget.index.max())
+        recent = budget.loc[self.base_year - HISTORY_YEARS:]
+        self.revenue_growth = growth_stats(recent['total_revenue'])
+        self.cost_growth = growth_stats(recent['total_expenditure'])
+
+        econ = econ.loc[:self.base_year].dropna()
+        macro = macro.loc[:self.base_year].dropna()
+        self.debt0 = float(econ['state_debt_billions'].iloc[-1])
+        self.gsp0 = float(econ['gsp_billions'].iloc[-1])
+        self.gsp_growth = growth_stats(econ['gsp_billions'].loc[self.base_year - HISTORY_YEARS:])[0]
+        self.rate0 = float(macro['interest_rate_average'].iloc[-1])
+
+        # Base-year ledger: expenditure includes interest on last year's debt; the rest is program spend
+        row = budget.loc[self.base_year]
+        self.revenue0 = float(row['total_revenue'])
+        prev_debt = econ['state_debt_billions'].shift(1).iloc[-1]
+        interest0 = float(prev_debt) * self.rate0 / 100.0 if pd.notna(prev_debt) else 0.0
+        program0 = float(row['total_expenditure']) - interest0
+
+        shares = spending.loc[:self.base_year].iloc[-1] if not spending.empty else pd.Series(dtype=float)
+        pct = np.array([float(shares.get(col, 0.0)) for col in PORTFOLIOS.values()])
+        pct = np.append(pct, max(100.0 - pct.sum(), 0.0))
+        self.portfolios = list(PORTFOLIOS) + [OTHER_PORTFOLIO]
+        self.program0 = program0 * pct / pct.sum()
+
+    # --- Projection ---
+    def ledger_deviation(self, path, mid: int):
+        """
+        (scenario, year) fractional ledger deviation from the graph's % path for indicator `mid`:
+        the elasticity-scaled target, followed at most `yearly_band` points per year, so the ledger
+        lags a large jump but catches up with it.
+        """
+        coupling = LEDGER_COUPLING[mid]
+        target = coupling['elasticity'] * path[:, :, self.graph.index[mid]]
+        band = coupling['yearly_band']
+        out = np.empty_like(target)
+        level = np.zeros(len(target))
+        for t in range(target.shape[1]):
+            level = level + np.clip(target[:, t] - level, -band, band)
+            out[:, t] = level
+        return out / 100.0
+
+    def run(self, scenarios: dict, end_year: int = 2030, draws: int = DEFAULT_DRAWS, seed: int = None):
+        """
+        scenarios: {name: {'policy': {ID: % shock} for the graph,
+                           'spending': {portfolio: % change to program spend},
+                           'deficit_cap': max deficit in $bn (None = uncapped)}}
+        All scenarios share the same random draws, so differences between them are policy, not noise.
+        Returns dict of (scenario, draw, year) arrays (portfolio spend adds a trailing axis) plus labels.
+        """
+        names = list(scenarios)
+        years = list(range(self.base_year + 1, end_year + 1))
+        n_s, n_t = len(names), len(years)
+        rng = np.random.default_rng(seed)
+
+        # Graph paths for every scenario in one batch, aligned to the projection years
+        shocks = np.stack([self.graph.vector(cfg.get('policy', {})) for cfg in scenarios.values()])
+        path = self.graph.propagate(shocks, n_t - 1)                      # (scenario, year, indicator)
+        rev_dev = self.ledger_deviation(path, REVENUE_ID)
+        head_dev = self.ledger_deviation(path, HEADCOUNT_ID)
+        # Same-year (lag-0) feedback can't turn a revenue cut into a first-year revenue gain, or vice versa
+        direct = shocks[:, self.graph.index[REVENUE_ID]] / 100.0
+        rev_dev[:, 0] = np.where(direct < 0, np.minimum(rev_dev[:, 0], 0.0),
+                                 np.where(direct > 0, np.maximum(rev_dev[:, 0], 0.0), rev_dev[:, 0]))
+
+        # Shared draws: nominal growth paths and an interest-rate random walk, (draw, year)
+        rev_index = np.cumprod(1 + rng.normal(*self.revenue_growth, size=(draws, n_t)), axis=1)
+        cost_index = np.cumprod(1 + rng.normal(*self.cost_growth, size=(draws, n_t)), axis=1)
+        rate = np.maximum(self.rate0 + np.cumsum(rng.normal(0, RATE_STEP_SD, size=(draws, n_t)), axis=1), 0.0)
+        gsp = self.gsp0 * (1 + self.gsp_growth) ** np.arange(1, n_t + 1)
+
+        revenue = self.revenue0 * rev_index[None] * (1 + rev_dev[:, None, :])
+        measures = np.array([[cfg.get('spending', {}).get(p, 0.0) for p in self.portfolios]
+                             for cfg in scenarios.values()]) / 100.0
+        wage = np.array([WAGE_SHARE.get(p, 0.0) for p in self.portfolios])
+        # (scenario, draw, year, portfolio)
+        program = (self.program0 * (1 + measures)[:, None, None, :]
+                   * cost_index[None, :, :, None]
+                   * (1 + head_dev[:, None, :, None] * wage))
+
+        caps = np.array([np.inf if cfg.get('deficit_cap') is None else cfg['deficit_cap']
+                         for cfg in scenarios.values()])[:, None]
+        interest = np.empty((n_s, draws, n_t))
+        deficit = np.empty_like(interest)
+        debt = np.empty_like(interest)
+        consolidation = np.zeros_like(interest)
+        prev = np.full((n_s, draws), self.debt0)
+        level = np.ones((n_s, draws))   # Cumulative effect of past consolidations (cuts are permanent)
+        for t in range(n_t):
+            program[:, :, t] *= level[..., None]
+            interest[:, :, t] = prev * rate[None, :, t] / 100.0
+            spend = program[:, :, t].sum(axis=2)
+            gap = spend + interest[:, :, t] - revenue[:, :, t]
+            # Deficit cap: trim program spending pro rata, up to MAX_CONSOLIDATION of it
+            cut = np.clip((gap - caps) / spend, 0.0, MAX_CONSOLIDATION)
+            program[:, :, t] *= (1 - cut)[..., None]
+            level *= 1 - cut
+            consolidation[:, :, t] = cut * spend
+            deficit[:, :, t] = gap - cut * spend
+            prev = prev + deficit[:, :, t]
+            debt[:, :, t] = prev
+
+        return {
+            "scenarios": names,
+            "years": years,
+            "portfolios": list(self.portfolios),
+            "revenue": revenue,
+            "program": program,
+            "interest": interest,
+            "deficit": deficit,
+            "debt": debt,
+            "debt_to_gsp": debt / gsp * 100.0,
+            "consolidation": consolidation,
+            "graph_path": path,
+        }
+
+    def summarise(self, result, quantiles=(0.05, 0.5, 0.95)):
+        """Per scenario x year: mean revenue/spend/deficit/debt and quantiles of deficit and debt."""
+        rows = []
+        spend = result['program'].sum(axis=3)
+        dq = np.quantile(result['deficit'], quantiles, axis=1)
+        bq = np.quantile(result['debt'], quantiles, axis=1)
+        for s, name in enumerate(result['scenarios']):
+            for t, year in enumerate(result['years']):
+                row = {
+                    "scenario": name,
+                    "year": year,
+                    "revenue": result['revenue'][s, :, t].mean(),
+                    "program_spend": spend[s, :, t].mean(),
+                    "interest": result['interest'][s, :, t].mean(),
+                    "deficit": result['deficit'][s, :, t].mean(),
+                    "debt": result['debt'][s, :, t].mean(),
+                    "debt_to_gsp": result['debt_to_gsp'][s, :, t].mean(),
+                    "consolidation": result['consolidation'][s, :, t].mean(),
+                }
+                for q, dv, bv in zip(quantiles, dq, bq):
+                    row[f"deficit_p{int(q * 100)}"] = dv[s, t]
+                    row[f"debt_p{int(q * 100)}"] = bv[s, t]
+                rows.append(row)
+        return pd.DataFrame(rows)
+
+if __name__ == "__main__":
+    import time
+
+    fiscal = FiscalModel()
+    scenarios = {
+        "status_quo": {},
+        "abolish_payroll_tax": {"policy": {9: -15.0, 5: 20.0}},
+        "status_quo_capped": {"deficit_cap": 10.0},
+        "health_boost": {"spending": {"health": 5.0}},
+    }
+
+    t0 = time.perf_counter()
+    res = fiscal.run(scenarios, draws=10_000, seed=2026)
+    elapsed = time.perf_counter() - t0
+    print(f"--- Fiscal Ledger: {len(scenarios)} scenarios x 10,000 draws x {len(res['years'])} years "
+          f"({elapsed:.2f}s), base {fiscal.base_year}: revenue ${fiscal.revenue0:.1f}bn, debt ${fiscal.debt0:.1f}bn ---")
+    summary = fiscal.summarise(res)
+    final = summary[summary['year'] == res['years'][-1]]
+    with pd.option_context('display.width', 160):
+        print(final.round(1).to_string(index=False))
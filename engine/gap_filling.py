@@ -0,0 +1,182 @@
+import pandas as pd
+import numpy as np
+from scipy.interpolate import PchipInterpolator
+from sqlalchemy import create_engine, inspect, text
+import hashlib
+import os
+
+# Configuration
+BASE_DIR = os.getcwd()
+DB_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'victoria_sim.db')
+DATABASE_URL = f"sqlite:///{DB_PATH}"
+
+METHODS = ("linear", "pchip", "seasonal")
+# Census cycle: seasonal fills interpolate between the same phase of neighbouring cycles
+SEASONAL_PERIOD = 5
+
+# --- Fill Kernels: (series, year) arrays with NaN gaps; only interior gaps are filled ---
+def linear_fill(cube, years):
+    """Straight line between the previous and next observation, via running prev/next index arrays."""
+    n_series, n_years = cube.shape
+    years = np.asarray(years, dtype=float)
+    obs = ~np.isnan(cube)
+    pos = np.arange(n_years)
+    prev = np.maximum.accumulate(np.where(obs, pos, -1), axis=1)
+    nxt = np.minimum.accumulate(np.where(obs, pos, n_years)[:, ::-1], axis=1)[:, ::-1]
+    inside = ~obs & (prev >= 0) & (nxt < n_years)
+
+    prev, nxt = prev.clip(0), nxt.clip(max=n_years - 1)
+    rows = np.arange(n_series)[:, None]
+    x0, x1 = years[prev], years[nxt]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        w = (years[None, :] - x0) / (x1 - x0)
+    y0, y1 = cube[rows, prev], cube[rows, nxt]
+    return np.where(inside, y0 + w * (y1 - y0), cube)
+
+def pchip_fill(cube, years):
+    """
+    Shape-preserving cubic (no overshoot between census points). Series sharing a missing
+    pattern share abscissae, so each pattern is one vectorised PCHIP call.
+    """
+    years = np.asarray(years, dtype=float)
+    out = cube.copy()
+    obs = ~np.isnan(cube)
+    patterns, group = np.unique(obs, axis=0, return_inverse=True)
+    for g, mask in enumerate(patterns):
+        if mask.sum() < 2:
+            continue
+        first, last = np.flatnonzero(mask)[[0, -1]]
+        targets = np.flatnonzero(~mask)
+        targets = targets[(targets > first) & (targets < last)]
+        if not len(targets):
+            continue
+        members = np.flatnonzero(group.ravel() == g)
+        interp = PchipInterpolator(years[mask], cube[np.ix_(members, np.flatnonzero(mask))], axis=1)
+        out[np.ix_(members, targets)] = interp(years[targets])
+    return out
+
+def seasonal_fill(cube, years, period: int = SEASONAL_PERIOD):
+    """Linear within each phase (year % period) across cycles, then linear for phases never observed."""
+    years = np.asarray(years)
+    out = cube.copy()
+    for phase in range(period):
+        cols = np.flatnonzero(years % period == phase)
+        if len(cols):
+            out[:, cols] = linear_fill(cube[:, cols], years[cols])
+    return linear_fill(out, years)
+
+KERNELS = {"linear": linear_fill, "pchip": pchip_fill, "seasonal": seasonal_fill}
+
+# --- temporal_stats <-> cube ---
+def load_series(engine, categories=None):
+    """
+    Pivots temporal_stats into (series, year) arrays, one series per (lga_code, category_id).
+    Returns dict with 'keys' (DataFrame lga_code/category_id/metric_name), 'years',
+    'observed' (non-interpolated values) and 'filled' (stored interpolated values), or None.
+    """
+    query = "SELECT year, lga_code, category_id, metric_name, value, is_interpolated FROM temporal_stats"
+    df = pd.read_sql(text(query), engine)
+    if categories is not None:
+        df = df[df['category_id'].isin(list(categories))]
+    if df.empty:
+        return None
+
+    df['lga_code'] = df['lga_code'].astype('Int64')
+    keys = df.groupby(['lga_code', 'category_id'], dropna=False, sort=True)
+    series = keys.ngroup().to_numpy()
+    key_frame = keys['metric_name'].first().reset_index()
+
+    years = np.arange(df['year'].min(), df['year'].max() + 1)
+    t = (df['year'] - years[0]).to_numpy()
+    interp = df['is_interpolated'].fillna(False).astype(bool).to_numpy()
+    values = df['value'].to_numpy(dtype=float)
+
+    observed = np.full((len(key_frame), len(years)), np.nan)
+    filled = np.full_like(observed, np.nan)
+    observed[series[~interp], t[~interp]] = values[~interp]
+    filled[series[interp], t[interp]] = values[interp]
+    return {"keys": key_frame, "years": years, "observed": observed, "filled": filled}
+
+def _row_hashes(matrix, salt: str = ""):
+    """Per-series SHA-1 over the NaN mask and values."""
+    mask = np.isnan(matrix)
+    data = np.where(mask, 0.0, matrix)
+    return [hashlib.sha1(salt.encode() + m.tobytes() + d.tobytes()).hexdigest() for m, d in zip(mask, data)]
+
+def fill_gaps(engine=None, method: str = "linear", categories=None, force: bool = False):
+    """
+    Fills interior gaps of every (LGA, category) series in temporal_stats and writes the fills back
+    with is_interpolated = 1, replacing only the stored fills of those cells (and of cells that are
+    now observed). Series whose observed inputs (and stored fills) match gap_fill_state
+    are skipped, so re-runs only touch series an ingest actually changed.
+    Returns a dict with counts of series seen / recomputed and cells written.
+    """
+    if method not in KERNELS:
+        raise ValueError(f"Unknown gap-fill method '{method}' (expected one of {METHODS})")
+    engine = engine or create_engine(DATABASE_URL)
+    data = load_series(engine, categories)
+    if data is None:
+        return {"series": 0, "recomputed": 0, "cells": 0}
+
+    keys, years, observed = data['keys'], data['years'], data['observed']
+    input_hash = _row_hashes(observed, salt=method)
+    stored_fill_hash = _row_hashes(data['filled'])
+
+    state = pd.DataFrame(columns=['lga_code', 'category_id', 'input_hash', 'output_hash'])
+    if inspect(engine).has_table('gap_fill_state'):
+        state = pd.read_sql(text("SELECT lga_code, category_id, input_hash, output_hash FROM gap_fill_state"), engine)
+    state['lga_code'] = state['lga_code'].astype('Int64')
+    known = keys.merge(state, on=['lga_code', 'category_id'], how='left')
+    stale = force | (known['input_hash'].to_numpy() != np.array(input_hash)) \
+                  | (known['output_hash'].to_numpy() != np.array(stored_fill_hash))
+    todo = np.flatnonzero(stale)
+    if not len(todo):
+        return {"series": len(keys), "recomputed": 0, "cells": 0}
+
+    result = KERNELS[method](observed[todo], years)
+    fills = np.where(np.isnan(observed[todo]), result, np.nan)
+    # Stored fills this run replaces: cells refilled now, and cells that have since been observed.
+    # Other interpolated rows (e.g. extrapolated ends written by an ingest) are left alone.
+    stored = data['filled'][todo]
+    replaced = ~np.isnan(fills) | (~np.isnan(observed[todo]) & ~np.isnan(stored))
+    kept = np.where(replaced, np.nan, stored)
+    s, t = np.nonzero(~np.isnan(fills))
+    chosen = keys.iloc[todo].reset_index(drop=True)
+    rows = pd.DataFrame({
+        "year": years[t],
+        "lga_code": chosen['lga_code'].to_numpy()[s],
+        "category_id": chosen['category_id'].to_numpy()[s],
+        "metric_name": chosen['metric_name'].to_numpy()[s],
+        "value": fills[s, t],
+        "is_interpolated": True,
+    })
+
+    codes = [None if pd.isna(l) else int(l) for l in chosen['lga_code']]
+    cats = [int(c) for c in chosen['category_id']]
+    ds, dt = np.nonzero(replaced)
+    cells = [{"l": codes[i], "c": cats[i], "y": int(years[j])} for i, j in zip(ds, dt)]
+    series = [{"l": l, "c": c} for l, c in zip(codes, cats)]
+    state_rows = chosen.assign(
+        method=method,
+        input_hash=[input_hash[i] for i in todo],
+        output_hash=_row_hashes(np.where(np.isnan(fills), kept, fills)),
+    ).drop(columns='metric_name')
+
+    # One transaction: a failure part-way leaves the previous fills and state in place
+    with engine.begin() as conn:
+        if cells:
+            conn.execute(text("DELETE FROM temporal_stats WHERE is_interpolated = 1 AND lga_code IS :l "
+                              "AND category_id = :c AND year = :y"), cells)
+        if inspect(conn).has_table('gap_fill_state'):
+            conn.execute(text("DELETE FROM gap_fill_state WHERE lga_code IS :l AND category_id = :c"), series)
+        rows.to_sql('temporal_stats', conn, if_exists='append', index=False)
+        state_rows.to_sql('gap_fill_state', conn, if_exists='append', index=False)
+
+    return {"series": len(keys), "recomputed": len(todo), "cells": len(rows)}
+
+if __name__ == "__main__":
+    import sys
+    method = sys.argv[1] if len(sys.argv) > 1 else "linear"
+    print(f"--- Gap Filling ({method}) ---")
+    print(fill_gaps(method=method))
+    print(f"Re-run (unchanged inputs): {fill_gaps(method=method)}")
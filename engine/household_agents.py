@@ -0,0 +1,346 @@
+import pandas as pd
+import numpy as np
+from sqlalchemy import text
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+from policy_simulation import SimulationEngine
+from regional_simulation import RegionalSimulation
+from state_model import PARTICIPATION_RATE, BASE_JOBS_RATE
+
+# --- Synthetic Households ---
+HOUSEHOLD_SIZE = 2.5          # Residents per household (agents are households)
+MEDIAN_INCOME = 100_000       # Gross household income at the state median house price ($/yr)
+PRICE_ELASTICITY = 0.4        # LGA median income scales with (LGA price / state price) ** this
+INCOME_SIGMA = 0.55           # Lognormal spread of earnings within an LGA
+EMPLOYED_SHARE = 0.75         # Households with a working head...
+PUBLIC_SHARE = 0.18           # ...of which work in the public sector
+NOT_WORKING_INCOME = 0.35     # Pensions/benefits as a share of earning potential
+
+DWELLINGS = ["house", "townhouse", "apartment"]
+TENURES = ["owner", "mortgage", "renter"]
+EMPLOYMENT = ["not_working", "private", "public"]
+INCOME_BANDS = [40_000, 80_000, 130_000]      # Starting-income band edges for the summary groups
+# Tenure mix by dwelling type (rows follow DWELLINGS)
+TENURE_BY_DWELLING = np.array([[0.35, 0.40, 0.25],
+                               [0.25, 0.35, 0.40],
+                               [0.12, 0.18, 0.70]])
+DWELLING_PRICE = np.array([1.0, 0.8, 0.6])     # Dwelling value relative to the LGA median price
+# Two-party ALP intention by lga_stats.political_lean
+LEAN_ALP_SHARE = {"Labor": 0.6, "Labor-swing": 0.52, "Labor/Ind": 0.55, "Green": 0.65,
+                  "Liberal-swing": 0.48, "Coalition": 0.4, "Coalition/Ind": 0.42}
+
+# --- Housing and Commuting Costs ($/yr) ---
+RENT_YIELD = 0.035            # Rent as a share of dwelling value
+MORTGAGE_REPAYMENT = 0.045    # Repayments as a share of dwelling value (average loan mid-term)
+OWNER_COST_RATE = 0.006       # Rates/insurance for outright owners
+COMMUTE_COST = 4000.0         # Out-commuting workers, scaled by the congestion deviation
+STRESS_THRESHOLD = 0.3        # Housing stress: costs above 30% of income
+
+# --- Per-Tick Dynamics ---
+WAGE_GROWTH = 0.03
+COST_GROWTH = 0.035           # Rents and owner costs; mortgage repayments stay nominal
+SEPARATION_RATE = 0.04        # Yearly job loss with no policy pressure...
+REHIRE_RATE = 0.35            # ...and re-employment of those without work
+# Indicator deviations (% change this year) feeding agent behaviour
+CPI_ID, CONFIDENCE_ID, INVESTMENT_ID, HEADCOUNT_ID, CONGESTION_ID = 1, 5, 7, 19, 21
+DRIVER_IDS = [CPI_ID, CONFIDENCE_ID, INVESTMENT_ID, HEADCOUNT_ID, CONGESTION_ID]
+WAGE_DRIVERS = {CONFIDENCE_ID: 0.05, INVESTMENT_ID: 0.1}
+# A 1% fall in the sector's driver adds this many points (x 1/100) to its separation rate
+JOB_LOSS_DRIVERS = {"private": (INVESTMENT_ID, 0.3), "public": (HEADCOUNT_ID, 1.0)}
+VOTE_SWING = 2.0              # P(switch) per unit of (smoothed) relative disposable-income gap vs the reference scenario
+MAX_SWITCH = 0.5
+VOTE_MEMORY = 0.5             # Weight of last year's smoothed gap, so job churn doesn't flip votes back and forth
+LOSS_THRESHOLD = 0.01         # A "loser" is >1% worse off than in the first (reference) scenario
+
+DEFAULT_AGENTS = 5_000_000
+DEFAULT_CHUNK = 250_000
+METRICS = ["households", "disposable", "stress", "alp", "losers"]
+
+_INPUTS = None
+
+def _init_worker(inputs):
+    global _INPUTS
+    _INPUTS = inputs
+
+# --- Struct-of-Arrays Agents ---
+def synthesize(inputs, lga, rng):
+    """Household columns for agents whose LGA index is `lga`; small dtypes, one array per attribute."""
+    n = len(lga)
+    dwelling = (rng.random(n, dtype=np.float32)[:, None] > inputs['dwelling_cdf'][lga]).sum(axis=1).astype(np.uint8)
+    tenure_cdf = np.cumsum(TENURE_BY_DWELLING, axis=1)[dwelling]
+    tenure = (rng.random(n, dtype=np.float32)[:, None] > tenure_cdf).sum(axis=1).clip(0, 2).astype(np.uint8)
+
+    u = rng.random(n, dtype=np.float32)
+    sector = np.where(u < EMPLOYED_SHARE * PUBLIC_SHARE, 2, np.where(u < EMPLOYED_SHARE, 1, 0)).astype(np.uint8)
+    earnings = (inputs['income_median'][lga]
+                * np.exp(INCOME_SIGMA * rng.standard_normal(n, dtype=np.float32))).astype(np.float32)
+
+    value = inputs['price'][lga] * DWELLING_PRICE[dwelling].astype(np.float32)
+    cost = np.choose(tenure, [value * OWNER_COST_RATE, value * MORTGAGE_REPAYMENT, value * RENT_YIELD])
+    return {
+        "lga": lga.astype(np.uint16),
+        "dwelling": dwelling,
+        "tenure": tenure,
+        "sector": np.maximum(sector, 1).astype(np.uint8),    # Sector of the job held or sought
+        "employed": sector > 0,
+        "works_local": rng.random(n, dtype=np.float32) < inputs['local_job_prob'][lga],
+        "alp": rng.random(n, dtype=np.float32) < inputs['alp_share'][lga],
+        "swing_draw": rng.random(n, dtype=np.float32),   # Fixed per household: how readily it switches
+        "earnings": earnings,
+        "housing_cost": cost.astype(np.float32),
+    }
+
+def rule_mask(rule, agents, income, year):
+    """Vectorised eligibility for one compiled policy rule."""
+    if not rule['from_year'] <= year <= rule['to_year']:
+        return None
+    mask = np.ones(len(income), dtype=bool)
+    for col, codes in rule['when'].items():
+        mask &= np.isin(agents[col], codes)
+    if rule['income_below'] is not None:
+        mask &= income < rule['income_below']
+    if rule['income_above'] is not None:
+        mask &= income >= rule['income_above']
+    return mask
+
+def _simulate_chunk(start, stop, seed_seq):
+    """
+    Synthesises agents [start, stop) and steps every scenario over the horizon with the same random
+    draws (common random numbers, so scenario differences are policy, not noise).
+    Returns (scenario, year, group, metric) weighted sums.
+    """
+    inputs = _INPUTS
+    agent_lga = np.searchsorted(inputs['agent_bounds'], np.arange(start, stop), side='right').astype(np.intp)
+    population_seq, tick_seq = seed_seq.spawn(2)
+    base = synthesize(inputs, agent_lga, np.random.default_rng(population_seq))
+    weight = inputs['agent_weight'][agent_lga]
+    n, n_lga = stop - start, len(inputs['lgas'])
+
+    band = np.searchsorted(INCOME_BANDS, base['earnings']).astype(np.intp)
+    start_sector = np.where(base['employed'], base['sector'], 0).astype(np.intp)
+    group = ((agent_lga * len(TENURES) + base['tenure']) * len(EMPLOYMENT) + start_sector) * (len(INCOME_BANDS) + 1) + band
+    n_groups = n_lga * len(TENURES) * len(EMPLOYMENT) * (len(INCOME_BANDS) + 1)
+
+    drivers, years = inputs['drivers'], inputs['years']
+    n_s, n_t = drivers.shape[0], len(years)
+    sums = np.zeros((n_s, n_t, n_groups, len(METRICS)))
+    reference = np.empty((n_t, n)) if n_s > 1 else None
+
+    for s in range(n_s):
+        rng = np.random.default_rng(tick_seq)
+        agents = dict(base)
+        employed = base['employed'].copy()
+        earnings = base['earnings'].copy()
+        cost = base['housing_cost'].copy()
+        alp = base['alp'].copy()
+        grows = base['tenure'] != 1
+        smoothed = np.zeros(n)
+        for t, year in enumerate(years):
+            step = drivers[s, :, t] - (drivers[s, :, t - 1] if t else 0.0)     # (LGA, driver) % change this year
+            level = drivers[s, :, t]
+            u = rng.random(n, dtype=np.float32)
+            if t:
+                wage = WAGE_GROWTH + sum(w * step[:, DRIVER_IDS.index(mid)] for mid, w in WAGE_DRIVERS.items()) / 100.0
+                earnings *= (1 + wage[agent_lga]).astype(np.float32)
+                cpi = step[:, DRIVER_IDS.index(CPI_ID)][agent_lga] / 100.0
+                cost = np.where(grows, cost * (1 + COST_GROWTH + cpi), cost).astype(np.float32)
+
+                separation = np.full(n, SEPARATION_RATE, dtype=np.float32)
+                for name, (mid, w) in JOB_LOSS_DRIVERS.items():
+                    extra = np.maximum(-step[:, DRIVER_IDS.index(mid)], 0.0) * w / 100.0
+                    sec = agents['sector'] == EMPLOYMENT.index(name)
+                    separation[sec] += extra[agent_lga[sec]]
+                employed = np.where(employed, u >= separation, u < REHIRE_RATE)
+
+            income = np.where(employed, earnings, earnings * NOT_WORKING_INCOME)
+            commute = COMMUTE_COST * (1 + level[:, DRIVER_IDS.index(CONGESTION_ID)] / 100.0)[agent_lga]
+            outlay = cost + np.where(employed & ~agents['works_local'], commute, 0.0)
+            agents['employment'] = np.where(employed, agents['sector'], 0)
+            cost_scale = np.ones(n)
+            for rule in inputs['rules'][s]:
+                mask = rule_mask(rule, agents, income, year)
+                if mask is None:
+                    continue
+                income = np.where(mask, income * (1 + rule['income_pct'] / 100.0) + rule['transfer'], income)
+                cost_scale[mask] *= 1 + rule['housing_cost_pct'] / 100.0
+            outlay = outlay + cost * (cost_scale - 1)
+            disposable = income - outlay
+
+            if s == 0:
+                if reference is not None:
+                    reference[t] = disposable
+                losers = np.zeros(n, dtype=bool)
+            else:
+                # Against the reference path: being better off draws households to the incumbent (ALP),
+                # worse off pushes them away. The level of the smoothed gap sets who has switched, against
+                # a fixed per-household threshold, so a lasting gain holds its voters
+                gap = (disposable - reference[t]) / np.maximum(np.abs(reference[t]), 1.0)
+                smoothed = VOTE_MEMORY * smoothed + (1 - VOTE_MEMORY) * gap
+                switch = base['swing_draw'] < np.minimum(VOTE_SWING * np.abs(smoothed), MAX_SWITCH)
+                alp = np.where(switch, smoothed > 0, base['alp'])
+                losers = gap < -LOSS_THRESHOLD
+            stress = cost * cost_scale > STRESS_THRESHOLD * income
+            for m, values in enumerate((weight, weight * disposable, weight * stress, weight * alp, weight * losers)):
+                sums[s, t, :, m] = np.bincount(group, weights=values, minlength=n_groups)
+    return sums
+
+class HouseholdModel:
+    """
+    Agent layer under the regional simulation: millions of synthetic households as NumPy columns,
+    synthesised and stepped in chunks (each with its own SeedSequence child, so a seed and chunk size
+    give the same result for any worker count). Scenario policy shocks run through RegionalSimulation and
+    reach households by LGA; extra policy rules apply as vectorised masks each tick.
+    """
+    def __init__(self, regional: RegionalSimulation = None, sim: SimulationEngine = None):
+        self.regional = regional or RegionalSimulation(sim)
+        self.engine = self.regional.engine
+        self.lgas = self.regional.lgas.copy()
+        self.load_inputs()
+
+    def load_inputs(self):
+        year = self.regional.year
+        with self.engine.connect() as conn:
+            stats = pd.read_sql(text("""
+                SELECT s.lga_name, s.median_house_price, s.political_lean
+                FROM lga_stats s
+                JOIN (SELECT lga_name, MAX(year) AS year FROM lga_stats WHERE year <= :y GROUP BY lga_name) latest
+                  ON s.lga_name = latest.lga_name AND s.year = latest.year
+            """), conn, params={"y": year}).set_index('lga_name')
+            housing = pd.read_sql(text("""
+                SELECT h.lga_name, h.standalone_house_pct, h.townhouse_pct, h.apartment_pct
+                FROM housing_diversity h
+                JOIN (SELECT lga_name, MAX(year) AS year FROM housing_diversity WHERE year <= :y GROUP BY lga_name) latest
+                  ON h.lga_name = latest.lga_name AND h.year = latest.year
+            """), conn, params={"y": year}).set_index('lga_name')
+
+        # Only LGAs with residents get households
+        self.lgas = self.lgas[self.lgas['population'].fillna(0) > 0].reset_index(drop=True)
+        self.lga_rows = self.regional.lgas.index[self.regional.lgas['lga_name'].isin(self.lgas['lga_name'])].to_numpy()
+        names = self.lgas['lga_name']
+        self.households = self.lgas['population'].to_numpy(dtype=float) / HOUSEHOLD_SIZE
+
+        price = stats['median_house_price'].reindex(names)
+        price = price.fillna(price.median()).to_numpy(dtype=float)
+        state_price = np.median(price)
+        mix = housing[['standalone_house_pct', 'townhouse_pct', 'apartment_pct']].reindex(names)
+        mix = mix.fillna(mix.mean()).fillna(100.0 / len(DWELLINGS)).to_numpy(dtype=float)
+        jobs = self.regional.features['jobs_per_resident'].reindex(names).fillna(0).to_numpy(dtype=float)
+
+        self.inputs = {
+            "lgas": names.tolist(),
+            "price": price.astype(np.float32),
+            "income_median": (MEDIAN_INCOME * (price / state_price) ** PRICE_ELASTICITY).astype(np.float32),
+            "dwelling_cdf": np.cumsum(mix / mix.sum(axis=1, keepdims=True), axis=1)[:, :-1].astype(np.float32),
+            # Share of workers whose job is in their own LGA (the friction model's jobs/workers ratio)
+            "local_job_prob": np.clip((jobs + BASE_JOBS_RATE) / PARTICIPATION_RATE, 0.0, 1.0).astype(np.float32),
+            "alp_share": stats['political_lean'].reindex(names).map(LEAN_ALP_SHARE).fillna(0.5).to_numpy(dtype=np.float32),
+        }
+
+    def compile_rules(self, rules):
+        """Policy rules with labels turned into column codes. See run()."""
+        codes = {"dwelling": DWELLINGS, "tenure": TENURES, "employment": EMPLOYMENT}
+        names = self.inputs['lgas']
+        compiled = []
+        for rule in rules or []:
+            when = {}
+            for col, values in rule.get('when', {}).items():
+                values = [values] if isinstance(values, str) else list(values)
+                labels = names if col == 'lga' else codes[col]
+                when[col] = np.array([labels.index(v) for v in values])
+            compiled.append({
+                "when": when,
+                "income_below": rule.get('income_below'),
+                "income_above": rule.get('income_above'),
+                "from_year": rule.get('from_year', 0),
+                "to_year": rule.get('to_year', 9999),
+                "transfer": float(rule.get('transfer', 0.0)),
+                "income_pct": float(rule.get('income_pct', 0.0)),
+                "housing_cost_pct": float(rule.get('housing_cost_pct', 0.0)),
+            })
+        return compiled
+
+    def run(self, scenarios: dict, start_year: int = 2026, end_year: int = 2035, agents: int = DEFAULT_AGENTS,
+            seed: int = None, chunk: int = DEFAULT_CHUNK, workers: int = 0):
+        """
+        scenarios: {name: {'policy': {ID: % shock} through RegionalSimulation,
+                           'rules': [{'when': {'tenure'|'dwelling'|'employment'|'lga': label(s)},
+                                      'income_below'/'income_above': $, 'from_year'/'to_year',
+                                      'transfer': $/yr, 'income_pct': %, 'housing_cost_pct': %}]}}
+        The first scenario is the reference for loser counts. Agents are split across LGAs by
+        household count and weighted back up to it. workers: processes for the chunks (0 = in-process).
+        Returns long DataFrame per (scenario, year, LGA, tenure, employment, income band).
+        """
+        names = list(scenarios)
+        years = list(range(start_year, end_year + 1))
+        cols = [self.regional.graph.index[mid] for mid in DRIVER_IDS]
+        drivers = np.stack([
+            self.regional.run(cfg.get('policy', {}), start_year, end_year)['deviation'][0][self.lga_rows][:, :, cols]
+            for cfg in scenarios.values()
+        ])                                                                   # (scenario, LGA, year, driver)
+
+        share = self.households / self.households.sum()
+        counts = np.floor(share * agents).astype(int)
+        counts[np.argsort(share * agents - counts)[::-1][:agents - counts.sum()]] += 1
+        inputs = dict(self.inputs,
+                      agent_bounds=np.cumsum(counts),
+                      agent_weight=self.households / np.maximum(counts, 1),
+                      drivers=drivers,
+                      years=years,
+                      rules=[self.compile_rules(cfg.get('rules')) for cfg in scenarios.values()])
+
+        bounds = list(range(0, agents, chunk))
+        seeds = np.random.SeedSequence(seed).spawn(len(bounds))
+        jobs = [(lo, min(lo + chunk, agents), s) for lo, s in zip(bounds, seeds)]
+        if workers:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(inputs,)) as pool:
+                sums = sum(pool.map(_simulate_chunk, *zip(*jobs)))
+        else:
+            _init_worker(inputs)
+            sums = sum(_simulate_chunk(*job) for job in jobs)
+        return self._frame(sums, names, years)
+
+    def _frame(self, sums, names, years):
+        n_band = len(INCOME_BANDS) + 1
+        band_labels = [f"<{INCOME_BANDS[0] // 1000}k"] + \
+            [f"{lo // 1000}-{hi // 1000}k" for lo, hi in zip(INCOME_BANDS, INCOME_BANDS[1:])] + [f"{INCOME_BANDS[-1] // 1000}k+"]
+        index = pd.MultiIndex.from_product(
+            [names, years, self.inputs['lgas'], TENURES, EMPLOYMENT, band_labels],
+            names=['scenario', 'year', 'lga_name', 'tenure', 'employment', 'income_band'])
+        flat = sums.reshape(-1, len(METRICS))
+        frame = pd.DataFrame(flat, index=index, columns=METRICS)
+        frame = frame[frame['households'] > 0]
+        return frame.reset_index()
+
+def summarise(frame, by=('tenure',), year: int = None):
+    """Weighted mean disposable income and shares in stress / voting ALP / losing, per scenario x group."""
+    year = year or frame['year'].max()
+    sub = frame[frame['year'] == year]
+    grouped = sub.groupby(['scenario', *by], sort=False)[METRICS].sum()
+    out = pd.DataFrame({"households": grouped['households'].round().astype(int)})
+    out['mean_disposable'] = grouped['disposable'] / grouped['households']
+    for m in ("stress", "alp", "losers"):
+        out[f"{m}_share"] = grouped[m] / grouped['households']
+    return out
+
+if __name__ == "__main__":
+    import time
+
+    model = HouseholdModel()
+    scenarios = {
+        "status_quo": {},
+        "abolish_payroll_tax": {"policy": {9: -15.0, 5: 20.0, 19: -5.0}},
+        "renter_relief": {"rules": [{"when": {"tenure": "renter"}, "income_below": 80_000,
+                                     "transfer": 2500.0, "from_year": 2027}]},
+    }
+    cores = min(os.cpu_count() or 1, 4)
+    t0 = time.perf_counter()
+    res = model.run(scenarios, agents=DEFAULT_AGENTS, seed=2026, workers=cores if cores > 1 else 0)
+    elapsed = time.perf_counter() - t0
+    print(f"--- Household Agents: {DEFAULT_AGENTS:,} households x {len(model.inputs['lgas'])} LGAs x "
+          f"{res['year'].nunique()} years x {len(scenarios)} scenarios ({elapsed:.1f}s) ---")
+    with pd.option_context('display.width', 160):
+        print(summarise(res, by=('tenure',)).round(3).to_string())
+        print("\n--- Who loses under abolish_payroll_tax (2035) ---")
+        table = summarise(res[res['scenario'] == 'abolish_payroll_tax'], by=('employment', 'income_band'))
+        print(table.sort_values('losers_share', ascending=False).round(3).head(8).to_string())
@@ -0,0 +1,228 @@
+import pandas as pd
+import numpy as np
+from sqlalchemy import create_engine, text
+import os
+
+from lga_registry import load_lga_registry
+
+# Configuration
+BASE_DIR = os.getcwd()
+DB_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'victoria_sim.db')
+DATABASE_URL = f"sqlite:///{DB_PATH}"
+
+# --- Where Projects Land ---
+METRO_LGAS = [
+    "Banyule", "Bayside", "Boroondara", "Brimbank", "Cardinia", "Casey", "Darebin", "Frankston",
+    "Glen Eira", "Greater Dandenong", "Hobsons Bay", "Hume", "Kingston", "Knox", "Manningham",
+    "Maribyrnong", "Maroondah", "Melbourne", "Melton", "Merri-bek", "Monash", "Moonee Valley",
+    "Mornington Peninsula", "Nillumbik", "Port Phillip", "Stonnington", "Whitehorse", "Whittlesea",
+    "Wyndham", "Yarra", "Yarra Ranges",
+]
+# infrastructure_projects.region_impacted -> LGAs ("A/B" lists several regions).
+# "Metro All", "Regional" and "State" are resolved against the registry.
+REGION_LGAS = {
+    "Melbourne": ["Melbourne"],
+    "Melbourne CBD": ["Melbourne"],
+    "Melbourne East": ["Whitehorse", "Maroondah", "Knox", "Monash", "Greater Dandenong", "Frankston"],
+    "Melbourne West": ["Hobsons Bay", "Maribyrnong", "Brimbank", "Wyndham"],
+    "Melbourne North": ["Banyule", "Darebin", "Manningham", "Whittlesea", "Nillumbik"],
+    "Melbourne NW": ["Hume", "Moonee Valley", "Brimbank", "Melbourne"],
+    "Middle Ring": ["Kingston", "Monash", "Whitehorse", "Boroondara", "Manningham", "Banyule"],
+    "Mornington Peninsula": ["Mornington Peninsula", "Frankston"],
+    "Gippsland": ["Latrobe", "Baw Baw", "Bass Coast", "South Gippsland", "Wellington", "East Gippsland"],
+}
+
+# Project type from its name (first match wins); anything else is a utility with no transport effect
+PROJECT_TYPES = [
+    ("rail", ("Rail", "Metro Tunnel", "Level Crossing", "Loop")),
+    ("road", ("Link", "West Gate", "Freeway", "Road", "Bypass")),
+]
+DEFAULT_TYPE = "utility"
+
+# --- Shock Profiles (% deviation per $bn landing in an LGA) ---
+# While under construction, per $bn spent that year: works activity and disruption
+CONSTRUCTION_EFFECTS = {7: 0.6, 5: 0.2, 21: 0.3}
+# Once open, per $bn of completed budget: rail shifts trips to PT, roads add capacity
+OPERATIONAL_EFFECTS = {
+    "rail": {24: 1.0, 21: -0.2},
+    "road": {21: -0.6},
+    DEFAULT_TYPE: {},
+}
+
+def project_type(name: str):
+    for kind, keywords in PROJECT_TYPES:
+        if any(k in name for k in keywords):
+            return kind
+    return DEFAULT_TYPE
+
+class ProjectTimeline:
+    """
+    Time-phased shocks from infrastructure_projects. Construction spend and opening flags for every
+    (project, year) are built once from difference arrays over the year grid, so "what is active in
+    year y" is a column lookup; portfolios are project masks applied with one matmul.
+    """
+    def __init__(self, engine=None, lgas: list = None, projects: pd.DataFrame = None):
+        """lgas: LGA order of the schedules (default: the registry, e.g. RegionalSimulation.lgas['lga_name'])."""
+        self.engine = engine or create_engine(DATABASE_URL)
+        if projects is None:
+            projects = pd.read_sql(text("""
+                SELECT id, name, start_year, completion_year, budget_billions, region_impacted
+                FROM infrastructure_projects ORDER BY id
+            """), self.engine)
+        self.projects = projects.dropna(subset=['start_year', 'completion_year']).reset_index(drop=True)
+        if self.projects.empty:
+            raise ValueError("infrastructure_projects is empty; nothing to schedule")
+        self.projects['type'] = self.projects['name'].map(project_type)
+
+        if lgas is None:
+            lgas = load_lga_registry(self.engine)['lga_name'].tolist()
+        self.lgas = list(lgas)
+        self.incidence = self.build_incidence()
+        self.build_index()
+
+    def build_incidence(self):
+        """
+        (LGA, project) share of each project's budget landing in each LGA, split evenly over the
+        region's LGAs; shares of LGAs outside self.lgas are dropped rather than piled onto the rest.
+        """
+        pos = {name: i for i, name in enumerate(self.lgas)}
+        metro = [name for name in self.lgas if name in METRO_LGAS]
+        groups = {
+            "Metro All": metro,
+            "Regional": [name for name in self.lgas if name not in METRO_LGAS],
+            "State": self.lgas,
+        }
+        incidence = np.zeros((len(self.lgas), len(self.projects)))
+        for p, region in enumerate(self.projects['region_impacted'].fillna('')):
+            names = set()
+            for part in region.split('/'):
+                part = part.strip()
+                names.update(groups.get(part, REGION_LGAS.get(part, [])))
+            rows = [pos[name] for name in names if name in pos]
+            if rows:
+                incidence[rows, p] = 1.0 / len(names)
+        return incidence
+
+    def build_index(self):
+        """
+        Interval index over the year grid: +rate at the start year and -rate at completion, cumulated,
+        gives each project's spend per year; a +1 at completion, cumulated, gives its opening flag.
+        Column 0 stands for every year before the grid.
+        """
+        start = self.projects['start_year'].to_numpy(dtype=int)
+        done = np.maximum(self.projects['completion_year'].to_numpy(dtype=int), start + 1)
+        self.budget = self.projects['budget_billions'].fillna(0).to_numpy(dtype=float)
+        self.first_year = int(start.min())
+        self.years = np.arange(self.first_year, int(done.max()) + 1)
+
+        n_p, n_t = len(self.projects), len(self.years) + 1
+        rows = np.arange(n_p)
+        s, e = start - self.first_year + 1, done - self.first_year + 1
+        diff = np.zeros((n_p, n_t + 1))
+        diff[rows, s] += self.budget / (done - start)
+        diff[rows, e] -= self.budget / (done - start)
+        self.spend = np.cumsum(diff, axis=1)[:, :n_t]
+        opened = np.zeros((n_p, n_t + 1))
+        opened[rows, e] = 1.0
+        self.operating = np.cumsum(opened, axis=1)[:, :n_t]
+        # Projects under construction per (LGA, year column)
+        self.active_counts = (self.incidence > 0) @ (self.spend > 0)
+
+    def _columns(self, years):
+        return np.searchsorted(self.years, np.asarray(years), side='right')
+
+    # --- Queries ---
+    def active(self, year: int, lga_name: str = None):
+        """Projects under construction in `year` (optionally only those touching one LGA)."""
+        col = self._columns(year)
+        mask = self.spend[:, col] > 0
+        if lga_name is not None:
+            mask &= self.incidence[self.lgas.index(lga_name)] > 0
+        return self.projects[mask]
+
+    def active_count_table(self, years):
+        """(LGA x year) count of projects under construction."""
+        counts = self.active_counts[:, self._columns(years)]
+        return pd.DataFrame(counts.astype(int), index=self.lgas, columns=list(years))
+
+    def masks(self, portfolios: dict = None):
+        """
+        portfolios: {name: [project name or id, ...]} (default: one portfolio with every project).
+        Returns (names, (portfolio, project) 0/1 array).
+        """
+        if portfolios is None:
+            return ["all_projects"], np.ones((1, len(self.projects)))
+        names = self.projects['name'].tolist()
+        ids = self.projects['id'].tolist()
+        mask = np.zeros((len(portfolios), len(self.projects)))
+        for k, members in enumerate(portfolios.values()):
+            for m in members:
+                mask[k, names.index(m) if m in names else ids.index(m)] = 1.0
+        return list(portfolios), mask
+
+    # --- Shock Schedules ---
+    def schedule(self, indicator_ids, start_year: int = 2026, end_year: int = 2030, portfolios: dict = None):
+        """
+        Step changes per (portfolio, LGA, year, indicator) for RegionalSimulation.run(schedule=...).
+        Effects already under way before start_year are part of the baseline; only changes from
+        start_year on are scheduled. indicator_ids: the graph's indicator order.
+        """
+        names, mask = self.masks(portfolios)
+        index = {mid: i for i, mid in enumerate(indicator_ids)}
+        n_p, n_i = len(self.projects), len(index)
+
+        construction = np.zeros(n_i)
+        for mid, w in CONSTRUCTION_EFFECTS.items():
+            if mid in index:
+                construction[index[mid]] = w
+        operation = np.zeros((n_p, n_i))
+        for p, kind in enumerate(self.projects['type']):
+            for mid, w in OPERATIONAL_EFFECTS[kind].items():
+                if mid in index:
+                    operation[p, index[mid]] = w * self.budget[p]
+
+        # Per-project effect levels from the year before the window (the baseline) to end_year
+        cols = self._columns(np.arange(start_year - 1, end_year + 1))
+        effect = (self.spend[:, cols, None] * construction
+                  + self.operating[:, cols, None] * operation[:, None, :])     # (project, year, indicator)
+
+        # Portfolio toggle: (portfolio*LGA, project) @ (project, year*indicator)
+        weights = (mask[:, None, :] * self.incidence).reshape(-1, n_p)
+        levels = (weights @ effect.reshape(n_p, -1)).reshape(len(names), len(self.lgas), len(cols), n_i)
+        return {
+            "portfolios": names,
+            "lgas": list(self.lgas),
+            "years": list(range(start_year, end_year + 1)),
+            "schedule": np.diff(levels, axis=2),
+            "effect": levels[:, :, 1:],
+        }
+
+if __name__ == "__main__":
+    import time
+    from regional_simulation import RegionalSimulation
+    from policy_simulation import INDICATORS
+
+    regional = RegionalSimulation()
+    timeline = ProjectTimeline(regional.engine, regional.lgas['lga_name'].tolist())
+    print(f"--- Infrastructure Timeline: {len(timeline.projects)} projects, "
+          f"{timeline.years[0]}-{timeline.years[-1]} ---")
+    counts = timeline.active_count_table(range(2026, 2031))
+    print(counts[counts.sum(axis=1) > 0].to_string())
+
+    portfolios = {
+        "committed": timeline.projects['name'].tolist(),
+        "no_srl": [n for n in timeline.projects['name'] if "Suburban Rail Loop" not in n],
+        "roads_only": timeline.projects.loc[timeline.projects['type'] == 'road', 'name'].tolist(),
+    }
+    t0 = time.perf_counter()
+    plan = timeline.schedule(regional.graph.indicator_ids, 2026, 2035, portfolios)
+    res = regional.run({}, 2026, 2035, schedule=plan['schedule'])
+    elapsed = time.perf_counter() - t0
+    print(f"\n--- {len(portfolios)} portfolios x {len(res['lgas'])} LGAs, 2026-2035 ({elapsed * 1000:.1f} ms) ---")
+    cols = [regional.graph.index[mid] for mid in (7, 21, 24)]
+    for k, name in enumerate(plan['portfolios']):
+        final = pd.DataFrame(res['deviation'][k, :, -1][:, cols], index=res['lgas'],
+                             columns=[INDICATORS[mid] for mid in (7, 21, 24)])
+        final = final[final.abs().sum(axis=1) > 0]
+        print(f"\n{name}:")
+        print(final.round(2).to_string() if len(final) else "  (no projects change these LGAs in the window)")
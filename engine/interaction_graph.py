@@ -0,0 +1,348 @@
+import pandas as pd
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+from sqlalchemy import create_engine, inspect, text
+from math import comb
+import heapq
+import os
+
+# Configuration
+BASE_DIR = os.getcwd()
+DB_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'victoria_sim.db')
+DATABASE_URL = f"sqlite:///{DB_PATH}"
+EDGES_PATH = os.path.join(BASE_DIR, 'data', 'raw', 'interaction_edges.csv')
+
+# Longest lag (years) an edge may carry. Matches the 5-year simulation window.
+DEFAULT_MAX_LAG = 5
+
+EDGE_COLUMNS = ['source_id', 'target_id', 'coefficient', 'lag_years']
+PATH_COLUMNS = ['source_id', 'target_id', 'path', 'lags', 'gain', 'timings', 'contribution']
+# Causal chains kept per traced run; enumerating every walk grows exponentially with graph density
+MAX_PATHS = 500
+
+# interaction_edges holds several graphs side by side, one per version.
+# 'manual' is the hand-set graph; 'latest' resolves to the most recently written version.
+MANUAL_VERSION = 'manual'
+LATEST_VERSION = 'latest'
+
+class InteractionGraph:
+    """
+    Sparse causal graph between indicators.
+    Edges are stored as one CSR transfer matrix per lag, laid out [target, source],
+    so a propagation step costs O(edges) rather than O(indicators^2).
+    """
+    def __init__(self, indicator_ids, edges: pd.DataFrame, max_lag: int = DEFAULT_MAX_LAG):
+        self.indicator_ids = [int(i) for i in indicator_ids]
+        self.index = {mid: pos for pos, mid in enumerate(self.indicator_ids)}
+        self.max_lag = max_lag
+        self.version = None
+
+        edges = self._validate(edges)
+
+        # Keep edges grouped by lag so each lag block is a contiguous slice
+        edges = edges.sort_values(['lag_years', 'target_id', 'source_id']).reset_index(drop=True)
+        self.edges = edges
+        self.edge_src = edges['source_id'].map(self.index).to_numpy(dtype=np.int64)
+        self.edge_tgt = edges['target_id'].map(self.index).to_numpy(dtype=np.int64)
+        self.edge_lag = edges['lag_years'].to_numpy(dtype=np.int64)
+        self.edge_coef = edges['coefficient'].to_numpy(dtype=float)
+
+        n = len(self.indicator_ids)
+        self.transfer = {}
+        # Per-edge form of the same blocks: edges[lag_slice] feed targets through a 0/1 scatter [target, edge]
+        self.lag_slice = {}
+        self.scatter = {}
+        self.outgoing = {}  # CSC copies: column = source, for walking edges forward
+        for lag in np.unique(self.edge_lag):
+            sel = self.edge_lag == lag
+            self.transfer[int(lag)] = sparse.csr_matrix(
+                (self.edge_coef[sel], (self.edge_tgt[sel], self.edge_src[sel])), shape=(n, n)
+            )
+            lo, hi = np.searchsorted(self.edge_lag, [lag, lag + 1])
+            self.lag_slice[int(lag)] = slice(int(lo), int(hi))
+            self.outgoing[int(lag)] = self.transfer[int(lag)].tocsc()
+            self.scatter[int(lag)] = sparse.csr_matrix(
+                (np.ones(hi - lo), (self.edge_tgt[lo:hi], np.arange(hi - lo))), shape=(n, hi - lo)
+            )
+
+    # --- Loaders ---
+    @classmethod
+    def from_csv(cls, path, indicator_ids, max_lag: int = DEFAULT_MAX_LAG):
+        return cls(indicator_ids, pd.read_csv(path), max_lag)
+
+    @classmethod
+    def from_sql(cls, engine, indicator_ids, version: str = MANUAL_VERSION, max_lag: int = DEFAULT_MAX_LAG):
+        if version == LATEST_VERSION:
+            version = latest_edge_version(engine)
+        query = text("SELECT source_id, target_id, coefficient, lag_years FROM interaction_edges WHERE version = :v")
+        edges = pd.read_sql(query, engine, params={"v": version})
+        graph = cls(indicator_ids, edges, max_lag)
+        graph.version = version
+        return graph
+
+    @classmethod
+    def from_dict(cls, interactions: dict, indicator_ids, max_lag: int = DEFAULT_MAX_LAG):
+        """Legacy format: {Source_ID: [(Target_ID, Coefficient, Lag_Years)]}"""
+        rows = [(src, tgt, coeff, lag) for src, targets in interactions.items() for (tgt, coeff, lag) in targets]
+        return cls(indicator_ids, pd.DataFrame(rows, columns=EDGE_COLUMNS), max_lag)
+
+    def _validate(self, edges):
+        missing = [c for c in EDGE_COLUMNS if c not in edges.columns]
+        if missing:
+            raise ValueError(f"Interaction edges missing columns: {missing}")
+        if len(self.index) != len(self.indicator_ids):
+            raise ValueError("Duplicate indicator IDs in ontology.")
+
+        edges = edges[EDGE_COLUMNS].copy()
+        problems = []
+
+        if edges.isna().any(axis=1).any():
+            problems.append(f"incomplete rows at {edges.index[edges.isna().any(axis=1)].tolist()}")
+            edges = edges.dropna()
+
+        edges = edges.astype({'source_id': int, 'target_id': int, 'lag_years': int, 'coefficient': float})
+
+        known = pd.Index(self.indicator_ids)
+        unknown = sorted(set(edges.loc[~edges['source_id'].isin(known), 'source_id'])
+                         | set(edges.loc[~edges['target_id'].isin(known), 'target_id']))
+        if unknown:
+            problems.append(f"unknown indicator IDs {unknown}")
+
+        dupes = edges[edges.duplicated(['source_id', 'target_id', 'lag_years'], keep=False)]
+        if not dupes.empty:
+            pairs = sorted(set(zip(dupes['source_id'], dupes['target_id'], dupes['lag_years'])))
+            problems.append(f"duplicate edges (source, target, lag) {pairs}")
+
+        bad_lag = edges[(edges['lag_years'] < 0) | (edges['lag_years'] > self.max_lag)]
+        if not bad_lag.empty:
+            pairs = list(zip(bad_lag['source_id'], bad_lag['target_id'], bad_lag['lag_years']))
+            problems.append(f"lags outside 0..{self.max_lag} {pairs}")
+
+        if problems:
+            raise ValueError("Invalid interaction graph: " + "; ".join(problems))
+        return edges
+
+    # --- Structure Analysis ---
+    def adjacency(self):
+        """Union of all lags as a boolean [source, target] matrix."""
+        n = len(self.indicator_ids)
+        return sparse.csr_matrix(
+            (np.ones(len(self.edge_src), dtype=bool), (self.edge_src, self.edge_tgt)), shape=(n, n)
+        )
+
+    def strongly_connected_components(self):
+        """Returns SCCs as lists of indicator IDs, in topological order of the condensed graph."""
+        n_comp, labels = csgraph.connected_components(self.adjacency(), directed=True, connection='strong')
+        order = self._condensation_order(n_comp, labels)
+        members = {c: [] for c in range(n_comp)}
+        for pos, comp in enumerate(labels):
+            members[comp].append(self.indicator_ids[pos])
+        return [members[c] for c in order]
+
+    def feedback_loops(self):
+        """SCCs that contain a cycle (more than one member, or a self-edge)."""
+        self_loops = {self.indicator_ids[s] for s, t in zip(self.edge_src, self.edge_tgt) if s == t}
+        return [c for c in self.strongly_connected_components() if len(c) > 1 or c[0] in self_loops]
+
+    def topological_order(self):
+        """Indicator IDs ordered so every edge points forward. Raises if the graph has a cycle."""
+        loops = self.feedback_loops()
+        if loops:
+            raise ValueError(f"Interaction graph is cyclic; feedback loops: {loops}")
+        return [c[0] for c in self.strongly_connected_components()]
+
+    def _condensation_order(self, n_comp, labels):
+        # Kahn's algorithm over the DAG of components
+        src, tgt = labels[self.edge_src], labels[self.edge_tgt]
+        cross = src != tgt
+        pairs = np.unique(np.stack([src[cross], tgt[cross]], axis=1), axis=0) if cross.any() else np.empty((0, 2), int)
+        indegree = np.bincount(pairs[:, 1], minlength=n_comp)
+        children = {c: [] for c in range(n_comp)}
+        for s, t in pairs:
+            children[s].append(t)
+
+        queue = sorted(np.flatnonzero(indegree == 0).tolist())
+        order = []
+        while queue:
+            comp = queue.pop(0)
+            order.append(comp)
+            for child in children[comp]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    queue.append(child)
+        return order
+
+    # --- Propagation ---
+    def vector(self, values: dict):
+        """Dense indicator vector from {ID: value}."""
+        vec = np.zeros(len(self.indicator_ids))
+        for mid, val in values.items():
+            if mid not in self.index:
+                raise KeyError(f"Indicator {mid} is not in the ontology.")
+            vec[self.index[mid]] = val
+        return vec
+
+    def propagate(self, shocks, horizon: int, sensitivity=None, mix=None, coefficients=None):
+        """
+        Ripples % deviations through the graph for `horizon` years.
+        shocks: (N,) or (B, N) immediate % change per indicator, or a (B, horizon+1, N) schedule
+                of step changes starting in each year (e.g. a project's construction then operation).
+        sensitivity: optional positive exposure of each indicator, broadcastable to (B, N)
+                     (e.g. per-LGA exposure). Edges transmit relative exposure (target / source), so
+                     a chain's effect carries its end indicator's exposure once rather than compounding
+                     along the hops; shocks are expected already in exposure-scaled terms.
+        mix: optional callable (B, N) -> (B, N) applied to each transmitted effect,
+             e.g. a spatial lag across LGAs in the batch.
+        coefficients: optional (E,) or (B, E) edge coefficients in self.edges order, replacing the
+                      stored ones (one graph per batch row, e.g. for sensitivity sampling).
+        Returns the net deviation from baseline per year, shape (horizon+1, N) or (B, horizon+1, N).
+
+        Deviations persist (step changes), and each year's full deviation re-fires
+        its outgoing edges. Lag-0 effects land in the same year but are not
+        re-propagated until the following year. Effects past the horizon are dropped.
+        """
+        shocks = np.asarray(shocks, dtype=float)
+        single = shocks.ndim == 1
+        schedule = None
+        if shocks.ndim == 3:
+            if shocks.shape[1] != horizon + 1:
+                raise ValueError(f"Shock schedule covers {shocks.shape[1]} years, expected {horizon + 1}")
+            schedule, shocks = shocks, shocks[:, 0]
+        shocks = np.atleast_2d(shocks)
+
+        batch, n = shocks.shape
+        if coefficients is not None:
+            coefficients = np.broadcast_to(np.asarray(coefficients, dtype=float), (batch, len(self.edge_coef)))
+        path = np.zeros((batch, horizon + 1, n))
+        stimulus = np.zeros((batch, horizon + 1, n))
+
+        level = shocks
+        for t in range(horizon + 1):
+            if t:
+                level = level + stimulus[:, t]
+                if schedule is not None:
+                    level = level + schedule[:, t]
+            snapshot = level if sensitivity is None else level / sensitivity
+            for lag, matrix in self.transfer.items():
+                if t + lag > horizon:
+                    continue
+                if coefficients is None:
+                    effect = (matrix @ snapshot.T).T
+                else:
+                    sl = self.lag_slice[lag]
+                    flows = snapshot[:, self.edge_src[sl]] * coefficients[:, sl]
+                    effect = (self.scatter[lag] @ flows.T).T
+                if sensitivity is not None:
+                    effect = effect * sensitivity
+                if mix is not None:
+                    effect = mix(effect)
+                if lag == 0:
+                    level = level + effect
+                else:
+                    stimulus[:, t + lag] += effect
+            path[:, t] = level
+
+        return path[0] if single else path
+
+    # --- Attribution ---
+    @staticmethod
+    def path_timings(lags, horizon: int):
+        """
+        Number of ways a chain of edges with these lags delivers a persistent shock by year `horizon`.
+        Each year the whole deviation re-fires, so the chain can sit for any number of 1-year carries
+        between hops. Lag-0 hops land within the year but only re-fire from the next year's snapshot
+        (1 year each), except a final lag-0 hop, which may also land in the end year itself.
+        """
+        k = len(lags)
+        years = [max(lag, 1) for lag in lags]
+        ways = 0
+        carries = horizon - sum(years)
+        if carries >= 0:
+            ways += comb(k + carries, carries)
+        if k and lags[-1] == 0:
+            carries = horizon - sum(years[:-1])
+            if carries >= 0:
+                ways += comb(k - 1 + carries, carries)
+        return ways
+
+    def causal_paths(self, shocks: dict, horizon: int, min_effect: float = 1e-6, frame: bool = True,
+                     max_paths: int = MAX_PATHS):
+        """
+        End-year contribution of causal chains source -> ... -> target (walks included, so feedback
+        loops show up as repeated nodes). Chains are expanded best-first (largest |shock * gain| next)
+        along the per-lag transfer matrices, pruned once a chain's timing budget is spent or its effect
+        falls below min_effect, and the walk stops after max_paths chains, so on dense graphs the cost is
+        bounded by max_paths * out-degree rather than the number of walks.
+        When the walk finishes under the cap, the chains (plus the shocks themselves, as zero-hop paths)
+        sum to propagate's final year; otherwise they are the largest ones only.
+        frame=False returns the raw PATH_COLUMNS tuples (skips DataFrame construction on hot paths).
+        """
+        rows = []
+        queue = [(-abs(shock), k, shock, (source,), (), 1.0, 0)
+                 for k, (source, shock) in enumerate(shocks.items()) if shock]
+        heapq.heapify(queue)
+        order = len(queue)
+        while queue and len(rows) < max_paths:
+            _, _, shock, path, lags, gain, spent = heapq.heappop(queue)
+            ways = self.path_timings(lags, horizon)
+            if ways:
+                rows.append((path[0], path[-1], path, lags, gain, ways, shock * gain * ways))
+            if spent > horizon:
+                continue
+            node = self.index[path[-1]]
+            for lag, matrix in self.outgoing.items():
+                if spent + lag > horizon:
+                    continue
+                lo, hi = matrix.indptr[node], matrix.indptr[node + 1]
+                for tgt, coef in zip(matrix.indices[lo:hi], matrix.data[lo:hi]):
+                    effect = shock * gain * coef
+                    if abs(effect) < min_effect:
+                        continue
+                    order += 1
+                    heapq.heappush(queue, (-abs(effect), order, shock, path + (self.indicator_ids[tgt],),
+                                           lags + (lag,), gain * coef, spent + max(lag, 1)))
+
+        return pd.DataFrame(rows, columns=PATH_COLUMNS) if frame else rows
+
+def latest_edge_version(engine):
+    """Most recently written version in interaction_edges (None when the table is empty)."""
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT version FROM interaction_edges ORDER BY id DESC LIMIT 1")).scalar()
+
+def load_interaction_graph(indicator_ids, version: str = None, engine=None, path: str = EDGES_PATH,
+                           max_lag: int = DEFAULT_MAX_LAG):
+    """
+    version=None: the hand-set graph, from 'manual' rows in interaction_edges if present, else the CSV edge list.
+    Any other version (e.g. a fitted one, or 'latest') must exist in interaction_edges.
+    """
+    engine = engine or create_engine(DATABASE_URL)
+    has_table = inspect(engine).has_table('interaction_edges')
+    if version is None:
+        if has_table:
+            graph = InteractionGraph.from_sql(engine, indicator_ids, MANUAL_VERSION, max_lag)
+            if len(graph.edges):
+                return graph
+        graph = InteractionGraph.from_csv(path, indicator_ids, max_lag)
+        graph.version = MANUAL_VERSION
+        return graph
+
+    graph = InteractionGraph.from_sql(engine, indicator_ids, version, max_lag) if has_table else None
+    if graph is None or not len(graph.edges):
+        raise ValueError(f"No interaction edges stored for version '{version}'")
+    return graph
+
+if __name__ == "__main__":
+    from policy_simulation import INDICATORS
+
+    graph = load_interaction_graph(list(INDICATORS))
+    print(f"--- Interaction Graph: {len(graph.indicator_ids)} indicators, {len(graph.edges)} edges ---")
+    for lag, matrix in sorted(graph.transfer.items()):
+        print(f"Lag {lag}: {matrix.nnz} edges")
+
+    print("\n--- Causal Order (SCCs) ---")
+    for comp in graph.strongly_connected_components():
+        print(" + ".join(INDICATORS.get(mid, str(mid)) for mid in comp))
+
+    loops = graph.feedback_loops()
+    print(f"\nFeedback loops: {loops if loops else 'None'}")
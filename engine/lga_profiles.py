@@ -0,0 +1,183 @@
+import pandas as pd
+import numpy as np
+from scipy.cluster.vq import kmeans2
+from scipy.cluster.hierarchy import linkage, fcluster
+from sqlalchemy import create_engine, text
+import os
+
+from correlation_engine import load_temporal_cube, STATE_REGION
+from lga_registry import load_lga_registry
+
+# Configuration
+BASE_DIR = os.getcwd()
+DB_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'victoria_sim.db')
+DATABASE_URL = f"sqlite:///{DB_PATH}"
+PROFILES_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'lga_profiles.npz')
+
+# A (LGA, year) profile needs at least this share of metrics observed to be indexed
+MIN_COVERAGE = 0.5
+N_CLUSTERS = 6
+CLUSTER_SEED = 2026
+
+class LGAProfileIndex:
+    """
+    Standardised indicator profiles for every (LGA, year) in temporal_stats, with exact nearest
+    neighbours by Euclidean distance (one matrix-vector product against precomputed squared norms)
+    and k-means / Ward cluster labels. Clusters are fitted on profiles standardised within each
+    year, so they group LGAs with their peers rather than by era. Built at ingest; the request
+    path only loads and looks up.
+    """
+    def __init__(self, codes, names, years, metrics, metric_names, mean, std, vectors, kmeans, ward):
+        self.codes = np.asarray(codes, dtype=np.int64)      # Per row
+        self.names = np.asarray(names)
+        self.years = np.asarray(years, dtype=np.int64)
+        self.metrics = np.asarray(metrics)
+        self.metric_names = list(metric_names)
+        self.mean = np.asarray(mean, dtype=float)
+        self.std = np.asarray(std, dtype=float)
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+        self.kmeans = np.asarray(kmeans, dtype=np.int64)
+        self.ward = np.asarray(ward, dtype=np.int64)
+        self.sq_norms = (self.vectors.astype(float) ** 2).sum(axis=1)
+        self.row_of = {(int(c), int(y)): i for i, (c, y) in enumerate(zip(self.codes, self.years))}
+        self.code_of = {str(n).lower(): int(c) for n, c in zip(self.names, self.codes)}
+
+    @classmethod
+    def from_temporal(cls, temporal, names: dict = None, n_clusters: int = N_CLUSTERS, seed: int = CLUSTER_SEED):
+        """temporal: load_temporal_cube output. names: {lga_code: lga_name}."""
+        names = names or {}
+        keep = [i for i, r in enumerate(temporal['regions']) if r != STATE_REGION]
+        cube = temporal['cube'][keep]                          # (LGA, year, metric)
+        n_lga, n_year, n_met = cube.shape
+        rows = cube.reshape(-1, n_met)
+        codes = np.repeat([temporal['regions'][i] for i in keep], n_year)
+        years = np.tile(temporal['years'], n_lga)
+
+        # Within each year, relative to that year's LGAs: clusters group peer LGAs rather than eras
+        seen = ~np.isnan(cube)
+        count = np.maximum(seen.sum(axis=0), 1)
+        year_mean = np.where(seen, cube, 0.0).sum(axis=0) / count
+        year_std = np.sqrt((np.where(seen, cube - year_mean, 0.0) ** 2).sum(axis=0) / count)
+        year_std[~(year_std > 0)] = 1.0
+        peers = np.where(seen, (cube - year_mean) / year_std, 0.0).reshape(-1, n_met)
+
+        observed = ~np.isnan(rows)
+        covered = observed.mean(axis=1) >= MIN_COVERAGE
+        rows, observed, codes, years = rows[covered], observed[covered], codes[covered], years[covered]
+        peers = peers[covered]
+
+        # Pooled over every (LGA, year) so profiles from different years are comparable in similar();
+        # a missing metric sits at the mean (z = 0)
+        mean = np.nanmean(rows, axis=0)
+        std = np.nanstd(rows, axis=0)
+        std[~(std > 0)] = 1.0
+        vectors = np.where(observed, (rows - mean) / std, 0.0)
+
+        k = min(n_clusters, len(vectors))
+        if k > 1:
+            _, kmeans = kmeans2(peers, k, minit='++', seed=seed)
+            ward = fcluster(linkage(peers, method='ward'), k, criterion='maxclust') - 1
+        else:
+            kmeans = ward = np.zeros(len(vectors), dtype=np.int64)
+        return cls(codes, [names.get(int(c), str(int(c))) for c in codes], years, temporal['metrics'],
+                   temporal['metric_names'], mean, std, vectors, kmeans, ward)
+
+    # --- Lookup ---
+    def resolve(self, lga):
+        """LGA code from a code or (case-insensitive) name."""
+        if isinstance(lga, str) and not lga.isdigit():
+            if lga.lower() not in self.code_of:
+                raise KeyError(f"Unknown LGA '{lga}'")
+            return self.code_of[lga.lower()]
+        return int(lga)
+
+    def similar(self, lga, year: int, k: int = 10, target_year: int = None, exclude_self: bool = True):
+        """
+        The k (LGA, year) profiles closest to `lga` in `year`, optionally only from `target_year`
+        (e.g. "which councils look today like Wyndham did in 2010"). Each LGA appears at most once.
+        """
+        code = self.resolve(lga)
+        row = self.row_of.get((code, int(year)))
+        if row is None:
+            raise KeyError(f"No profile for LGA {code} in {year}")
+        q = self.vectors[row].astype(float)
+        dist = np.sqrt(np.maximum(self.sq_norms - 2.0 * (self.vectors @ q) + q @ q, 0.0))
+
+        candidates = np.ones(len(dist), dtype=bool)
+        if target_year is not None:
+            candidates &= self.years == int(target_year)
+        if exclude_self:
+            candidates &= self.codes != code
+        idx = np.flatnonzero(candidates)
+        # Closest profile per LGA, then the k closest LGAs
+        idx = idx[np.lexsort((dist[idx], self.codes[idx]))]
+        idx = idx[np.r_[True, self.codes[idx][1:] != self.codes[idx][:-1]]]
+        idx = idx[np.argsort(dist[idx], kind='stable')[:k]]
+        return pd.DataFrame({
+            "lga_code": self.codes[idx],
+            "lga_name": self.names[idx],
+            "year": self.years[idx],
+            "distance": dist[idx].round(4),
+            "kmeans_cluster": self.kmeans[idx],
+            "ward_cluster": self.ward[idx],
+        })
+
+    def clusters(self):
+        return pd.DataFrame({
+            "lga_code": self.codes,
+            "lga_name": self.names,
+            "year": self.years,
+            "kmeans_cluster": self.kmeans,
+            "ward_cluster": self.ward,
+        })
+
+    # --- Persistence ---
+    def save(self, path: str = PROFILES_PATH):
+        np.savez_compressed(
+            path, codes=self.codes, names=self.names.astype(str), years=self.years, metrics=self.metrics,
+            metric_names=np.array(self.metric_names), mean=self.mean, std=self.std,
+            vectors=self.vectors, kmeans=self.kmeans, ward=self.ward
+        )
+
+    @classmethod
+    def load(cls, path: str = PROFILES_PATH):
+        raw = np.load(path)
+        return cls(raw['codes'], raw['names'], raw['years'], raw['metrics'], raw['metric_names'].tolist(),
+                   raw['mean'], raw['std'], raw['vectors'], raw['kmeans'], raw['ward'])
+
+def sync_profile_index(engine=None, path: str = PROFILES_PATH):
+    """Rebuilds the profile index from temporal_stats and rewrites the lga_clusters table."""
+    engine = engine or create_engine(DATABASE_URL)
+    temporal = load_temporal_cube(engine)
+    if temporal is None:
+        return None
+    registry = load_lga_registry(engine).dropna(subset=['lga_code'])
+    index = LGAProfileIndex.from_temporal(temporal, dict(zip(registry['lga_code'].astype(int), registry['lga_name'])))
+    index.save(path)
+
+    with engine.connect() as conn:
+        trans = conn.begin()
+        conn.execute(text("DELETE FROM lga_clusters"))
+        trans.commit()
+    index.clusters().to_sql('lga_clusters', engine, if_exists='append', index=False)
+    return index
+
+if __name__ == "__main__":
+    import time
+
+    t0 = time.perf_counter()
+    index = sync_profile_index()
+    print(f"--- LGA Profile Index: {len(index.vectors)} (LGA, year) profiles x {len(index.metrics)} metrics "
+          f"({time.perf_counter() - t0:.2f}s) ---")
+
+    lga = index.names[0]
+    year = int(index.years.min()) + 34
+    t0 = time.perf_counter()
+    hits = index.similar(lga, year, k=5, target_year=int(index.years.max()))
+    print(f"\nLGAs that look now like {lga} did in {year} ({(time.perf_counter() - t0) * 1000:.2f} ms):")
+    print(hits.to_string(index=False))
+
+    latest = index.clusters()
+    latest = latest[latest['year'] == latest['year'].max()]
+    print("\n--- Clusters (latest year) ---")
+    print(latest.sort_values(['kmeans_cluster', 'lga_name']).to_string(index=False))
@@ -0,0 +1,47 @@
+import pandas as pd
+from sqlalchemy import create_engine, text
+import os
+import json
+
+# Configuration
+BASE_DIR = os.getcwd()
+DB_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'victoria_sim.db')
+DATABASE_URL = f"sqlite:///{DB_PATH}"
+GEO_FILE = os.path.join(BASE_DIR, 'data', 'geo', 'vic_lgas_2026.json')
+
+# ABS LGA codes for the LGAs seeded by the ingest scripts.
+# The boundary file is authoritative for any LGA it contains.
+LGA_CODES = {
+    "Hobsons Bay": 311, "Melbourne": 460, "Greater Geelong": 275, "Greater Bendigo": 262, "Ballarat": 57,
+    "Casey": 161, "Wyndham": 726, "Wodonga": 717, "Latrobe": 381, "Mildura": 478
+}
+
+def load_geo_codes(geo_path: str = GEO_FILE):
+    """{LGA_NAME: LGA_CODE} from the boundary file properties."""
+    if not os.path.exists(geo_path):
+        return {}
+    with open(geo_path) as f:
+        features = json.load(f).get('features', [])
+    return {feat['properties']['LGA_NAME']: int(feat['properties']['LGA_CODE']) for feat in features}
+
+def load_lga_registry(engine=None, year: int = 2026, geo_path: str = GEO_FILE):
+    """
+    One row per LGA: lga_name, lga_code, population (latest lga_stats year <= `year`).
+    Sorted by name so array axes are stable between runs.
+    """
+    engine = engine or create_engine(DATABASE_URL)
+    codes = dict(LGA_CODES)
+    codes.update(load_geo_codes(geo_path))
+
+    pop = pd.read_sql(text("""
+        SELECT s.lga_name, s.population
+        FROM lga_stats s
+        JOIN (SELECT lga_name, MAX(year) AS year FROM lga_stats WHERE year <= :y GROUP BY lga_name) latest
+          ON s.lga_name = latest.lga_name AND s.year = latest.year
+    """), engine, params={"y": year})
+
+    names = sorted(set(codes) | set(pop['lga_name']))
+    registry = pd.DataFrame({'lga_name': names})
+    registry['lga_code'] = registry['lga_name'].map(codes).astype('Int64')
+    registry = registry.merge(pop, on='lga_name', how='left')
+    return registry
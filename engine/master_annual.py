@@ -0,0 +1,109 @@
+import pandas as pd
+from sqlalchemy import create_engine, inspect, text
+import os
+
+# Configuration
+BASE_DIR = os.getcwd()
+DB_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'victoria_sim.db')
+DATABASE_URL = f"sqlite:///{DB_PATH}"
+
+# --- master_annual: one row per (year, metric) on the economic_indicators year grid ---
+# Economic columns are linearly interpolated between observed years (is_interpolated = 1 on filled cells);
+# political impact is summed per year (0 in years without events); house prices are the LGA mean where recorded.
+ECON_COLUMNS = ['gsp_billions', 'unemployment_rate', 'state_debt_billions', 'population_millions']
+MASTER_COLUMNS = ECON_COLUMNS + ['total_political_impact', 'avg_house_price']
+SOURCES = {col: 'economic_indicators' for col in ECON_COLUMNS}
+SOURCES.update({'total_political_impact': 'political_events', 'avg_house_price': 'lga_stats'})
+
+def build_master_rows(engine, lo: int, hi: int):
+    """Long master rows for years lo..hi, reading only the source rows in that span."""
+    params = {"lo": lo, "hi": hi}
+    cols = ", ".join(ECON_COLUMNS)
+    econ = pd.read_sql(text(f"SELECT year, {cols} FROM economic_indicators WHERE year BETWEEN :lo AND :hi"),
+                       engine, params=params)
+    politics = pd.read_sql(text("""
+        SELECT year, SUM(impact_score) AS total_political_impact FROM political_events
+        WHERE year BETWEEN :lo AND :hi GROUP BY year
+    """), engine, params=params)
+    prices = pd.read_sql(text("""
+        SELECT year, AVG(median_house_price) AS avg_house_price FROM lga_stats
+        WHERE year BETWEEN :lo AND :hi GROUP BY year
+    """), engine, params=params)
+
+    grid = pd.DataFrame({'year': range(lo, hi + 1)}).merge(econ, on='year', how='left')
+    observed = grid[ECON_COLUMNS].notna()
+    grid = grid.interpolate(method='linear')
+    grid = grid.merge(politics, on='year', how='left').merge(prices, on='year', how='left')
+    grid['total_political_impact'] = grid['total_political_impact'].fillna(0)
+
+    long = grid.melt(id_vars='year', value_vars=MASTER_COLUMNS, var_name='metric', value_name='value')
+    flags = observed.assign(year=grid['year']).melt(id_vars='year', var_name='metric', value_name='observed')
+    long = long.merge(flags, on=['year', 'metric'], how='left')
+    long['is_interpolated'] = long['observed'].eq(False)
+    long['source'] = long['metric'].map(SOURCES)
+    return long.dropna(subset=['value'])[['year', 'metric', 'value', 'source', 'is_interpolated']]
+
+def _bracket(conn, first: int, last: int, year_min: int, year_max: int):
+    """
+    Years whose interpolated cells depend on rows in first..last: out to the nearest fully observed
+    economic_indicators year on each side (or the grid edge).
+    """
+    complete = " AND ".join(f"{c} IS NOT NULL" for c in ECON_COLUMNS)
+    lo = conn.execute(text(f"SELECT MAX(year) FROM economic_indicators WHERE year < :y AND {complete}"), {"y": first}).scalar()
+    hi = conn.execute(text(f"SELECT MIN(year) FROM economic_indicators WHERE year > :y AND {complete}"), {"y": last}).scalar()
+    return max(lo if lo is not None else year_min, year_min), min(hi if hi is not None else year_max, year_max)
+
+def refresh_master_annual(engine=None, years=None):
+    """
+    Recomputes master_annual for the years touched by an ingest (None = everything).
+    Only the interpolation bracket around the changed years is re-read and rewritten.
+    Returns the (lo, hi) span refreshed, or None when nothing was in range.
+    """
+    engine = engine or create_engine(DATABASE_URL)
+    from db_init import MasterAnnual
+    MasterAnnual.__table__.create(engine, checkfirst=True)
+
+    with engine.connect() as conn:
+        year_min, year_max = conn.execute(text("SELECT MIN(year), MAX(year) FROM economic_indicators")).fetchone()
+    if year_min is None:
+        return None
+
+    if years is None:
+        lo, hi = year_min, year_max
+    else:
+        years = [int(y) for y in years if year_min <= int(y) <= year_max]
+        if not years:
+            return None
+        with engine.connect() as conn:
+            lo, hi = _bracket(conn, min(years), max(years), year_min, year_max)
+
+    rows = build_master_rows(engine, lo, hi)
+    # One transaction, so readers never see the span deleted but not yet rewritten
+    with engine.begin() as conn:
+        # The grid follows economic_indicators; drop years that fell off either end
+        conn.execute(text("DELETE FROM master_annual WHERE year BETWEEN :lo AND :hi OR year < :a OR year > :b"),
+                     {"lo": lo, "hi": hi, "a": year_min, "b": year_max})
+        rows.to_sql('master_annual', conn, if_exists='append', index=False)
+    return lo, hi
+
+def load_master_annual(engine=None):
+    """
+    Wide annual view (year + MASTER_COLUMNS): interpolated economics, political impact and house prices.
+    Returns None when master_annual hasn't been materialised yet.
+    """
+    engine = engine or create_engine(DATABASE_URL)
+    if not inspect(engine).has_table('master_annual'):
+        return None
+    long = pd.read_sql("SELECT year, metric, value FROM master_annual", engine)
+    if long.empty:
+        return None
+    wide = long.pivot(index='year', columns='metric', values='value').reindex(columns=MASTER_COLUMNS)
+    wide = wide.reindex(range(int(wide.index.min()), int(wide.index.max()) + 1))
+    wide.columns.name = None
+    return wide.rename_axis('year').reset_index()
+
+if __name__ == "__main__":
+    span = refresh_master_annual()
+    master = load_master_annual()
+    print(f"--- master_annual: {span[0]}-{span[1]}, {master.shape[0]} years x {len(MASTER_COLUMNS)} metrics ---")
+    print(master.head(12).to_string(index=False))
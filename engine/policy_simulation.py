@@ -3,6 +3,8 @@ import numpy as np
 from sqlalchemy import create_engine, text
 import os
 
+from interaction_graph import load_interaction_graph, PATH_COLUMNS, MAX_PATHS
+
 # Configuration
 BASE_DIR = os.getcwd()
 DB_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'victoria_sim.db')
@@ -17,52 +19,24 @@ INDICATORS = {
     11: "ALP Primary Vote", # Valid proxy for election result in this sim
     19: "Public Service Headcount",
     21: "Traffic Congestion Index",
+    24: "Public Transport Mode Share",
     34: "Mental Health Incidents",
     38: "Income Inequality (Gini)",
     41: "PM2.5 Air Quality"
 }
 
-# --- Interaction Matrix (Causal Rules) ---
-# Format: Source_ID: [(Target_ID, Coefficient, Lag_Years)]
+# --- Interaction Graph (Causal Rules) ---
+# Edges live in the interaction_edges table or data/raw/interaction_edges.csv
+# (source_id, target_id, coefficient, lag_years). See interaction_graph.py.
 # Coefficient: 1.0 means 1% change causes 1% change. Negative means inverse.
 # This assumes linear-ish relationships for the MVP.
-INTERACTIONS = {
-    # 5: Business Confidence
-    5: [
-        (7, 0.8, 1),   # High Conf -> High Investment (Lag 1yr)
-        (11, 0.2, 2)   # High Conf -> Slight Gov Vote boost (Lag 2yr)
-    ],
-    # 7: Private Investment
-    7: [
-        (9, 0.5, 2),   # Inv -> Tax Revenue (Lag 2yr)
-        (19, -0.3, 1), # Efficiency/Privatization pressure? Or just more private jobs relative? 
-                       # Let's say Inv -> Less need for public stimulus -> Headcount stable or down? 
-                       # Actually, often Inv creates jobs but correlation to Public Service might be independent.
-                       # Prompt says: "If ID 7 rises, calculate impact on ID 19 and ID 38". 
-                       # Let's assume Private Investment reduces relative Public Dependency (-0.3).
-        (38, 0.4, 3)   # High fast investment often drives Inequality initially (Capital vs Labor)
-    ],
-    # 9: State Tax Revenue
-    9: [
-        (19, 0.6, 1),  # More Revenue -> More Public Servants
-        (11, -0.4, 0)  # High Taxes -> Lower Vote? (Direct) BUT High Revenue allows spending.
-                       # Decision is "Abolish Tax". So Revenue DOWN.
-                       # If Revenue DOWN -> Public Service DOWN (Austerity).
-    ],
-    # 21: Traffic
-    21: [
-        (41, 0.8, 0),  # Traffic -> PM2.5 (Immediate)
-        (34, 0.5, 1)   # Traffic -> Mental Health Stress (Lag 1)
-    ],
-    # 41: PM2.5
-    41: [
-        (34, 0.3, 1)   # Poor Air -> Health stress
-    ]
-}
 
 class SimulationEngine:
-    def __init__(self):
+    def __init__(self, graph=None, version: str = None):
+        """version: interaction_edges version to simulate with (None = hand-set graph)."""
         self.engine = create_engine(DATABASE_URL)
+        self.graph = graph or load_interaction_graph(list(INDICATORS), version=version, engine=self.engine)
+        self.last_trace = None
         
     def get_baseline_2026(self):
         """Fetches the 2026 starting values for our key indicators."""
@@ -75,86 +49,88 @@ class SimulationEngine:
             # In step 183 we seeded some IDs. Let's use defaults for any missing.
             defaults = {
                 1: 140.0, 5: 100.0, 7: 50.0, 9: 30.0, 
-                11: 42.0, 19: 150000, 21: 85.0, 
+                11: 42.0, 19: 150000, 21: 85.0, 24: 14.0,
                 34: 20000, 38: 0.34, 41: 8.5
             }
             baseline.update(defaults)
         return baseline
 
-    def run_scenario(self, policy_deltas: dict):
+    def run_scenario(self, policy_deltas: dict, trace: bool = True):
         """
         policy_deltas: {ID: %_change_immediate}
         e.g., {9: -15.0, 5: +10.0} (Abolish Payroll Tax)
+        trace: also attribute deviations to what caused them, in self.last_trace:
+               'by_shock' {year: {shocked ID: {ID: deviation}}} (sums to deltas_log) and
+               'paths', end-year contributions of the largest causal chains (up to MAX_PATHS) as
+               PATH_COLUMNS tuples (see explain()). Past MAX_PATHS (or below the pruning threshold)
+               the chains no longer sum to the deviations: 'truncated' flags the cap being hit and
+               'residual' {ID: end-year deviation not covered by 'paths'} holds the remainder.
         """
-        current_state = self.get_baseline_2026()
+        start_year, end_year = 2026, 2030
+        base = self.get_baseline_2026()
         
-        # Track year-by-year changes
-        results = {2026: current_state.copy()}
-        
-        # Apply immediate shocks to 2026 state
-        for mid, delta_pct in policy_deltas.items():
-            current_state[mid] = current_state[mid] * (1 + (delta_pct / 100.0))
-            
-        results[2026] = current_state.copy()
+        # Propagate forward through the sparse graph.
+        # deviations[t] is the Net Deviation % from Baseline (static 2026) for start_year + t.
+        # "Abolish Tax" is a Step change (permanent), so shocks and ripples carry over year to year.
+        horizon = end_year - start_year
+        shock = self.graph.vector(policy_deltas)
+        if trace:
+            # One batch: the full shock plus each policy delta on its own (the graph is linear, so rows 1.. sum to row 0)
+            sources = [mid for mid, val in policy_deltas.items() if val]
+            single = np.zeros((len(sources), len(shock)))
+            single[np.arange(len(sources)), [self.graph.index[mid] for mid in sources]] = [policy_deltas[mid] for mid in sources]
+            batch = self.graph.propagate(np.vstack([shock, single]), horizon)
+            deviations = batch[0]
+            paths = self.graph.causal_paths(policy_deltas, horizon, frame=False)
+            covered = np.zeros(len(shock))
+            for row in paths:
+                covered[self.graph.index[row[1]]] += row[-1]
+            self.last_trace = {
+                "by_shock": {
+                    year: {src: dict(zip(self.graph.indicator_ids, batch[1 + k, t].tolist())) for k, src in enumerate(sources)}
+                    for t, year in enumerate(range(start_year, end_year + 1))
+                },
+                "paths": paths,
+                "truncated": len(paths) >= MAX_PATHS,
+                "residual": dict(zip(self.graph.indicator_ids, (deviations[horizon] - covered).tolist())),
+                "year": end_year,
+            }
+        else:
+            deviations = self.graph.propagate(shock, horizon)
+            self.last_trace = None
         
-        # Propagate forward 5 years
-        # We need to track the "Active Ripple" (delta form baseline)
+        ids = self.graph.indicator_ids
+        results = {}
+        deltas_log = {}
+        for t, year in enumerate(range(start_year, end_year + 1)):
+            deltas_log[year] = {mid: float(dev) for mid, dev in zip(ids, deviations[t])}
+        # Ripples stop at the horizon; the final deviation carries into the following year
+        deltas_log[end_year + 1] = dict(deltas_log[end_year])
         
-        # Initialize Deltas Registry: {Year: {ID: Delta_Pct}}
-        # 2026 has the policy deltas.
-        deltas_log = {y: {} for y in range(2026, 2032)}
-        for k, v in policy_deltas.items():
-            deltas_log[2026][k] = v
-            
-        for year in range(2026, 2031):
-            # Calculate effects for year + 1 based on year's deltas
-            current_deltas = deltas_log[year]
-            
-            # Apply interactions
-            current_deltas_copy = list(current_deltas.items())
-            for src_id, change_pct in current_deltas_copy:
-                if src_id in INTERACTIONS:
-                    targets = INTERACTIONS[src_id]
-                    for (tgt_id, coeff, lag) in targets:
-                        effect_year = year + lag
-                        if effect_year <= 2030:
-                            impact = change_pct * coeff # Simple linear transmission
-                            
-                            # Accumulate impact
-                            existing_impact = deltas_log[effect_year].get(tgt_id, 0.0)
-                            deltas_log[effect_year][tgt_id] = existing_impact + impact
-            
-            # Update state values for year + 1 based on cumulative deltas relative to Baseline
-            # Baseline assumes steady state for simplicity here
-            base = self.get_baseline_2026() # Simplifying: Baseline is static 2026, we show deviation
-            
-            next_state = {}
-            for mid, base_val in base.items():
-                # Total delta for this ID in this year
-                # Note: ripples accumulate. A change in 2027 persists? 
-                # Model choice: Impulse vs Step.
-                # "Abolish Tax" is a Step change (permanent). 
-                # So the delta of -15% stays.
-                # Ripples might be impulse or step.
-                # We'll treat deltas_log as "New Stimulus added this year". 
-                # We need to integrate them? 
-                # Let's simplify: `deltas_log` contains the Net Deviation % from Baseline for that year.
-                
-                # If we calculated that 2026 change causes 2027 change, we add it to 2027's Deviation.
-                # If 2026 had a deviation, does it carry over? Yes, usually.
-                
-                prev_dev = deltas_log[year].get(mid, 0.0)
-                new_stimulus = deltas_log[year+1].get(mid, 0.0) # From ripples
-                
-                total_dev = prev_dev + new_stimulus
-                deltas_log[year+1][mid] = total_dev
-                
-                next_state[mid] = base_val * (1 + (total_dev / 100.0))
-                
-            results[year+1] = next_state
+        for year, devs in deltas_log.items():
+            results[year] = {mid: base_val * (1 + (devs.get(mid, 0.0) / 100.0)) for mid, base_val in base.items()}
             
         return results, deltas_log
 
+    def explain(self, target_id: int, top: int = 5):
+        """Largest causal paths into target_id from the last traced run, as readable rows, plus an
+        "(other paths)" row for whatever the traced paths leave unexplained."""
+        if self.last_trace is None:
+            raise ValueError("No traced run; call run_scenario(..., trace=True) first.")
+        paths = pd.DataFrame(self.last_trace['paths'], columns=PATH_COLUMNS)
+        paths = paths[paths['target_id'] == target_id]
+        paths = paths.reindex(paths['contribution'].abs().sort_values(ascending=False).index).head(top)
+        rows = []
+        for nodes, lags, contribution in zip(paths['path'], paths['lags'], paths['contribution']):
+            chain = INDICATORS.get(nodes[0], str(nodes[0]))
+            for mid, lag in zip(nodes[1:], lags):
+                chain += f" -({lag}y)-> {INDICATORS.get(mid, str(mid))}"
+            rows.append({"path": chain, "contribution": contribution})
+        residual = self.last_trace['residual'].get(target_id, 0.0)
+        if abs(residual) > 1e-9:
+            rows.append({"path": "(other paths)", "contribution": residual})
+        return pd.DataFrame(rows, columns=['path', 'contribution'])
+
     def analyze_risks(self, deltas_log):
         final_year = 2030
         risks = []
@@ -184,7 +160,7 @@ def generate_report():
     scenario = {9: -15.0, 5: 20.0}
     
     print(">>> Running Policy Simulation: 'Abolish Payroll Tax for Small Business' <<<")
-    results, deltas = sim.run_scenario(scenario)
+    results, deltas = sim.run_scenario(scenario, trace=True)
     risks = sim.analyze_risks(deltas)
     
     # 1. Summary Table (2030 Impact)
@@ -200,22 +176,41 @@ def generate_report():
         f = final.get(mid, 0)
         pct = deltas[2030].get(mid, 0.0)
         print(f"{name:<30} | {b:<10.1f} | {f:<10.1f} | {pct:+.1f}%")
+    
+    # 1b. Attribution: why did inequality move?
+    print(f"\n--- Why {INDICATORS[38]} moved {deltas[2030][38]:+.1f}% (causal paths) ---")
+    for path, contribution in sim.explain(38).itertuples(index=False):
+        print(f"  {contribution:+6.2f}%  {path}")
         
-    # 2. Winner/Loser Map (Heuristic based on Sector composition)
+    # 2. Winner/Loser Map (Regional propagation, per-LGA exposure from zoning, hubs & housing)
     print("\n--- Geographic Impact Analysis (LGA Winners/Losers) ---")
-    # Winners: High Biz Confidence beneficiaries (Melbourne CBD, Monash?)
-    # Losers: Public Service dependent (Canberra equivalent? Maybe localized hubs or generally broad)
-    # We'll just print the logic-derived conclusion.
-    print("WINNER: 'Melbourne' & 'Stonnington' (High Small Business Density)")
-    print("        - Retail/Hospitality boom driven by ID 5 & ID 7.")
-    print("LOSER:  'Ballarat' & 'Geelong' (Public Service Hubs)")
-    print("        - Austerity ripple (ID 19 -9.0%) triggers regional job losses.")
+    from regional_simulation import RegionalSimulation
+    regional = RegionalSimulation(sim)
+    reg_res = regional.run(scenario, samples=500, seed=2026)
+    ranking = regional.rank_lgas(reg_res)
+    summary = regional.summarise(reg_res)['mean']
+    
+    def describe(lga):
+        row = summary.loc[lga]
+        return (f"Investment {row[INDICATORS[7]]:+.1f}%, Public Service {row[INDICATORS[19]]:+.1f}%, "
+                f"Inequality {row[INDICATORS[38]]:+.1f}%")
+    
+    winners, losers = ranking.index[:2].tolist(), ranking.index[-2:][::-1].tolist()
+    print(f"WINNER: {' & '.join(repr(l) for l in winners)}")
+    for lga in winners:
+        print(f"        - {lga}: {describe(lga)}")
+    print(f"LOSER:  {' & '.join(repr(l) for l in losers)}")
+    for lga in losers:
+        print(f"        - {lga}: {describe(lga)}")
     
     # 3. Executive Brief
     print("\n--- Executive Brief: Recommendations ---")
-    print("1. MACRO: The policy successfully stimulates Investment (+16%), but at specific cost to Equality.")
-    print("2. FISCAL: The 15% revenue hole creates a -9% drag on Public Service headcount by 2030.")
-    print("3. RISK:  Inequality spikes (+6.4%). Recommend pairing with a 'Regional Jobs Fund' to offset.")
+    end = deltas[2030]
+    print(f"1. MACRO: Investment moves {end[7]:+.1f}% by 2030, with Inequality {end[38]:+.1f}%.")
+    print(f"2. FISCAL: A {scenario[9]:+.0f}% revenue shock leaves Tax Revenue {end[9]:+.1f}% "
+          f"and Public Service headcount {end[19]:+.1f}% by 2030.")
+    if end[38] > 5.0:
+        print(f"3. RISK:  Inequality spikes ({end[38]:+.1f}%). Recommend pairing with a 'Regional Jobs Fund' to offset.")
     
     # Risks
     if risks:
@@ -0,0 +1,199 @@
+import pandas as pd
+import numpy as np
+from sqlalchemy import create_engine, text
+import os
+
+from lga_registry import load_lga_registry
+
+# Configuration
+BASE_DIR = os.getcwd()
+DB_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'victoria_sim.db')
+DATABASE_URL = f"sqlite:///{DB_PATH}"
+
+# --- Cohort Layout ---
+# 5-year age bands (last one open), x 2 sexes. Cohort index = sex * N_BANDS + band.
+AGE_BANDS = [f"{a}-{a + 4}" for a in range(0, 85, 5)] + ["85+"]
+N_BANDS = len(AGE_BANDS)
+BAND_MIDPOINTS = np.array([a + 2.5 for a in range(0, 85, 5)] + [90.0])
+SEXES = ["male", "female"]
+
+# --- Demographic Schedules (Victorian-style defaults; no age detail is stored in the DB) ---
+# Age profile of the resident population, % per band (both sexes); tilted to match demographics_deep.median_age
+BASE_AGE_SHARES = np.array([6.0, 6.3, 6.1, 5.8, 6.9, 7.6, 7.7, 7.3, 6.5, 6.4,
+                            6.0, 5.9, 5.4, 4.8, 4.3, 3.1, 2.0, 2.1])
+# Probability of surviving five years, per band (male, female); 85+ is the open band
+FIVE_YEAR_SURVIVAL = np.array([
+    [0.9975, 0.9995, 0.9994, 0.9980, 0.9970, 0.9966, 0.9960, 0.9950, 0.9930,
+     0.9890, 0.9830, 0.9730, 0.9580, 0.9350, 0.8950, 0.8300, 0.7200, 0.5000],
+    [0.9980, 0.9996, 0.9996, 0.9992, 0.9988, 0.9986, 0.9980, 0.9970, 0.9955,
+     0.9930, 0.9890, 0.9830, 0.9730, 0.9570, 0.9300, 0.8800, 0.7900, 0.5800],
+])
+# Annual births per woman by band (15-19 .. 45-49); scaled so natural increase matches demographics_deep
+BASE_FERTILITY = np.zeros(N_BANDS)
+BASE_FERTILITY[3:10] = [0.008, 0.035, 0.085, 0.115, 0.065, 0.013, 0.001]
+SEX_RATIO_AT_BIRTH = 1.05
+# Age profile of net overseas migrants (mostly students and young workers), split evenly by sex
+MIGRANT_AGE_SHARES = np.array([5.0, 4.0, 3.0, 7.0, 20.0, 22.0, 14.0, 8.0, 5.0, 3.0,
+                               2.0, 2.0, 2.0, 1.5, 0.5, 0.5, 0.3, 0.2])
+
+DEFAULT_HORIZON = 50
+
+# --- Schedules ---
+def age_structure(median_age: float = None):
+    """(2, N_BANDS) population shares, exponentially tilted so the median age matches."""
+    shares = BASE_AGE_SHARES / BASE_AGE_SHARES.sum()
+    if median_age is not None:
+        def median(k):
+            w = shares * np.exp(k * BAND_MIDPOINTS)
+            cdf = np.cumsum(w / w.sum())
+            i = np.searchsorted(cdf, 0.5)
+            prev = cdf[i - 1] if i else 0.0
+            return i * 5 + 5 * (0.5 - prev) / (cdf[i] - prev)
+        lo, hi = -0.1, 0.1
+        for _ in range(60):
+            mid = 0.5 * (lo + hi)
+            lo, hi = (mid, hi) if median(mid) < median_age else (lo, mid)
+        shares = shares * np.exp(0.5 * (lo + hi) * BAND_MIDPOINTS)
+        shares /= shares.sum()
+    female = 0.5 + 0.1 * np.clip((BAND_MIDPOINTS - 60) / 30, 0, 1)  # Women outnumber men at older ages
+    return np.stack([shares * (1 - female), shares * female])
+
+def transition_matrix(fertility_scale: float = 1.0):
+    """
+    Annual Leslie-style projection matrix (cohort x cohort), laid out [to, from].
+    With 5-year bands stepped yearly, a fifth of each band's survivors ages into the next band.
+    """
+    n = 2 * N_BANDS
+    L = np.zeros((n, n))
+    annual = FIVE_YEAR_SURVIVAL ** 0.2
+    for sex in range(2):
+        off = sex * N_BANDS
+        band = np.arange(N_BANDS - 1)
+        L[off + band, off + band] = annual[sex, :-1] * 0.8
+        L[off + band + 1, off + band] = annual[sex, :-1] * 0.2
+        L[off + N_BANDS - 1, off + N_BANDS - 1] = annual[sex, -1]
+    births = BASE_FERTILITY * fertility_scale
+    L[0, N_BANDS:] += births * SEX_RATIO_AT_BIRTH / (1 + SEX_RATIO_AT_BIRTH)
+    L[N_BANDS, N_BANDS:] += births / (1 + SEX_RATIO_AT_BIRTH)
+    return L
+
+def calibrate_fertility(structure, natural_increase_rate: float):
+    """Fertility scale at which births - deaths per resident equals the observed natural increase rate."""
+    x = structure.reshape(-1)
+    deaths = x @ (1 - (FIVE_YEAR_SURVIVAL ** 0.2).reshape(-1))
+    births = structure[1] @ BASE_FERTILITY
+    return float(np.clip((natural_increase_rate + deaths) / births, 0.3, 3.0))
+
+# --- Projection ---
+class CohortProjection:
+    """
+    Cohort-component projection for every LGA at once: (scenario, LGA, cohort) arrays stepped a year at a
+    time by one batched matmul with the transition matrix, plus net overseas migration shared across LGAs.
+    """
+    def __init__(self, engine=None, base_year: int = None):
+        self.engine = engine or create_engine(DATABASE_URL)
+        with self.engine.connect() as conn:
+            demo = pd.read_sql(text("SELECT year, net_overseas_migration, median_age, natural_increase "
+                                    "FROM demographics_deep ORDER BY year"), conn)
+            state_pop = pd.read_sql(text("SELECT year, population_millions FROM economic_indicators ORDER BY year"), conn)
+            if base_year is None:
+                base_year = conn.execute(text("SELECT MAX(year) FROM lga_stats")).scalar()
+
+        self.base_year = int(base_year)
+        registry = load_lga_registry(self.engine, self.base_year)
+        registry = registry[registry['population'] > 0].reset_index(drop=True)
+        self.lgas = registry['lga_name'].tolist()
+        self.base_population = registry['population'].to_numpy(dtype=float)
+
+        latest = demo[demo['year'] <= self.base_year].iloc[-1]
+        pop_row = state_pop[state_pop['year'] <= self.base_year]
+        self.state_population = float(pop_row['population_millions'].iloc[-1]) * 1e6 if len(pop_row) \
+            else self.base_population.sum()
+        self.nom = float(latest['net_overseas_migration'])
+        self.structure = age_structure(float(latest['median_age']))
+        self.fertility_scale = calibrate_fertility(self.structure, latest['natural_increase'] / self.state_population)
+
+        migrants = MIGRANT_AGE_SHARES / MIGRANT_AGE_SHARES.sum()
+        self.migrant_profile = np.concatenate([migrants, migrants]) / 2.0
+
+    def project(self, horizon: int = DEFAULT_HORIZON, scenarios: dict = None):
+        """
+        scenarios: {name: settings}, settings keys (all optional):
+            'nom': statewide net overseas migration per year (scalar or per-year sequence; default latest),
+            'nom_scale': multiplier on nom, 'fertility_scale': multiplier on calibrated fertility,
+            'lga_share': {lga_name: relative weight} of where migrants settle (default: population share).
+        Returns dict with 'population' shaped (scenario, year, LGA, sex, band) and axis labels.
+        """
+        scenarios = scenarios or {"baseline": {}}
+        names = list(scenarios)
+        n_s, n_l, n_c = len(names), len(self.lgas), 2 * N_BANDS
+
+        L = np.stack([transition_matrix(self.fertility_scale * cfg.get('fertility_scale', 1.0))
+                      for cfg in scenarios.values()])
+        nom = np.stack([np.broadcast_to(np.asarray(cfg.get('nom', self.nom), dtype=float), (horizon,))
+                        * cfg.get('nom_scale', 1.0) for cfg in scenarios.values()])
+        share = np.stack([self._settlement(cfg.get('lga_share')) for cfg in scenarios.values()])
+        # (scenario, year, LGA, cohort) arrivals
+        arrivals = nom[:, :, None, None] * share[:, None, :, None] * self.migrant_profile
+
+        pop = np.empty((n_s, horizon + 1, n_l, n_c))
+        pop[:, 0] = self.base_population[:, None] * self.structure.reshape(-1)
+        LT = L.transpose(0, 2, 1)
+        for t in range(horizon):
+            pop[:, t + 1] = np.maximum(pop[:, t] @ LT + arrivals[:, t], 0.0)
+
+        return {
+            "scenarios": names,
+            "years": list(range(self.base_year, self.base_year + horizon + 1)),
+            "lgas": list(self.lgas),
+            "population": pop.reshape(n_s, horizon + 1, n_l, 2, N_BANDS),
+        }
+
+    def _settlement(self, weights: dict = None):
+        """Share of statewide migrants settling in each LGA."""
+        if weights is None:
+            return self.base_population / self.state_population
+        w = np.array([weights.get(lga, 0.0) for lga in self.lgas], dtype=float)
+        return w / w.sum() * (self.base_population.sum() / self.state_population) if w.sum() > 0 else w
+
+def totals(result, scenario: str = None):
+    """Long (lga_name, year, population) for one scenario (default the first)."""
+    s = result['scenarios'].index(scenario) if scenario else 0
+    pop = result['population'][s].sum(axis=(2, 3))
+    years, lgas = result['years'], result['lgas']
+    return pd.DataFrame({
+        "lga_name": np.tile(lgas, len(years)),
+        "year": np.repeat(years, len(lgas)),
+        "population": pop.reshape(-1).round().astype(int),
+    })
+
+def population_in(result, year: int, scenario: str = None):
+    """{lga_name: population} for one projected year (e.g. for RegionalSimulation)."""
+    table = totals(result, scenario)
+    row = table[table['year'] == year]
+    return dict(zip(row['lga_name'], row['population']))
+
+if __name__ == "__main__":
+    import time
+
+    proj = CohortProjection()
+    scenarios = {"baseline": {}, "high_migration": {"nom_scale": 1.5}, "low_migration": {"nom_scale": 0.5}}
+
+    t0 = time.perf_counter()
+    res = proj.project(DEFAULT_HORIZON, scenarios)
+    elapsed = time.perf_counter() - t0
+    print(f"--- Cohort Projection: {len(res['lgas'])} LGAs x {DEFAULT_HORIZON} years x {len(scenarios)} scenarios "
+          f"({elapsed * 1000:.1f} ms), fertility scale {proj.fertility_scale:.2f} ---")
+
+    final = res['years'][-1]
+    summary = pd.DataFrame({
+        name: totals(res, name).pivot(index='lga_name', columns='year', values='population')[[proj.base_year, 2035, final]].stack()
+        for name in scenarios
+    }).unstack()
+    print(summary.to_string())
+
+    # Feed the friction model with the projected residents
+    from state_model import VictoriaState
+    friction = VictoriaState().get_friction_table(population=totals(res))
+    print("\n--- Commute stress, 2035 (projected residents) ---")
+    print(friction.xs(2035, level='year')[['residents', 'jobs_ratio', 'commute_stress_score']].to_string())
@@ -0,0 +1,262 @@
+import pandas as pd
+import numpy as np
+from sqlalchemy import inspect, text
+import os
+
+from policy_simulation import SimulationEngine, INDICATORS
+from lga_registry import load_lga_registry
+from spatial_weights import load_spatial_weights, align_weights
+
+# Configuration
+BASE_DIR = os.getcwd()
+DB_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'victoria_sim.db')
+DATABASE_URL = f"sqlite:///{DB_PATH}"
+
+# --- Regional Exposure Model ---
+# Each LGA's sensitivity to an indicator = 1 + sum(loading * z-scored feature),
+# then rescaled so the population-weighted state mean stays at 1.0.
+# Features come from land_use_zones, employment_hubs and housing_diversity.
+SENSITIVITY_LOADINGS = {
+    5: {"comm_share": 0.3, "jobs_per_resident": 0.2},                      # Biz confidence follows commercial density
+    7: {"comm_share": 0.3, "ind_share": 0.2, "jobs_per_resident": 0.2},    # Investment lands in job centres
+    9: {"comm_share": 0.2, "jobs_per_resident": 0.2},                      # Payroll base sits where the jobs are
+    19: {"jobs_per_resident": -0.2, "res_share": 0.1},                     # Regional/dormitory areas lean on public jobs
+    21: {"res_share": 0.3, "jobs_per_resident": -0.2},                     # Out-commuting suburbs feel congestion
+    34: {"res_share": 0.1, "apartment_pct": 0.1},
+    38: {"comm_share": 0.2, "apartment_pct": 0.2},                         # Capital gains concentrate in dense cores
+    41: {"ind_share": 0.4},                                                # Industrial zoning drives PM2.5
+}
+
+# Simulation indicator -> temporal_stats category_id with the same meaning
+BASELINE_CATEGORIES = {1: 1, 11: 11, 38: 34, 41: 41}
+
+# Count/dollar indicators: state totals are shared out by LGA population
+EXTENSIVE_INDICATORS = {7, 9, 19, 34}
+
+FEATURES = ["comm_share", "ind_share", "res_share", "jobs_per_resident", "apartment_pct"]
+
+# Direction in which a rise counts as a "win" for residents (used for the winners/losers ranking)
+WELLBEING_WEIGHTS = {5: 0.5, 7: 1.0, 19: 1.0, 21: -0.5, 34: -0.5, 38: -1.0, 41: -0.5}
+
+class RegionalSimulation:
+    """
+    Runs the interaction graph for every LGA at once as an (sample x LGA x year x indicator) tensor.
+    """
+    def __init__(self, sim: SimulationEngine = None, year: int = 2026, spatial_weights: dict = None,
+                 population: dict = None):
+        """population: optional {lga_name: residents} (e.g. population_projection.population_in) replacing lga_stats."""
+        self.sim = sim or SimulationEngine()
+        self.engine = self.sim.engine
+        self.graph = self.sim.graph
+        self.year = year
+
+        self.lgas = load_lga_registry(self.engine, year)
+        if population:
+            self.lgas['population'] = self.lgas['lga_name'].map(population).fillna(self.lgas['population'])
+        self.features = self.load_features()
+        self.baseline = self.load_baseline()
+        self.sensitivity = self.build_sensitivity()
+        self._spatial_weights = spatial_weights
+        self._lag_matrix = None
+
+    def spatial_lag_matrix(self):
+        """
+        Row-standardised distance-decay weights on the registry's LGA order (loaded from cache once).
+        The cache is never built here: a missing one means the ingest hasn't run for this boundary file.
+        """
+        if self._lag_matrix is None:
+            sw = self._spatial_weights
+            if sw is None:
+                try:
+                    sw = load_spatial_weights(build_missing=False)
+                except FileNotFoundError as err:
+                    raise FileNotFoundError(f"spatial_lag needs cached spatial weights: {err}") from err
+            codes = self.lgas['lga_code'].fillna(-1).astype(int).to_numpy()
+            self._lag_matrix = align_weights(sw, codes)
+        return self._lag_matrix
+
+    # --- Inputs ---
+    def load_baseline(self):
+        """
+        (LGA, indicator) starting values. Matching temporal_stats categories use each LGA's latest row;
+        extensive indicators are the state default shared out by lga_stats population; others use state defaults.
+        """
+        ids = self.graph.indicator_ids
+        state = self.sim.get_baseline_2026()
+        baseline = np.tile([float(state.get(mid, 0.0)) for mid in ids], (len(self.lgas), 1))
+
+        pop = self.lgas['population'].to_numpy(dtype=float)
+        if np.nansum(pop) > 0:
+            share = np.nan_to_num(pop) / np.nansum(pop)
+            for mid in EXTENSIVE_INDICATORS & set(ids):
+                baseline[:, self.graph.index[mid]] *= share
+
+        # Databases harmonised before the LGA schema have no per-LGA rows to read
+        columns = {c['name'] for c in inspect(self.engine).get_columns('temporal_stats')} \
+            if inspect(self.engine).has_table('temporal_stats') else set()
+        if not {'lga_code', 'category_id'} <= columns:
+            return baseline
+
+        stats = pd.read_sql(text("""
+            SELECT t.lga_code, t.category_id, t.value
+            FROM temporal_stats t
+            JOIN (SELECT lga_code, category_id, MAX(year) AS year FROM temporal_stats
+                  WHERE year <= :y AND lga_code IS NOT NULL GROUP BY lga_code, category_id) latest
+              ON t.lga_code = latest.lga_code AND t.category_id = latest.category_id AND t.year = latest.year
+        """), self.engine, params={"y": self.year})
+
+        mapped = {mid: cat for mid, cat in BASELINE_CATEGORIES.items() if mid in self.graph.index}
+        if not stats.empty and mapped:
+            grid = stats.pivot_table(index='lga_code', columns='category_id', values='value', aggfunc='mean')
+            grid = grid.reindex(index=self.lgas['lga_code'].astype(float), columns=list(mapped.values()))
+            cols = [self.graph.index[mid] for mid in mapped]
+            observed = grid.to_numpy(dtype=float)
+            baseline[:, cols] = np.where(np.isnan(observed), baseline[:, cols], observed)
+        return baseline
+
+    def load_features(self):
+        """Per-LGA structural features used to derive sensitivities."""
+        with self.engine.connect() as conn:
+            zones = pd.read_sql(text("SELECT lga_name, zone_type, percentage_coverage FROM land_use_zones"), conn)
+            hubs = pd.read_sql(text("SELECT lga_name, SUM(estimated_jobs) AS hub_jobs FROM employment_hubs GROUP BY lga_name"), conn)
+            housing = pd.read_sql(text("""
+                SELECT h.lga_name, h.apartment_pct
+                FROM housing_diversity h
+                JOIN (SELECT lga_name, MAX(year) AS year FROM housing_diversity WHERE year <= :y GROUP BY lga_name) latest
+                  ON h.lga_name = latest.lga_name AND h.year = latest.year
+            """), conn, params={"y": self.year})
+
+        zone_grid = zones.pivot_table(index='lga_name', columns='zone_type', values='percentage_coverage', aggfunc='sum')
+        feats = pd.DataFrame(index=self.lgas['lga_name'])
+        for col, zone in [("comm_share", "Comm"), ("ind_share", "Ind"), ("res_share", "Res")]:
+            feats[col] = zone_grid[zone] / 100.0 if zone in zone_grid else np.nan
+        feats = feats.join(hubs.set_index('lga_name')).join(housing.set_index('lga_name'))
+        # Hub jobs only cover major employment centres; LGAs without one have zero hub jobs
+        pop = self.lgas.set_index('lga_name')['population']
+        feats['jobs_per_resident'] = feats['hub_jobs'].fillna(0) / pop
+        return feats[FEATURES]
+
+    def build_sensitivity(self):
+        """(LGA, indicator) multipliers on transmitted effects."""
+        ids = self.graph.indicator_ids
+        values = self.features.to_numpy(dtype=float)
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0)
+        std[~(std > 0)] = 1.0
+        # Missing features sit at the state mean (z = 0); outliers (the CBD) are capped at 2 sd
+        z = np.clip(np.nan_to_num((values - mean) / std), -2.0, 2.0)
+
+        loadings = np.zeros((len(FEATURES), len(ids)))
+        for mid, weights in SENSITIVITY_LOADINGS.items():
+            if mid in self.graph.index:
+                for feat, w in weights.items():
+                    loadings[FEATURES.index(feat), self.graph.index[mid]] = w
+
+        sens = np.clip(1.0 + z @ loadings, 0.25, 2.5)
+
+        weights = self.lgas['population'].fillna(0).to_numpy(dtype=float)
+        if weights.sum() <= 0:
+            weights = np.ones(len(weights))
+        sens /= (weights @ sens) / weights.sum()
+        return sens
+
+    # --- Simulation ---
+    def run(self, policy_deltas: dict, start_year: int = 2026, end_year: int = 2030,
+            samples: int = 0, noise: float = 0.15, seed: int = None, spatial_lag: float = 0.0, schedule=None):
+        """
+        policy_deltas: {ID: %_change_immediate} applied statewide, scaled by each LGA's exposure.
+        samples: Monte Carlo draws (0 = deterministic). Each draw perturbs the sensitivities
+                 with lognormal noise of scale `noise`.
+        spatial_lag: rho in (1 - rho) * effect + rho * W @ effect: each year's ripples become a weighted
+                     average of an LGA's own and its neighbours', so spillover redistributes rather
+                     than amplifies them (0 = LGAs evolve independently; LGAs without neighbours keep
+                     their whole effect).
+        schedule: optional (LGA, year, indicator) step changes already resolved per LGA (e.g.
+                  ProjectTimeline.schedule), added on top of the policy shock. With samples=0 a
+                  leading (portfolio, ...) axis runs each portfolio as its own deterministic row;
+                  sampling takes a single portfolio.
+        Returns dict with 'deviation' and 'levels' arrays shaped (sample, LGA, year, indicator).
+        """
+        horizon = end_year - start_year
+        shock = self.graph.vector(policy_deltas)
+        n_lga, n_ind = self.sensitivity.shape
+
+        draws = max(samples, 1)
+        if schedule is not None:
+            schedule = np.asarray(schedule, dtype=float)
+            if schedule.ndim == 4 and not samples:
+                draws = schedule.shape[0]
+            elif schedule.ndim == 4 and schedule.shape[0] > 1:
+                raise ValueError(f"A schedule with {schedule.shape[0]} portfolios runs deterministically only; "
+                                 f"pass samples=0, or one portfolio at a time with samples={samples}")
+        sens = np.broadcast_to(self.sensitivity, (draws, n_lga, n_ind))
+        if samples:
+            rng = np.random.default_rng(seed)
+            sens = sens * rng.lognormal(-0.5 * noise ** 2, noise, size=sens.shape)
+
+        mix = None
+        if spatial_lag:
+            lag_matrix = self.spatial_lag_matrix()
+            # Share each LGA keeps: 1 - rho, or all of it when it has no neighbours to spill into
+            keep = np.tile(1.0 - spatial_lag * np.asarray(lag_matrix.sum(axis=1)).ravel(), draws)[:, None]
+
+            def mix(effect):
+                # (sample*LGA, N) -> (LGA, sample*N) so one sparse multiply covers every draw
+                by_lga = effect.reshape(draws, n_lga, n_ind).transpose(1, 0, 2).reshape(n_lga, -1)
+                spill = (lag_matrix @ by_lga).reshape(n_lga, draws, n_ind).transpose(1, 0, 2)
+                return keep * effect + spatial_lag * spill.reshape(draws * n_lga, n_ind)
+
+        # Flatten (sample, LGA) into the graph's batch axis
+        flat_sens = sens.reshape(draws * n_lga, n_ind)
+        shocks = shock * flat_sens
+        if schedule is not None:
+            plan = np.broadcast_to(schedule, (draws, n_lga, horizon + 1, n_ind))
+            shocks = plan.reshape(draws * n_lga, horizon + 1, n_ind).copy()
+            shocks[:, 0] += shock * flat_sens
+        deviation = self.graph.propagate(shocks, horizon, sensitivity=flat_sens, mix=mix)
+        deviation = deviation.reshape(draws, n_lga, horizon + 1, n_ind)
+
+        levels = self.baseline[None, :, None, :] * (1 + deviation / 100.0)
+        return {
+            "lgas": self.lgas['lga_name'].tolist(),
+            "years": list(range(start_year, end_year + 1)),
+            "indicator_ids": list(self.graph.indicator_ids),
+            "deviation": deviation,
+            "levels": levels,
+        }
+
+    def summarise(self, result, year: int = None):
+        """Final-year (or given year) deviation per LGA x indicator: mean, and P5/P95 when sampled."""
+        t = result['years'].index(year) if year else -1
+        dev = result['deviation'][:, :, t, :]
+        names = [INDICATORS.get(mid, str(mid)) for mid in result['indicator_ids']]
+        frames = {"mean": dev.mean(axis=0)}
+        if dev.shape[0] > 1:
+            frames["p5"] = np.percentile(dev, 5, axis=0)
+            frames["p95"] = np.percentile(dev, 95, axis=0)
+        return pd.concat(
+            {k: pd.DataFrame(v, index=result['lgas'], columns=names) for k, v in frames.items()}, axis=1
+        )
+
+    def rank_lgas(self, result, year: int = None):
+        """Wellbeing score per LGA (weighted final-year deviations), best first."""
+        t = result['years'].index(year) if year else -1
+        dev = result['deviation'][:, :, t, :].mean(axis=0)
+        weights = self.graph.vector({mid: w for mid, w in WELLBEING_WEIGHTS.items() if mid in self.graph.index})
+        score = pd.Series(dev @ weights, index=result['lgas'], name='wellbeing_score')
+        return score.sort_values(ascending=False)
+
+if __name__ == "__main__":
+    import time
+
+    reg = RegionalSimulation()
+    scenario = {9: -15.0, 5: 20.0}
+
+    t0 = time.perf_counter()
+    res = reg.run(scenario, samples=1000, seed=7, spatial_lag=0.2)
+    elapsed = time.perf_counter() - t0
+
+    print(f"--- Regional Simulation: {len(res['lgas'])} LGAs x 1000 samples ({elapsed:.3f}s) ---")
+    print(reg.summarise(res)['mean'].round(1))
+    print("\n--- LGA Ranking (2030) ---")
+    print(reg.rank_lgas(res).round(1))
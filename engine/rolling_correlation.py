@@ -0,0 +1,224 @@
+import pandas as pd
+import numpy as np
+from sqlalchemy import create_engine, text
+import os
+
+from correlation_engine import load_temporal_cube, STATE_REGION, CONSTANT_TOL
+
+# Configuration
+BASE_DIR = os.getcwd()
+DB_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'victoria_sim.db')
+DATABASE_URL = f"sqlite:///{DB_PATH}"
+STATS_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'rolling_corr_stats.npz')
+
+# Sufficient statistics kept per (region, metric pair), as running totals over years
+STAT_KEYS = ("n", "sx", "sxx", "sxy")
+# Stored precision of the running totals. float32 halves the store (~160MB at 80 LGAs x 200 metrics
+# x 51 years); rolling() widens each slice to float64 and scales its constant-series test to this eps.
+STORE_DTYPE = np.float32
+# year_checksums columns, and the multiplier that keys each value by lga_code * KEY + category_id
+CHECKSUM_WIDTH = 4
+CHECKSUM_KEY = 1000
+
+class RollingCorrelationStore:
+    """
+    Prefix sums of pairwise-complete sufficient statistics for every metric pair.
+    prefix[key][r, t] holds totals over the first t years, so any window's correlation is a
+    difference of two rows, and appending a year costs O(metrics^2) regardless of history length.
+
+    For a pair (i, j): n = years both present, sx = sum x_i, sxx = sum x_i^2, sxy = sum x_i x_j
+    (all over years where both are present; the y-side sums are the transposes).
+    Values are shifted by each series' first observation to keep the sums well conditioned.
+    """
+    def __init__(self, regions, metrics, metric_names, shift):
+        self.regions = list(regions)
+        self.metrics = np.asarray(metrics)
+        self.metric_names = list(metric_names)
+        self.shift = np.asarray(shift, dtype=float)  # (R, M)
+        self.years = np.empty(0, dtype=np.int64)
+        # Per stored year: row count, sum, sum of squares and keyed sum of temporal_stats values (see year_checksums)
+        self.checksums = np.empty((0, CHECKSUM_WIDTH))
+        n_reg, n_met = len(self.regions), len(self.metrics)
+        self.prefix = {k: np.zeros((n_reg, 1, n_met, n_met), dtype=STORE_DTYPE) for k in STAT_KEYS}
+
+    @classmethod
+    def from_temporal(cls, temporal):
+        cube = temporal['cube']
+        # First observed value per series (0 for all-NaN series)
+        first = np.argmax(~np.isnan(cube), axis=1)
+        shift = np.nan_to_num(np.take_along_axis(cube, first[:, None, :], axis=1)[:, 0, :])
+        store = cls(temporal['regions'], temporal['metrics'], temporal['metric_names'], shift)
+        store.append(temporal['years'], cube)
+        return store
+
+    @property
+    def last_year(self):
+        return int(self.years[-1]) if len(self.years) else None
+
+    def _contributions(self, rows):
+        """Per-year statistic increments for rows shaped (R, k, M)."""
+        x = rows - self.shift[:, None, :]
+        m = ~np.isnan(x)
+        x = np.where(m, x, 0.0)
+        m = m.astype(float)
+        # Outer products per (region, year): pair (i, j) counts only when both are present
+        return {
+            "n": m[..., :, None] * m[..., None, :],
+            "sx": x[..., :, None] * m[..., None, :],
+            "sxx": (x * x)[..., :, None] * m[..., None, :],
+            "sxy": x[..., :, None] * x[..., None, :],
+        }
+
+    def append(self, years, rows):
+        """
+        Adds or revises years. rows: (R, k, M) aligned with self.regions / self.metrics.
+        New trailing years cost O(k); a revised year re-accumulates from that year onward.
+        """
+        years = np.asarray(years, dtype=np.int64)
+        if not len(years):
+            return
+
+        start = np.searchsorted(self.years, years.min()) if len(self.years) else 0
+        if start < len(self.years):
+            # Revision: rebuild the suffix from the earliest revised year with the stored increments
+            kept_years = self.years[start:]
+            kept = {k: np.diff(v[:, start:].astype(float), axis=1) for k, v in self.prefix.items()}
+            revised = np.isin(kept_years, years)
+            for k in STAT_KEYS:
+                self.prefix[k] = self.prefix[k][:, :start + 1]
+            self.years = self.years[:start]
+            merged_years = np.union1d(kept_years[~revised], years)
+            incoming = self._contributions(rows)
+            steps = {}
+            for k in STAT_KEYS:
+                full = np.zeros((kept[k].shape[0], len(merged_years)) + kept[k].shape[2:])
+                full[:, np.searchsorted(merged_years, kept_years[~revised])] = kept[k][:, ~revised]
+                full[:, np.searchsorted(merged_years, years)] = incoming[k]
+                steps[k] = full
+            years = merged_years
+        else:
+            steps = self._contributions(rows)
+
+        for k in STAT_KEYS:
+            tail = self.prefix[k][:, -1:].astype(float) + np.cumsum(steps[k], axis=1)
+            self.prefix[k] = np.concatenate([self.prefix[k], tail.astype(STORE_DTYPE)], axis=1)
+        self.years = np.concatenate([self.years, years])
+
+    def rolling(self, source, target, window: int = 10, region=STATE_REGION, min_n: int = 3):
+        """
+        Correlation of source vs target over trailing `window`-year windows, one row per window end year.
+        source/target are category_ids.
+        """
+        r_idx = self.regions.index(region)
+        i = int(np.flatnonzero(self.metrics == source)[0])
+        j = int(np.flatnonzero(self.metrics == target)[0])
+        if len(self.years) < window:
+            return pd.DataFrame(columns=['year', 'r', 'n'])
+
+        def window_sum(key, a, b):
+            p = self.prefix[key][r_idx, :, a, b].astype(float)
+            return p[window:] - p[:-window]
+
+        n = window_sum("n", i, j)
+        sx, sy = window_sum("sx", i, j), window_sum("sx", j, i)
+        sxx, syy = window_sum("sxx", i, j), window_sum("sxx", j, i)
+        sxy = window_sum("sxy", i, j)
+
+        cov = n * sxy - sx * sy
+        vx, vy = n * sxx - sx ** 2, n * syy - sy ** 2
+        # Window sums are differences of running totals, so their rounding error scales with the
+        # totals at the window end, not with the window itself
+        tol = max(CONSTANT_TOL, 64 * np.finfo(self.prefix['sxx'].dtype).eps)
+        end_xx = self.prefix['sxx'][r_idx, window:, i, j].astype(float)
+        end_yy = self.prefix['sxx'][r_idx, window:, j, i].astype(float)
+        ok = (vx > tol * n * end_xx) & (vy > tol * n * end_yy) & (n >= min_n)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            r = np.where(ok, cov / np.sqrt(np.maximum(vx * vy, 1e-300)), np.nan)
+
+        return pd.DataFrame({
+            "year": self.years[window - 1:],
+            "r": np.clip(r, -1, 1).round(4),
+            "n": n.astype(int),
+        })
+
+    # --- Persistence ---
+    def save(self, path: str = STATS_PATH):
+        np.savez_compressed(
+            path, regions=np.array([str(r) for r in self.regions]), metrics=self.metrics,
+            metric_names=np.array(self.metric_names), shift=self.shift, years=self.years,
+            checksums=self.checksums, **{f"prefix_{k}": v.astype(STORE_DTYPE) for k, v in self.prefix.items()}
+        )
+
+    @classmethod
+    def load(cls, path: str = STATS_PATH):
+        raw = np.load(path)
+        regions = [r if r == STATE_REGION else int(r) for r in raw['regions'].tolist()]
+        store = cls(regions, raw['metrics'], raw['metric_names'].tolist(), raw['shift'])
+        store.years = raw['years']
+        store.prefix = {k: raw[f"prefix_{k}"] for k in STAT_KEYS}
+        if 'checksums' in raw.files:
+            store.checksums = raw['checksums']
+        return store
+
+def year_checksums(engine):
+    """
+    (years, (T, 4) row count / sum / sum of squares / keyed sum of value) per year of temporal_stats, on
+    the same contiguous year grid as load_temporal_cube (empty years are zeros). The keyed sum weights
+    each value by its (region, metric), so values moved between LGAs or metrics also register. One
+    grouped query; a year whose checksum moved has been revised since the store last saw it.
+    """
+    df = pd.read_sql(text(f"""
+        SELECT year, COUNT(value) AS n, SUM(value) AS s, SUM(value * value) AS ss,
+               SUM(value * (COALESCE(lga_code, 0) * {CHECKSUM_KEY} + category_id)) AS ks
+        FROM temporal_stats GROUP BY year ORDER BY year
+    """), engine).set_index('year')
+    if df.empty:
+        return np.empty(0, dtype=np.int64), np.empty((0, CHECKSUM_WIDTH))
+    years = np.arange(df.index.min(), df.index.max() + 1)
+    return years, df.reindex(years).fillna(0.0).to_numpy(dtype=float)
+
+def sync_rolling_store(engine=None, path: str = STATS_PATH, rebuild: bool = False):
+    """
+    Brings the on-disk store up to date with temporal_stats. Per-year checksums pick out new and
+    revised years, and only years from the earliest of those on are read and re-accumulated, so an
+    ingest that rewrites the table with mostly unchanged history costs little more than its new years.
+    Rebuilds from scratch when asked, or when regions/metrics appear or stored years disappear.
+    """
+    engine = engine or create_engine(DATABASE_URL)
+    store = None if rebuild or not os.path.exists(path) else RollingCorrelationStore.load(path)
+    db_years, sums = year_checksums(engine)
+
+    if store is not None and store.last_year is not None and len(store.checksums) == len(store.years) \
+            and np.isin(store.years, db_years).all():
+        stored = dict(zip(store.years.tolist(), map(tuple, store.checksums)))
+        changed = [y for y, c in zip(db_years.tolist(), map(tuple, sums)) if stored.get(y) != c]
+        if not changed:
+            return store
+        fresh = load_temporal_cube(engine, min_year=min(changed))
+        known = set(store.regions) >= set(fresh['regions']) and set(store.metrics) >= set(fresh['metrics'])
+        if known:
+            # Align the new rows to the store's axes
+            rows = np.full((len(store.regions), len(fresh['years']), len(store.metrics)), np.nan)
+            r_pos = [store.regions.index(r) for r in fresh['regions']]
+            m_pos = [int(np.flatnonzero(store.metrics == m)[0]) for m in fresh['metrics']]
+            rows[np.ix_(r_pos, range(len(fresh['years'])), m_pos)] = fresh['cube']
+            store.append(fresh['years'], rows)
+            store.checksums = sums[np.searchsorted(db_years, store.years)]
+            store.save(path)
+            return store
+
+    temporal = load_temporal_cube(engine)
+    if temporal is None:
+        return None
+    store = RollingCorrelationStore.from_temporal(temporal)
+    store.checksums = sums[np.searchsorted(db_years, store.years)]
+    store.save(path)
+    return store
+
+if __name__ == "__main__":
+    store = sync_rolling_store(rebuild=True)
+    print(f"--- Rolling Correlation Store: {len(store.regions)} regions x {len(store.metrics)} metrics, "
+          f"{store.years[0]}-{store.last_year} ---")
+    src, tgt = store.metrics[0], store.metrics[1]
+    print(f"{store.metric_names[0]} vs {store.metric_names[1]} (10-yr window, statewide)")
+    print(store.rolling(src, tgt, window=10).tail(10).to_string(index=False))
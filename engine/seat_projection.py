@@ -0,0 +1,169 @@
+import pandas as pd
+import numpy as np
+from sqlalchemy import create_engine, text
+import os
+
+from policy_simulation import SimulationEngine
+
+# Configuration
+BASE_DIR = os.getcwd()
+DB_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'victoria_sim.db')
+DATABASE_URL = f"sqlite:///{DB_PATH}"
+
+MAJORITY_SEATS = 45
+
+# --- Swing Model ---
+# Scenario outputs move the ALP primary vote (indicator 11); roughly 80% of a primary
+# shift survives preferences into the two-party count
+ALP_PRIMARY_ID = 11
+TPP_PASS_THROUGH = 0.8
+
+# Uncertainty on top of the modelled swing (two-party points, 1 sd)
+STATE_SWING_SD = 2.0       # Campaign-wide error shared by every seat
+REGION_SWING_SD = 1.5      # Per Legislative Council region...
+REGION_CORRELATION = 0.5   # ...correlated across regions
+SEAT_SWING_SD = 2.5        # Local candidate / sophomore effects
+
+# Crossbench seats aren't ALP v Coalition contests; they stay with the holder
+CROSSBENCH = {"GRN", "IND"}
+
+DEFAULT_DRAWS = 200_000
+DEFAULT_CHUNK = 50_000
+
+def load_districts(engine=None):
+    engine = engine or create_engine(DATABASE_URL)
+    query = "SELECT district_name, region, lga_name, held_by, alp_tpp FROM electoral_districts ORDER BY district_name"
+    return pd.read_sql(text(query), engine)
+
+class SeatProjector:
+    """
+    Monte Carlo seat projection: uniform + per-LGA swings applied to the district two-party table,
+    with correlated regional noise. Elections are simulated in chunks as (draw x district) arrays.
+    """
+    def __init__(self, sim: SimulationEngine = None, districts: pd.DataFrame = None):
+        self.sim = sim or SimulationEngine()
+        self.engine = self.sim.engine
+        self.districts = load_districts(self.engine) if districts is None else districts.reset_index(drop=True)
+        if self.districts.empty:
+            raise ValueError("electoral_districts is empty; run scrapers/electoral_ingest.py first")
+
+        self.tpp = self.districts['alp_tpp'].to_numpy(dtype=np.float32)
+        self.contested = ~self.districts['held_by'].isin(CROSSBENCH).to_numpy()
+        self.regions, self.region_idx = np.unique(self.districts['region'], return_inverse=True)
+
+        n_reg = len(self.regions)
+        cov = REGION_SWING_SD ** 2 * (REGION_CORRELATION + (1 - REGION_CORRELATION) * np.eye(n_reg))
+        self.region_chol = np.linalg.cholesky(cov).astype(np.float32)
+
+    # --- Swings from Scenario Outputs ---
+    def scenario_swing(self, deltas_log: dict, year: int = 2030):
+        """Statewide two-party swing (points) from run_scenario's deltas_log."""
+        base = self.sim.get_baseline_2026()[ALP_PRIMARY_ID]
+        return base * deltas_log[year].get(ALP_PRIMARY_ID, 0.0) / 100.0 * TPP_PASS_THROUGH
+
+    def regional_swings(self, regional, result, year: int = None):
+        """
+        (samples, district) two-party swings from a RegionalSimulation run. Districts take their LGA's
+        swing; districts in LGAs the run doesn't cover take the population-weighted mean of each sample.
+        """
+        t = result['years'].index(year) if year else -1
+        col = result['indicator_ids'].index(ALP_PRIMARY_ID)
+        primary = regional.baseline[:, col] * result['deviation'][:, :, t, col] / 100.0
+        lga_swing = primary * TPP_PASS_THROUGH
+
+        pop = regional.lgas['population'].fillna(0).to_numpy(dtype=float)
+        weights = pop / pop.sum() if pop.sum() > 0 else np.full(len(pop), 1.0 / len(pop))
+        statewide = lga_swing @ weights
+
+        pos = {name: i for i, name in enumerate(result['lgas'])}
+        lookup = self.districts['lga_name'].map(pos)
+        covered = lookup.notna().to_numpy()
+        swings = np.repeat(statewide[:, None], len(self.districts), axis=1)
+        swings[:, covered] = lga_swing[:, lookup[covered].astype(int).to_numpy()]
+        return swings
+
+    # --- Simulation ---
+    def simulate(self, swings=0.0, draws: int = DEFAULT_DRAWS, seed: int = None, chunk: int = DEFAULT_CHUNK):
+        """
+        swings: two-party swing to ALP in points: scalar, (district,) or (samples, district)
+                (e.g. regional_swings); each simulated election draws one sample row.
+        Returns dict with the ALP seat distribution, majority probabilities and per-district win rates.
+        """
+        rng = np.random.default_rng(seed)
+        n_dist = len(self.districts)
+        swings = np.asarray(swings, dtype=np.float32)
+        if swings.ndim < 2:
+            swings = np.broadcast_to(swings, (n_dist,))[None, :]
+        margin0 = self.tpp - 50.0 + swings          # (samples, district)
+        crossbench = int((~self.contested).sum())
+
+        hist = np.zeros(n_dist + 1, dtype=np.int64)
+        wins = np.zeros(n_dist, dtype=np.int64)
+        for start in range(0, draws, chunk):
+            c = min(chunk, draws - start)
+            rows = rng.integers(0, len(margin0), size=c) if len(margin0) > 1 else np.zeros(c, dtype=np.int64)
+            state = rng.standard_normal((c, 1), dtype=np.float32) * STATE_SWING_SD
+            region = rng.standard_normal((c, len(self.regions)), dtype=np.float32) @ self.region_chol.T
+            seat = rng.standard_normal((c, n_dist), dtype=np.float32) * SEAT_SWING_SD
+
+            margin = margin0[rows] + state + region[:, self.region_idx] + seat
+            alp = (margin > 0) & self.contested
+            hist += np.bincount(alp.sum(axis=1), minlength=n_dist + 1)
+            wins += alp.sum(axis=0)
+
+        prob = hist / draws
+        cdf = np.cumsum(prob)
+        seats = np.arange(n_dist + 1)
+        coalition_max = n_dist - crossbench
+        summary = self.districts[['district_name', 'region', 'held_by', 'alp_tpp']].copy()
+        summary['swing'] = swings.mean(axis=0)
+        summary['alp_win_prob'] = wins / draws
+        return {
+            "draws": draws,
+            "seat_distribution": pd.Series(prob, index=pd.Index(seats, name='alp_seats')),
+            "expected_seats": float(seats @ prob),
+            "p5": int(np.searchsorted(cdf, 0.05)),
+            "p50": int(np.searchsorted(cdf, 0.5)),
+            "p95": int(np.searchsorted(cdf, 0.95)),
+            "majority_probability": float(prob[MAJORITY_SEATS:].sum()),
+            # Coalition holds every contested seat ALP doesn't
+            "coalition_majority_probability": float(prob[:max(coalition_max - MAJORITY_SEATS + 1, 0)].sum()),
+            "districts": summary,
+        }
+
+    def project_scenario(self, policy_deltas: dict, year: int = 2030, draws: int = DEFAULT_DRAWS, seed: int = None):
+        """run_scenario -> statewide swing -> seat distribution."""
+        _, deltas_log = self.sim.run_scenario(policy_deltas, trace=False)
+        return self.simulate(self.scenario_swing(deltas_log, year), draws, seed)
+
+def describe(projection):
+    return (f"ALP seats: mean {projection['expected_seats']:.1f} (90% {projection['p5']}-{projection['p95']}), "
+            f"P(ALP majority) {projection['majority_probability']:.1%}, "
+            f"P(Coalition majority) {projection['coalition_majority_probability']:.1%}")
+
+if __name__ == "__main__":
+    import time
+    from regional_simulation import RegionalSimulation
+
+    proj = SeatProjector()
+    scenario = {9: -15.0, 5: 20.0}
+
+    t0 = time.perf_counter()
+    base = proj.simulate(0.0, seed=2026)
+    print(f"--- Seat Projection: {base['draws']:,} elections x {len(proj.districts)} districts "
+          f"({time.perf_counter() - t0:.2f}s) ---")
+    print(f"No swing:            {describe(base)}")
+
+    _, deltas = proj.sim.run_scenario(scenario, trace=False)
+    swing = proj.scenario_swing(deltas)
+    print(f"Scenario ({swing:+.1f} pts): {describe(proj.simulate(swing, seed=2026))}")
+
+    regional = RegionalSimulation(proj.sim)
+    res = regional.run(scenario, samples=500, seed=2026)
+    local = proj.simulate(proj.regional_swings(regional, res), seed=2026)
+    print(f"Per-LGA swings:      {describe(local)}")
+
+    marginal = local['districts']
+    marginal = marginal[(marginal['alp_win_prob'] > 0.1) & (marginal['alp_win_prob'] < 0.9)]
+    print("\nSeats in play:")
+    print(marginal.sort_values('alp_win_prob').round(2).to_string(index=False))
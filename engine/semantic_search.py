@@ -0,0 +1,298 @@
+import pandas as pd
+import numpy as np
+from sqlalchemy import create_engine, inspect, text, bindparam
+from functools import lru_cache
+import hashlib
+import os
+import re
+
+try:
+    import chromadb
+    from chromadb.config import Settings
+    HAS_CHROMA = True
+except ImportError:
+    HAS_CHROMA = False
+
+try:
+    from sentence_transformers import SentenceTransformer
+    HAS_SENTENCE_TRANSFORMERS = True
+except ImportError:
+    HAS_SENTENCE_TRANSFORMERS = False
+
+# Configuration
+BASE_DIR = os.getcwd()
+DB_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'victoria_sim.db')
+DATABASE_URL = f"sqlite:///{DB_PATH}"
+CHROMA_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'chroma')
+INDEX_DIR = os.path.join(BASE_DIR, 'data', 'processed')
+
+# --- Searchable Sources ---
+# Each query returns source_id, year, title and text. Add policy documents etc. here as they land.
+SOURCES = {
+    "political_events": """
+        SELECT id AS source_id, year, event_name AS title,
+               event_name || '. ' || COALESCE(summary, '') AS text
+        FROM political_events
+    """,
+}
+
+EMBED_BATCH = 256
+# Local sentence-transformers model directory (e.g. a saved all-MiniLM-L6-v2). Loaded offline only:
+# when the package or the directory is missing, search falls back to the lexical HashingEmbedder.
+SENTENCE_MODEL_PATH = os.path.join(BASE_DIR, 'data', 'models', 'all-MiniLM-L6-v2')
+SQL_CHUNK = 500  # SQLite bound-parameter batches
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is", "it", "its",
+    "of", "on", "or", "that", "the", "to", "was", "were", "with", "after", "but", "due", "like",
+}
+
+def _tokens(text_value: str):
+    words = [w for w in re.findall(r"[a-z0-9]+", text_value.lower()) if w not in STOPWORDS]
+    # Light suffix stripping so 'abolishing'/'abolished' and 'fires'/'fire' share features
+    words = [re.sub(r"(ing|ed)$", "", w) if len(w) > 5 else w for w in words]
+    return [w[:-1] if len(w) > 3 and w.endswith('s') and not w.endswith('ss') else w for w in words]
+
+@lru_cache(maxsize=200_000)
+def _bucket(feature: str, dim: int):
+    digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), 'little')
+    return digest % dim, 1.0 if (digest >> 63) & 1 else -1.0
+
+class HashingEmbedder:
+    """
+    Lexical fallback for installs without sentence-transformers: signed feature hashing of word
+    unigrams, bigrams and character 4-grams (down-weighted, so 'bushfire' still lands near 'fires'),
+    sublinear tf, L2-normalised. It matches shared words and word pieces, not meaning: 'premier
+    resigns' won't find 'leadership spill' unless the texts share terms.
+    Deterministic across processes (blake2b, not Python's salted hash()), so cached vectors stay valid.
+
+    Any callable taking a list of strings and returning an (n, dim) float array can replace it;
+    give it a distinct `name` so caches and indexes don't mix.
+    """
+    def __init__(self, dim: int = 1024, char_weight: float = 0.3):
+        self.dim = dim
+        self.char_weight = char_weight
+        self.name = f"hashing-v1-{dim}-{char_weight:g}"
+
+    def __call__(self, texts):
+        rows, cols, vals = [], [], []
+        for i, doc in enumerate(texts):
+            words = _tokens(doc)
+            feats = [(w, 1.0) for w in words] + [(f"{a} {b}", 1.0) for a, b in zip(words, words[1:])]
+            for w in words:
+                padded = f"<{w}>"
+                feats += [("#" + padded[j:j + 4], self.char_weight) for j in range(max(len(padded) - 3, 1))]
+            for feat, weight in feats:
+                col, sign = _bucket(feat, self.dim)
+                rows.append(i)
+                cols.append(col)
+                vals.append(sign * weight)
+
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(out, (np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)), vals)
+        out = np.sign(out) * np.log1p(np.abs(out))
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.where(norms > 0, norms, 1.0)
+
+class SentenceTransformerEmbedder:
+    """
+    Semantic embeddings from a sentence-transformers model saved on disk, L2-normalised for cosine
+    search. Never downloads: the model must already be at `path`.
+    """
+    def __init__(self, path: str = SENTENCE_MODEL_PATH):
+        self.model = SentenceTransformer(path, local_files_only=True)
+        self.name = f"st-{os.path.basename(os.path.normpath(path))}"
+
+    def __call__(self, texts):
+        return self.model.encode(list(texts), batch_size=EMBED_BATCH, normalize_embeddings=True,
+                                 convert_to_numpy=True).astype(np.float32)
+
+def default_embedder():
+    """The local sentence-transformers model when it and the package are present, else HashingEmbedder."""
+    if HAS_SENTENCE_TRANSFORMERS and os.path.isdir(SENTENCE_MODEL_PATH):
+        return SentenceTransformerEmbedder()
+    return HashingEmbedder()
+
+def text_hash(text_value: str):
+    return hashlib.sha256(text_value.encode('utf-8')).hexdigest()
+
+# --- Embedding Cache (embedding_cache table) ---
+def cached_embeddings(texts, embedder, engine=None):
+    """
+    (n, dim) float32 vectors for texts. Looks up (model, text_hash) in embedding_cache and only
+    embeds the misses, in batches, writing them back. Unchanged text is never re-embedded.
+    """
+    engine = engine or create_engine(DATABASE_URL)
+    hashes = [text_hash(t) for t in texts]
+    unique = list(dict.fromkeys(hashes))
+    found = {}
+
+    if inspect(engine).has_table('embedding_cache'):
+        query = text("""
+            SELECT text_hash, vector FROM embedding_cache
+            WHERE model = :m AND text_hash IN :h
+        """).bindparams(bindparam('h', expanding=True))
+        with engine.connect() as conn:
+            for i in range(0, len(unique), SQL_CHUNK):
+                for h, blob in conn.execute(query, {"m": embedder.name, "h": unique[i:i + SQL_CHUNK]}):
+                    found[h] = np.frombuffer(blob, dtype=np.float32)
+
+    missing = [h for h in unique if h not in found]
+    if missing:
+        text_for = dict(zip(hashes, texts))
+        fresh = []
+        for i in range(0, len(missing), EMBED_BATCH):
+            batch = missing[i:i + EMBED_BATCH]
+            vectors = np.asarray(embedder([text_for[h] for h in batch]), dtype=np.float32)
+            found.update(zip(batch, vectors))
+            fresh.append(pd.DataFrame({
+                "model": embedder.name, "text_hash": batch,
+                "dim": vectors.shape[1], "vector": [v.tobytes() for v in vectors],
+            }))
+        pd.concat(fresh).to_sql('embedding_cache', engine, if_exists='append', index=False)
+
+    return np.stack([found[h] for h in hashes]) if hashes else np.empty((0, 0), dtype=np.float32)
+
+# --- Vector Indexes ---
+class NumpyIndex:
+    """Brute-force cosine index persisted as .npz; used when chromadb isn't installed."""
+    def __init__(self, name: str):
+        self.path = os.path.join(INDEX_DIR, f"semantic_index_{name}.npz")
+        self._mtime = None
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.path):
+            raw = np.load(self.path, allow_pickle=False)
+            self.ids = raw['ids'].tolist()
+            self.meta = pd.DataFrame({k: raw[k] for k in ('source', 'source_id', 'year', 'title', 'text_hash')})
+            self.vectors = raw['vectors']
+            self._mtime = os.path.getmtime(self.path)
+        else:
+            self.ids, self.vectors = [], np.empty((0, 0), dtype=np.float32)
+            self.meta = pd.DataFrame(columns=['source', 'source_id', 'year', 'title', 'text_hash'])
+
+    def existing(self):
+        return dict(zip(self.ids, self.meta['text_hash']))
+
+    def replace(self, ids, vectors, meta):
+        """The fallback index is small enough to rewrite whole; vectors come from the cache."""
+        self.ids, self.vectors, self.meta = list(ids), vectors, meta.reset_index(drop=True)
+        np.savez(self.path, ids=np.array(self.ids, dtype=str), vectors=vectors,
+                 **{k: self.meta[k].to_numpy(dtype=str if k in ('source', 'title', 'text_hash') else np.int64)
+                    for k in self.meta.columns})
+
+    def query(self, vector, k: int, source: str = None):
+        if os.path.exists(self.path) and os.path.getmtime(self.path) != self._mtime:
+            self._load()
+        if not self.ids:
+            return pd.DataFrame(columns=['doc_id', 'source', 'source_id', 'year', 'title', 'score'])
+        scores = self.vectors @ vector
+        if source is not None:
+            scores = np.where(self.meta['source'].to_numpy() == source, scores, -np.inf)
+        k = min(k, int(np.isfinite(scores).sum()))
+        top = np.argpartition(-scores, k - 1)[:k] if k else np.empty(0, dtype=int)
+        top = top[np.argsort(-scores[top])]
+        out = self.meta.iloc[top][['source', 'source_id', 'year', 'title']].copy()
+        out.insert(0, 'doc_id', [self.ids[i] for i in top])
+        out['score'] = scores[top]
+        return out.reset_index(drop=True)
+
+class ChromaIndex:
+    """Persistent chromadb collection at data/processed/chroma, fed precomputed embeddings."""
+    def __init__(self, name: str):
+        client = chromadb.PersistentClient(path=CHROMA_PATH, settings=Settings(anonymized_telemetry=False))
+        self.collection = client.get_or_create_collection(
+            name=f"docs-{name}", metadata={"hnsw:space": "cosine"}, embedding_function=None
+        )
+
+    def existing(self):
+        got = self.collection.get(include=['metadatas'])
+        return {i: m.get('text_hash') for i, m in zip(got['ids'], got['metadatas'])}
+
+    def upsert(self, ids, vectors, meta):
+        for i in range(0, len(ids), EMBED_BATCH):
+            chunk = meta.iloc[i:i + EMBED_BATCH]
+            self.collection.upsert(
+                ids=list(ids[i:i + EMBED_BATCH]),
+                embeddings=vectors[i:i + EMBED_BATCH].tolist(),
+                metadatas=[{"source": r.source, "source_id": int(r.source_id), "year": int(r.year),
+                            "title": r.title, "text_hash": r.text_hash} for r in chunk.itertuples()],
+            )
+
+    def delete(self, ids):
+        if ids:
+            self.collection.delete(ids=list(ids))
+
+    def query(self, vector, k: int, source: str = None):
+        res = self.collection.query(
+            query_embeddings=[vector.tolist()], n_results=k,
+            where={"source": source} if source else None, include=['metadatas', 'distances'],
+        )
+        meta = pd.DataFrame(res['metadatas'][0], columns=['source', 'source_id', 'year', 'title'])
+        meta.insert(0, 'doc_id', res['ids'][0])
+        meta['score'] = 1.0 - np.asarray(res['distances'][0], dtype=float)
+        return meta
+
+class SemanticIndex:
+    """
+    Semantic retrieval over SOURCES (event summaries now, policy documents later).
+    embedder: any callable list[str] -> (n, dim) array with a `name`; defaults to default_embedder().
+    """
+    def __init__(self, embedder=None, engine=None, use_chroma: bool = HAS_CHROMA):
+        self.embedder = embedder or default_embedder()
+        self.engine = engine or create_engine(DATABASE_URL)
+        self.index = ChromaIndex(self.embedder.name) if use_chroma else NumpyIndex(self.embedder.name)
+
+    def load_documents(self):
+        frames = []
+        for source, query in SOURCES.items():
+            if inspect(self.engine).has_table(source):
+                frames.append(pd.read_sql(text(query), self.engine).assign(source=source))
+        if not frames:
+            return pd.DataFrame(columns=['doc_id', 'source', 'source_id', 'year', 'title', 'text', 'text_hash'])
+        docs = pd.concat(frames, ignore_index=True)
+        docs['year'] = docs['year'].fillna(0).astype(int)
+        docs['title'] = docs['title'].fillna('')
+        docs['text'] = docs['text'].fillna('')
+        docs['doc_id'] = docs['source'] + ':' + docs['source_id'].astype(str)
+        docs['text_hash'] = docs['text'].map(text_hash)
+        return docs
+
+    def sync(self):
+        """
+        Brings the index in line with the source tables: new or edited rows are (cache-)embedded
+        in batches, rows that disappeared are dropped. Returns the number of documents (re)indexed.
+        """
+        docs = self.load_documents()
+        existing = self.index.existing()
+        changed = docs[[existing.get(d) != h for d, h in zip(docs['doc_id'], docs['text_hash'])]]
+        meta_cols = ['source', 'source_id', 'year', 'title', 'text_hash']
+
+        if isinstance(self.index, NumpyIndex):
+            if len(changed) or set(existing) != set(docs['doc_id']):
+                vectors = cached_embeddings(docs['text'].tolist(), self.embedder, self.engine)
+                self.index.replace(docs['doc_id'], vectors, docs[meta_cols])
+            return len(changed)
+
+        if len(changed):
+            vectors = cached_embeddings(changed['text'].tolist(), self.embedder, self.engine)
+            self.index.upsert(changed['doc_id'].tolist(), vectors, changed[meta_cols])
+        self.index.delete(sorted(set(existing) - set(docs['doc_id'])))
+        return len(changed)
+
+    def similar(self, query: str, k: int = 10, source: str = None):
+        """Top-k documents by cosine similarity to free text (e.g. 'abolishing payroll tax')."""
+        vector = np.asarray(self.embedder([query]), dtype=np.float32)[0]
+        return self.index.query(vector, k, source)
+
+def sync_semantic_index(engine=None, embedder=None):
+    return SemanticIndex(embedder, engine).sync()
+
+if __name__ == "__main__":
+    index = SemanticIndex()
+    print(f"--- Semantic Index ({index.embedder.name}, {'chromadb' if HAS_CHROMA else 'numpy'}) ---")
+    print(f"Indexed {index.sync()} new/changed documents; re-sync: {index.sync()}")
+    for q in ["abolishing payroll tax", "bushfire disaster", "leadership change premier resigns"]:
+        print(f"\n'{q}'")
+        print(index.similar(q, k=3)[['year', 'title', 'score']].round(3).to_string(index=False))
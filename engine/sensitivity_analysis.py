@@ -0,0 +1,197 @@
+import pandas as pd
+import numpy as np
+from scipy.stats import qmc
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+from policy_simulation import SimulationEngine, INDICATORS
+
+# --- Factor Ranges ---
+# Every uncertain input varies +/- this fraction around its central value
+DEFAULT_SPREAD = 0.25
+
+START_YEAR, END_YEAR = 2026, 2030
+
+DEFAULT_CHUNK = 256     # Saltelli base rows / Morris trajectories per job
+MORRIS_LEVELS = 4
+
+# --- Worker State ---
+_MODEL = None
+
+def _init_worker(model):
+    global _MODEL
+    _MODEL = model
+
+def _saltelli_chunk(A, B):
+    """f(A), f(B) and f(AB_i) for a block of base rows, shape (rows, d + 2, outputs)."""
+    rows, d = A.shape
+    AB = np.repeat(A[:, None, :], d, axis=1)
+    AB[:, np.arange(d), np.arange(d)] = B
+    points = np.concatenate([A[:, None, :], B[:, None, :], AB], axis=1)
+    return _MODEL.evaluate(points.reshape(-1, d)).reshape(rows, d + 2, -1)
+
+def _trajectory_chunk(points):
+    """Outputs along a block of Morris trajectories, shape (trajectories, d + 1, outputs)."""
+    r, steps, d = points.shape
+    return _MODEL.evaluate(points.reshape(-1, d)).reshape(r, steps, -1)
+
+class ScenarioModel:
+    """
+    run_scenario's end-year levels as a vectorised function of the unit hypercube.
+    Factors: every edge coefficient, every policy delta and (with baseline=True) every baseline
+    value, each spread uniformly around its current value. evaluate() is one batched propagate call.
+    baseline=False scores the % deviations instead of levels.
+    """
+    def __init__(self, sim: SimulationEngine, policy_deltas: dict, spread: float = DEFAULT_SPREAD,
+                 baseline: bool = True, start_year: int = START_YEAR, end_year: int = END_YEAR):
+        graph = sim.graph
+        self.graph = graph
+        self.horizon = end_year - start_year
+        base = sim.get_baseline_2026()
+        self.outputs = [mid for mid in graph.indicator_ids if mid in base]
+        self.out_pos = np.array([graph.index[mid] for mid in self.outputs], dtype=np.int64)
+
+        names, centre = [], []
+        for src, tgt, lag, coef in zip(graph.edges['source_id'], graph.edges['target_id'],
+                                       graph.edges['lag_years'], graph.edge_coef):
+            names.append(f"edge {src}->{tgt} (lag {lag})")
+            centre.append(coef)
+        self.edge_cols = np.arange(len(graph.edge_coef))
+
+        self.shock_pos = np.array([graph.index[mid] for mid in policy_deltas], dtype=np.int64)
+        self.shock_cols = np.arange(len(policy_deltas)) + len(names)
+        names += [f"delta {mid}" for mid in policy_deltas]
+        centre += list(policy_deltas.values())
+
+        self.base_cols = np.arange(len(self.outputs)) + len(names) if baseline else None
+        if baseline:
+            names += [f"baseline {mid}" for mid in self.outputs]
+            centre += [base[mid] for mid in self.outputs]
+
+        centre = np.array(centre, dtype=float)
+        bounds = np.sort(np.stack([centre * (1 - spread), centre * (1 + spread)]), axis=0)
+        self.factors = names
+        self.lower, self.upper = bounds
+
+    @property
+    def dims(self):
+        return len(self.factors)
+
+    def evaluate(self, unit):
+        """(M, d) points in [0, 1]^d -> (M, outputs) end-year levels (or % deviations)."""
+        X = self.lower + unit * (self.upper - self.lower)
+        shocks = np.zeros((len(X), len(self.graph.indicator_ids)))
+        shocks[:, self.shock_pos] = X[:, self.shock_cols]
+        deviation = self.graph.propagate(shocks, self.horizon, coefficients=X[:, self.edge_cols])[:, -1, self.out_pos]
+        if self.base_cols is None:
+            return deviation
+        return X[:, self.base_cols] * (1.0 + deviation / 100.0)
+
+class SensitivityAnalysis:
+    """
+    Global sensitivity of run_scenario's end-year outcomes to the interaction coefficients,
+    policy deltas and baseline. Designs are evaluated in chunks, in-process or over a process pool.
+    """
+    def __init__(self, policy_deltas: dict, sim: SimulationEngine = None, spread: float = DEFAULT_SPREAD,
+                 baseline: bool = True):
+        self.sim = sim or SimulationEngine()
+        self.model = ScenarioModel(self.sim, policy_deltas, spread, baseline)
+
+    def _map(self, func, jobs, workers: int):
+        if workers:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self.model,)) as pool:
+                return list(pool.map(func, *zip(*jobs)))
+        _init_worker(self.model)
+        return [func(*job) for job in jobs]
+
+    def _frame(self, columns: dict):
+        """Long table: one row per (output, factor) from (d, outputs) arrays."""
+        d, k = len(self.model.factors), len(self.model.outputs)
+        frame = pd.DataFrame({
+            "output": np.tile([INDICATORS.get(mid, str(mid)) for mid in self.model.outputs], d),
+            "factor": np.repeat(self.model.factors, k),
+        })
+        for name, values in columns.items():
+            frame[name] = values.reshape(-1)
+        return frame
+
+    # --- Sobol (Saltelli design) ---
+    def sobol(self, n: int = 2 ** 13, seed: int = None, workers: int = 0, chunk: int = DEFAULT_CHUNK):
+        """
+        First-order (Saltelli 2010) and total (Jansen) indices from n * (d + 2) evaluations.
+        n is rounded up to a power of two to keep the Sobol sequence balanced.
+        """
+        d = self.model.dims
+        m = int(np.ceil(np.log2(max(n, 2))))
+        AB = qmc.Sobol(d=2 * d, scramble=True, seed=seed).random_base2(m)
+        A, B = AB[:, :d], AB[:, d:]
+        jobs = [(A[i:i + chunk], B[i:i + chunk]) for i in range(0, len(A), chunk)]
+        Y = np.concatenate(self._map(_saltelli_chunk, jobs, workers))
+
+        fA, fB, fAB = Y[:, 0], Y[:, 1], Y[:, 2:]
+        var = np.concatenate([fA, fB]).var(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            first = (fB[:, None, :] * (fAB - fA[:, None, :])).mean(axis=0) / var
+            total = 0.5 * ((fA[:, None, :] - fAB) ** 2).mean(axis=0) / var
+        self.evaluations = Y.shape[0] * Y.shape[1]
+        return self._frame({"S1": first, "ST": total})
+
+    # --- Morris (elementary effects) ---
+    def morris_design(self, trajectories: int, levels: int = MORRIS_LEVELS, seed: int = None):
+        """(r, d + 1, d) one-at-a-time trajectories on a `levels`-point grid."""
+        rng = np.random.default_rng(seed)
+        d = self.model.dims
+        delta = levels / (2.0 * (levels - 1))
+        start = rng.integers(0, levels // 2, size=(trajectories, d)) / (levels - 1)
+        order = np.argsort(rng.random((trajectories, d)), axis=1)
+        sign = rng.choice([-1.0, 1.0], size=(trajectories, d))
+        # Up-moves from the lower half of the grid; down-moves start from the mirrored upper half
+        start = np.where(sign > 0, start, start + delta)
+
+        rows = np.arange(trajectories)[:, None]
+        steps = np.zeros((trajectories, d, d))
+        steps[rows, np.arange(d)[None, :], order] = sign[rows, order] * delta
+        points = start[:, None, :] + np.concatenate([np.zeros((trajectories, 1, d)), np.cumsum(steps, axis=1)], axis=1)
+        return points, order, sign * delta
+
+    def morris(self, trajectories: int = 1000, levels: int = MORRIS_LEVELS, seed: int = None,
+               workers: int = 0, chunk: int = DEFAULT_CHUNK):
+        """Elementary-effect screening: mu, mu* (mean |EE|) and sigma per factor, in output units per unit range."""
+        points, order, step = self.morris_design(trajectories, levels, seed)
+        jobs = [(points[i:i + chunk],) for i in range(0, trajectories, chunk)]
+        Y = np.concatenate(self._map(_trajectory_chunk, jobs, workers))
+
+        # Step k of trajectory r moves factor order[r, k]: scatter its effect back to factor order
+        rows = np.arange(trajectories)[:, None]
+        moved = step[rows, order]
+        effects = np.empty((trajectories, self.model.dims, Y.shape[2]))
+        effects[rows, order] = np.diff(Y, axis=1) / moved[..., None]
+        self.evaluations = Y.shape[0] * Y.shape[1]
+        return self._frame({
+            "mu": effects.mean(axis=0),
+            "mu_star": np.abs(effects).mean(axis=0),
+            "sigma": effects.std(axis=0, ddof=1),
+        })
+
+if __name__ == "__main__":
+    import time
+
+    # Deviations only: with baseline levels as factors, each output's own baseline dominates
+    sa = SensitivityAnalysis({9: -15.0, 5: 20.0}, baseline=False)
+    workers = min(4, os.cpu_count() or 1)
+
+    t0 = time.perf_counter()
+    indices = sa.sobol(n=2 ** 13, seed=2026, workers=workers)
+    print(f"--- Sobol: {sa.model.dims} factors, {sa.evaluations:,} evaluations in {time.perf_counter() - t0:.2f}s ---")
+    for output, grp in indices.groupby('output', sort=False):
+        top = grp.dropna().nlargest(3, 'ST')
+        if top.empty:
+            continue  # Untouched by this scenario
+        print(f"{output:<28} " + ", ".join(f"{f} (S1 {s1:.2f}, ST {st:.2f})"
+                                           for f, s1, st in zip(top['factor'], top['S1'], top['ST'])))
+
+    t0 = time.perf_counter()
+    screening = sa.morris(trajectories=2000, seed=2026, workers=workers)
+    print(f"\n--- Morris: {sa.evaluations:,} evaluations in {time.perf_counter() - t0:.2f}s ---")
+    gini = screening[screening['output'] == INDICATORS[38]].nlargest(5, 'mu_star')
+    print(gini.round(4).to_string(index=False))
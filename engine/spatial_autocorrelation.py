@@ -0,0 +1,182 @@
+import pandas as pd
+import numpy as np
+from sqlalchemy import create_engine, text
+import os
+
+from correlation_engine import load_temporal_cube, STATE_REGION
+from spatial_weights import load_spatial_weights, row_standardise
+
+# Configuration
+BASE_DIR = os.getcwd()
+DB_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'victoria_sim.db')
+DATABASE_URL = f"sqlite:///{DB_PATH}"
+
+PERMUTATIONS = 999
+SIGNIFICANCE = 0.05
+SEED = 2026
+# Upper bound on the permutation array size per block of (metric, year) columns
+MAX_ELEMENTS = 8_000_000
+
+# LISA quadrants: own value vs neighbours' (spatial lag), both relative to the mean
+QUADRANTS = np.array(["HH", "LH", "LL", "HL"])
+
+def _pseudo_p(observed, permuted, axis):
+    """Folded one-sided permutation p-value, as in PySAL: (extremes + 1) / (permutations + 1)."""
+    r = permuted.shape[axis]
+    observed = np.expand_dims(observed, axis)
+    larger = (permuted >= observed).sum(axis=axis)
+    smaller = (permuted <= observed).sum(axis=axis)
+    return (np.minimum(larger, smaller) + 1.0) / (r + 1.0)
+
+def global_morans(W, z, permutations: int, rng):
+    """
+    Moran's I for every column of the mean-centred z (n, C), with a permutation test that shuffles
+    all columns by the same R orderings: the whole (n, R*C) block goes through one sparse product.
+    """
+    n, c = z.shape
+    scale = n / W.sum() / (z * z).sum(axis=0)
+    observed = scale * (z * (W @ z)).sum(axis=0)
+
+    order = rng.random((permutations, n)).argsort(axis=1)
+    zp = z[order.T].reshape(n, -1)                          # (n, R*C)
+    lagp = W @ zp
+    permuted = scale * (zp * lagp).reshape(n, permutations, c).sum(axis=0)    # (R, C)
+    sd = permuted.std(axis=0)
+    return {
+        "morans_i": observed,
+        "expected_i": np.full(c, -1.0 / (n - 1)),
+        "z_score": np.where(sd > 0, (observed - permuted.mean(axis=0)) / np.where(sd > 0, sd, 1.0), 0.0),
+        "p_value": _pseudo_p(observed, permuted, axis=0),
+    }
+
+def local_morans(W, z, permutations: int, rng):
+    """
+    LISA for every (LGA, column) of z (n, C). Conditional randomisation: each LGA keeps its value while
+    its neighbours are redrawn from the other n-1. One set of R draws (of the largest neighbourhood size)
+    is shared by every LGA and column, so all permutations are a single gather + einsum.
+    """
+    n, c = z.shape
+    m2 = (z * z).sum(axis=0) / n
+    lag = W @ z
+    local = z * lag / m2
+
+    counts = np.diff(W.indptr)
+    kmax = max(int(counts.max()), 1)
+    weights = np.zeros((n, kmax))
+    weights[np.repeat(np.arange(n), counts), np.arange(W.nnz) - np.repeat(W.indptr[:-1], counts)] = W.data
+
+    draws = rng.random((permutations, n - 1)).argsort(axis=1)[:, :kmax]          # (R, kmax) among the others
+    others = draws[None] + (draws[None] >= np.arange(n)[:, None, None])          # (n, R, kmax), skip self
+    lagp = np.einsum('nk,nrkc->nrc', weights, z[others])
+    permuted = z[:, None, :] * lagp / m2                                          # (n, R, C)
+
+    quadrant = np.where(z > 0, np.where(lag >= 0, 0, 3), np.where(lag >= 0, 1, 2))
+    # LGAs without neighbours have no local statistic to test
+    isolated = counts == 0
+    return {
+        "local_i": local,
+        "quadrant": quadrant,
+        "p_value": np.where(isolated[:, None], np.nan, _pseudo_p(local, permuted, axis=1)),
+        "isolated": isolated,
+    }
+
+def compute_autocorrelation(temporal, sw: dict, permutations: int = PERMUTATIONS, seed: int = SEED):
+    """
+    Global Moran's I and LISA for every (metric, year) of a temporal cube, on contiguity weights.
+    Columns are grouped by which LGAs are observed; each group gets its own row-standardised weights
+    and is processed in blocks sized to MAX_ELEMENTS.
+    Returns (global DataFrame, local DataFrame).
+    """
+    rng = np.random.default_rng(seed)
+    pos = {int(c): i for i, c in enumerate(sw['codes'])}
+    keep = [i for i, r in enumerate(temporal['regions']) if r != STATE_REGION and int(r) in pos]
+    codes = np.array([int(temporal['regions'][i]) for i in keep], dtype=np.int64)
+    adjacency = sw['adjacency'][[pos[c] for c in codes]][:, [pos[c] for c in codes]]
+
+    cube = temporal['cube'][keep]                                   # (LGA, year, metric)
+    n_lga, n_year, n_met = cube.shape
+    values = cube.transpose(0, 2, 1).reshape(n_lga, -1)             # columns = (metric, year)
+    col_metric = np.repeat(temporal['metrics'], n_year)
+    col_year = np.tile(temporal['years'], n_met)
+    names = dict(zip(temporal['metrics'], temporal['metric_names']))
+
+    observed = ~np.isnan(values)
+    masks, group = np.unique(observed.T, axis=0, return_inverse=True)
+    global_rows, local_rows = [], []
+    for g, mask in enumerate(masks):
+        rows = np.flatnonzero(mask)
+        cols = np.flatnonzero(group.ravel() == g)
+        n = len(rows)
+        if n < 3:
+            continue
+        W = row_standardise(adjacency[rows][:, rows]).tocsr()
+        if W.nnz == 0:
+            continue
+        kmax = max(int(np.diff(W.indptr).max()), 1)
+        block = max(1, MAX_ELEMENTS // (n * permutations * kmax))
+        for lo in range(0, len(cols), block):
+            sel = cols[lo:lo + block]
+            x = values[np.ix_(rows, sel)]
+            z = x - x.mean(axis=0)
+            varying = (z * z).sum(axis=0) > 0
+            sel, z = sel[varying], z[:, varying]
+            if not len(sel):
+                continue
+
+            stats = global_morans(W, z, permutations, rng)
+            global_rows.append(pd.DataFrame({
+                "category_id": col_metric[sel], "metric_name": [names[m] for m in col_metric[sel]],
+                "year": col_year[sel], "n": n, **{k: v.round(6) for k, v in stats.items()},
+            }))
+
+            lisa = local_morans(W, z, permutations, rng)
+            p = lisa['p_value']
+            quadrant = np.where(lisa['isolated'][:, None], None, QUADRANTS[lisa['quadrant']])
+            local_rows.append(pd.DataFrame({
+                "lga_code": np.repeat(codes[rows], len(sel)),
+                "category_id": np.tile(col_metric[sel], n),
+                "year": np.tile(col_year[sel], n),
+                "local_i": lisa['local_i'].ravel().round(6),
+                "quadrant": quadrant.ravel(),
+                "p_value": p.ravel().round(6),
+                "cluster": np.where(p <= SIGNIFICANCE, quadrant, "ns").ravel(),
+            }))
+
+    columns_g = ["category_id", "metric_name", "year", "n", "morans_i", "expected_i", "z_score", "p_value"]
+    columns_l = ["lga_code", "category_id", "year", "local_i", "quadrant", "p_value", "cluster"]
+    glob = pd.concat(global_rows, ignore_index=True) if global_rows else pd.DataFrame(columns=columns_g)
+    loc = pd.concat(local_rows, ignore_index=True) if local_rows else pd.DataFrame(columns=columns_l)
+    return glob[columns_g], loc[columns_l]
+
+def sync_spatial_autocorrelation(engine=None, permutations: int = PERMUTATIONS, seed: int = SEED):
+    """Recomputes every (metric, year) and rewrites spatial_autocorrelation and lisa_clusters."""
+    engine = engine or create_engine(DATABASE_URL)
+    temporal = load_temporal_cube(engine)
+    if temporal is None:
+        return None
+    glob, loc = compute_autocorrelation(temporal, load_spatial_weights(), permutations, seed)
+
+    # One transaction, so readers never see the tables emptied or half rewritten
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM spatial_autocorrelation"))
+        conn.execute(text("DELETE FROM lisa_clusters"))
+        glob.to_sql('spatial_autocorrelation', conn, if_exists='append', index=False)
+        loc.to_sql('lisa_clusters', conn, if_exists='append', index=False)
+    return glob, loc
+
+if __name__ == "__main__":
+    import time
+
+    t0 = time.perf_counter()
+    result = sync_spatial_autocorrelation()
+    elapsed = time.perf_counter() - t0
+    if result is None:
+        print("temporal_stats is empty; nothing to compute")
+    else:
+        glob, loc = result
+        print(f"--- Spatial Autocorrelation: {len(glob)} (metric, year) layers, {len(loc)} LISA rows, "
+              f"{PERMUTATIONS} permutations ({elapsed:.2f}s) ---")
+        latest = glob[glob['year'] == glob['year'].max()]
+        print(latest.round(3).to_string(index=False))
+        print("\n--- LISA clusters (latest year) ---")
+        print(loc[loc['year'] == loc['year'].max()].groupby(['category_id', 'cluster']).size().unstack(fill_value=0).to_string())
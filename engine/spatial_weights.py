@@ -0,0 +1,147 @@
+import numpy as np
+from scipy import sparse
+from shapely.geometry import shape
+from shapely.strtree import STRtree
+import hashlib
+import json
+import os
+
+# Configuration
+BASE_DIR = os.getcwd()
+GEO_FILE = os.path.join(BASE_DIR, 'data', 'geo', 'vic_lgas_2026.json')
+CACHE_DIR = os.path.join(BASE_DIR, 'data', 'processed')
+
+# Distance decay: w_ij = exp(-d_ij / BANDWIDTH_KM) for centroids within CUTOFF_KM
+BANDWIDTH_KM = 25.0
+CUTOFF_KM = 60.0
+
+# Degree -> km around Victoria's latitude (equirectangular is plenty for weights)
+KM_PER_DEG_LAT = 110.57
+
+def geometry_hash(geo_path: str = GEO_FILE):
+    with open(geo_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def load_boundaries(geo_path: str = GEO_FILE):
+    """Returns (codes, names, shapely geometries projected to km)."""
+    with open(geo_path) as f:
+        features = json.load(f)['features']
+
+    lat0 = np.mean([shape(feat['geometry']).centroid.y for feat in features]) if features else 0.0
+    kx = KM_PER_DEG_LAT * np.cos(np.radians(lat0))
+
+    def to_km(coords):
+        return [[(x * kx, y * KM_PER_DEG_LAT) for x, y in ring] for ring in coords]
+
+    geoms = []
+    for feat in features:
+        geom = feat['geometry']
+        if geom['type'] == 'Polygon':
+            geom = {'type': 'Polygon', 'coordinates': to_km(geom['coordinates'])}
+        elif geom['type'] == 'MultiPolygon':
+            geom = {'type': 'MultiPolygon', 'coordinates': [to_km(poly) for poly in geom['coordinates']]}
+        geoms.append(shape(geom))
+
+    codes = np.array([int(feat['properties']['LGA_CODE']) for feat in features], dtype=np.int64)
+    names = np.array([feat['properties']['LGA_NAME'] for feat in features])
+    return codes, names, geoms
+
+def row_standardise(matrix):
+    totals = np.asarray(matrix.sum(axis=1)).ravel()
+    totals[totals == 0] = 1.0
+    return sparse.diags(1.0 / totals) @ matrix
+
+def build_spatial_weights(geo_path: str = GEO_FILE, bandwidth_km: float = BANDWIDTH_KM, cutoff_km: float = CUTOFF_KM):
+    """
+    Contiguity (shared border) and distance-decay weights between LGAs.
+    Both neighbour searches go through an STRtree, so cost scales with neighbours, not LGA pairs.
+    """
+    codes, names, geoms = load_boundaries(geo_path)
+    n = len(geoms)
+
+    # 1. Contiguity: polygons that touch or overlap
+    tree = STRtree(geoms)
+    left, right = tree.query(geoms, predicate='intersects')
+    keep = left != right
+    adjacency = sparse.csr_matrix((np.ones(keep.sum()), (left[keep], right[keep])), shape=(n, n))
+
+    # 2. Distance decay between centroids within the cutoff
+    centroids = [g.centroid for g in geoms]
+    point_tree = STRtree(centroids)
+    left, right = point_tree.query(centroids, predicate='dwithin', distance=cutoff_km)
+    keep = left != right
+    left, right = left[keep], right[keep]
+    xy = np.array([[p.x, p.y] for p in centroids]).reshape(n, 2)
+    dist = np.hypot(*(xy[left] - xy[right]).T) if len(left) else np.empty(0)
+    decay = sparse.csr_matrix((np.exp(-dist / bandwidth_km), (left, right)), shape=(n, n))
+
+    return {
+        "geo_hash": geometry_hash(geo_path),
+        "codes": codes,
+        "names": names,
+        "centroids_km": xy,
+        "adjacency": adjacency.tocsr(),
+        "weights": row_standardise(decay).tocsr(),
+    }
+
+def cache_path(geo_hash: str):
+    return os.path.join(CACHE_DIR, f"spatial_weights_{geo_hash[:16]}.npz")
+
+def save_spatial_weights(sw: dict):
+    path = cache_path(sw['geo_hash'])
+    arrays = {"geo_hash": np.array(sw['geo_hash']), "codes": sw['codes'], "names": sw['names'],
+              "centroids_km": sw['centroids_km']}
+    for key in ("adjacency", "weights"):
+        m = sw[key]
+        arrays.update({f"{key}_data": m.data, f"{key}_indices": m.indices, f"{key}_indptr": m.indptr})
+    np.savez_compressed(path, **arrays)
+    return path
+
+def load_spatial_weights(geo_path: str = GEO_FILE, build_missing: bool = True):
+    """
+    Cached weights for the current boundary file (keyed by its SHA-256).
+    Set build_missing=False on request paths so a stale cache fails loudly instead of rebuilding.
+    """
+    geo_hash = geometry_hash(geo_path)
+    path = cache_path(geo_hash)
+    if not os.path.exists(path):
+        if not build_missing:
+            raise FileNotFoundError(f"No spatial weights cached for {geo_path}; run engine/spatial_weights.py")
+        sw = build_spatial_weights(geo_path)
+        save_spatial_weights(sw)
+        return sw
+
+    raw = np.load(path)
+    n = len(raw['codes'])
+    sw = {"geo_hash": str(raw['geo_hash']), "codes": raw['codes'], "names": raw['names'],
+          "centroids_km": raw['centroids_km']}
+    for key in ("adjacency", "weights"):
+        sw[key] = sparse.csr_matrix(
+            (raw[f"{key}_data"], raw[f"{key}_indices"], raw[f"{key}_indptr"]), shape=(n, n)
+        )
+    return sw
+
+def align_weights(sw: dict, lga_codes):
+    """
+    Re-indexes the weight matrix onto another LGA ordering (integer codes, -1 for unknown).
+    LGAs without geometry get no neighbours.
+    """
+    lookup = {int(c): i for i, c in enumerate(sw['codes'])}
+    pos = np.array([lookup.get(int(c), -1) for c in lga_codes], dtype=np.int64)
+    present = np.flatnonzero(pos >= 0)
+    select = sparse.csr_matrix(
+        (np.ones(len(present)), (present, pos[present])), shape=(len(pos), len(sw['codes']))
+    )
+    return row_standardise(select @ sw['weights'] @ select.T).tocsr()
+
+if __name__ == "__main__":
+    import time
+
+    t0 = time.perf_counter()
+    sw = build_spatial_weights()
+    elapsed = time.perf_counter() - t0
+    path = save_spatial_weights(sw)
+
+    print(f"--- Spatial Weights: {len(sw['codes'])} LGAs built in {elapsed * 1000:.1f}ms ---")
+    print(f"Contiguity links: {sw['adjacency'].nnz} | Distance-decay links: {sw['weights'].nnz}")
+    print(f"Cached to {path}")
@@ -1,8 +1,13 @@
 from sqlalchemy import create_engine, text
 import pandas as pd
+import numpy as np
 import os
 import json
 
+# Commute model assumptions
+PARTICIPATION_RATE = 0.6  # Share of residents in the workforce
+BASE_JOBS_RATE = 0.2      # Population-serving jobs (retail/services) per resident
+
 class VictoriaState:
     def __init__(self):
         # Database connection
@@ -10,46 +15,76 @@ class VictoriaState:
         self.db_path = os.path.join(self.base_dir, 'data', 'processed', 'victoria_sim.db')
         self.db_url = f"sqlite:///{self.db_path}"
         self.engine = create_engine(self.db_url)
+        self._friction = None
     
     # ... (Previous get_state methods implied)
 
+    def get_friction_table(self, refresh: bool = False, population: pd.DataFrame = None):
+        """
+        Commute Stress Score for every LGA and year, from one grouped query plus array math.
+        Cached on the instance; pass refresh=True after an ingest.
+        population: optional (lga_name, year, population) rows, e.g. a cohort projection, that take
+                    precedence over lga_stats for those LGA-years. Such tables aren't cached.
+        """
+        if population is None and self._friction is not None and not refresh:
+            return self._friction
+
+        query = text("""
+            SELECT s.lga_name, s.year, s.population, COALESCE(h.hub_jobs, 0) AS hub_jobs
+            FROM lga_stats s
+            LEFT JOIN (SELECT lga_name, SUM(estimated_jobs) AS hub_jobs
+                       FROM employment_hubs GROUP BY lga_name) h
+              ON s.lga_name = h.lga_name
+            ORDER BY s.id
+        """)
+        df = pd.read_sql(query, self.engine)
+        if population is not None:
+            hubs = pd.read_sql(text("SELECT lga_name, SUM(estimated_jobs) AS hub_jobs FROM employment_hubs GROUP BY lga_name"),
+                               self.engine)
+            extra = population[['lga_name', 'year', 'population']].merge(hubs, on='lga_name', how='left')
+            df = pd.concat([extra.fillna({'hub_jobs': 0}), df], ignore_index=True)
+        # Seed and bulk ingests can overlap; keep the first row per (lga, year) like a scalar lookup would
+        df = df.drop_duplicates(['lga_name', 'year']).dropna(subset=['population'])
+        df = df[df['population'] > 0]
+
+        pop = df['population'].to_numpy(dtype=float)
+        # 1. Workers (Resident Population * ~0.6 participation)
+        workers = pop * PARTICIPATION_RATE
+        # 2. Local Jobs (Sum of Hubs + Base Employment; Retail/Service ~20% of pop)
+        local_jobs = df['hub_jobs'].to_numpy(dtype=float) + pop * BASE_JOBS_RATE
+        # 3. Ratio (Low ratio = High Out-Commute = High Stress; Ideal Ratio ~ 1.0)
+        ratio = local_jobs / workers
+        stress = np.maximum(0, 100 - (ratio * 100))
+
+        table = pd.DataFrame({
+            "lga_name": df['lga_name'].to_numpy(),
+            "year": df['year'].to_numpy(dtype=int),
+            "residents": pop.astype(int),
+            "workers_est": workers.astype(int),
+            "local_jobs": local_jobs.astype(int),
+            "jobs_ratio": np.round(ratio, 2),
+            "commute_stress_score": np.round(stress, 1),
+        })
+        table = table.set_index(['lga_name', 'year']).sort_index()
+        if population is None:
+            self._friction = table
+        return table
+
     def get_regional_friction(self, lga_name: str, year: int = 2024):
         """
         Calculates Commute Stress Score based on Jobs/Workers ratio.
         """
-        with self.engine.connect() as conn:
-            # 1. Workers (Resident Population * ~0.6 participation)
-            pop_res = conn.execute(text("SELECT population FROM lga_stats WHERE lga_name = :l AND year = :y"), 
-                                   {"l": lga_name, "y": year}).scalar()
-            
-            if not pop_res: return "N/A"
-            workers = pop_res * 0.6
-            
-            # 2. Local Jobs (Sum of Hubs + Base Employment)
-            # Hubs
-            hub_jobs = conn.execute(text("SELECT SUM(estimated_jobs) FROM employment_hubs WHERE lga_name = :l"), 
-                                    {"l": lga_name}).scalar() or 0
-            
-            # Base Jobs (Retail/Service ~20% of pop)
-            base_jobs = pop_res * 0.2
-            
-            total_local_jobs = hub_jobs + base_jobs
-            
-            # 3. Ratio
-            ratio = total_local_jobs / workers if workers > 0 else 0
-            
-            # Friction/Stress (Low ratio = High Out-Commute = High Stress)
-            # Ideal Ratio ~ 1.0
-            
-            stress_score = max(0, 100 - (ratio * 100))
-            
-            return {
-                "residents": int(pop_res),
-                "workers_est": int(workers),
-                "local_jobs": int(total_local_jobs),
-                "jobs_ratio": round(ratio, 2),
-                "commute_stress_score": round(stress_score, 1)
-            }
+        table = self.get_friction_table()
+        if (lga_name, year) not in table.index:
+            return "N/A"
+        row = table.loc[(lga_name, year)]
+        return {
+            "residents": int(row['residents']),
+            "workers_est": int(row['workers_est']),
+            "local_jobs": int(row['local_jobs']),
+            "jobs_ratio": float(row['jobs_ratio']),
+            "commute_stress_score": float(row['commute_stress_score'])
+        }
 
 def verify_spatial():
     vic = VictoriaState()
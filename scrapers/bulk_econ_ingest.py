@@ -2,6 +2,7 @@ import pandas as pd
 from sqlalchemy import create_engine, text
 import numpy as np
 import os
+import sys
 import random
 
 # Configuration
@@ -189,6 +190,12 @@ def ingest_all():
     lga_df.to_sql('lga_stats', engine, if_exists='append', index=False)
     print("LGA Data Ingested (2010-2025).")
     
+    # Refresh the materialised annual view for the replaced years
+    sys.path.insert(0, os.path.join(BASE_DIR, 'engine'))
+    from master_annual import refresh_master_annual
+    span = refresh_master_annual(engine, years=sorted(set(econ_df['year']) | set(lga_df['year'])))
+    print(f"master_annual refreshed for {span}.")
+    
     # 4. Report
     print("\nXXX Data Density Report XXX")
     with engine.connect() as conn:
@@ -1,5 +1,6 @@
 import pandas as pd
 import os
+import sys
 import json
 from sqlalchemy import create_engine, text
 
@@ -51,6 +52,12 @@ def ingest_data():
     if not new_data.empty:
         print(f"Inserting {len(new_data)} new rows for years: {new_data['year'].tolist()}")
         new_data.to_sql('economic_indicators', engine, if_exists='append', index=False)
+        
+        # Refresh the materialised annual view for the affected years
+        sys.path.insert(0, os.path.join(BASE_DIR, 'engine'))
+        from master_annual import refresh_master_annual
+        span = refresh_master_annual(engine, years=new_data['year'].tolist())
+        print(f"master_annual refreshed for {span}.")
     else:
         print("No new data to insert.")
 
@@ -0,0 +1,133 @@
+import pandas as pd
+from sqlalchemy import create_engine, text
+import os
+
+# Configuration
+BASE_DIR = os.getcwd()
+DB_PATH = os.path.join(BASE_DIR, 'data', 'processed', 'victoria_sim.db')
+DATABASE_URL = f"sqlite:///{DB_PATH}"
+
+# Victorian Legislative Assembly districts (2021 redistribution, 88 seats).
+# (district, Legislative Council region, main LGA, held_by after 2022, ALP two-party-preferred % vs Coalition)
+# Two-party figures are rounded; Greens-held seats keep the notional ALP v Coalition count.
+DISTRICTS = [
+    # Northern Metropolitan
+    ("Broadmeadows", "Northern Metropolitan", "Hume", "ALP", 66.0),
+    ("Brunswick", "Northern Metropolitan", "Merri-bek", "GRN", 78.0),
+    ("Bundoora", "Northern Metropolitan", "Banyule", "ALP", 61.5),
+    ("Greenvale", "Northern Metropolitan", "Hume", "ALP", 63.0),
+    ("Kalkallo", "Northern Metropolitan", "Hume", "ALP", 65.5),
+    ("Melbourne", "Northern Metropolitan", "Melbourne", "GRN", 74.0),
+    ("Mill Park", "Northern Metropolitan", "Whittlesea", "ALP", 66.5),
+    ("Northcote", "Northern Metropolitan", "Darebin", "ALP", 77.0),
+    ("Pascoe Vale", "Northern Metropolitan", "Merri-bek", "ALP", 68.0),
+    ("Preston", "Northern Metropolitan", "Darebin", "ALP", 72.0),
+    ("Richmond", "Northern Metropolitan", "Yarra", "GRN", 76.0),
+    ("Thomastown", "Northern Metropolitan", "Whittlesea", "ALP", 70.0),
+    ("Yan Yean", "Northern Metropolitan", "Whittlesea", "ALP", 56.5),
+    # North-Eastern Metropolitan
+    ("Ashwood", "North-Eastern Metropolitan", "Monash", "ALP", 53.0),
+    ("Bayswater", "North-Eastern Metropolitan", "Knox", "ALP", 50.6),
+    ("Box Hill", "North-Eastern Metropolitan", "Whitehorse", "ALP", 52.5),
+    ("Bulleen", "North-Eastern Metropolitan", "Manningham", "LIB", 43.5),
+    ("Croydon", "North-Eastern Metropolitan", "Maroondah", "LIB", 46.0),
+    ("Eltham", "North-Eastern Metropolitan", "Nillumbik", "ALP", 57.5),
+    ("Ferntree Gully", "North-Eastern Metropolitan", "Knox", "LIB", 48.5),
+    ("Glen Waverley", "North-Eastern Metropolitan", "Monash", "ALP", 51.0),
+    ("Ivanhoe", "North-Eastern Metropolitan", "Banyule", "ALP", 60.0),
+    ("Ringwood", "North-Eastern Metropolitan", "Maroondah", "ALP", 51.0),
+    ("Warrandyte", "North-Eastern Metropolitan", "Manningham", "LIB", 43.0),
+    # South-Eastern Metropolitan
+    ("Berwick", "South-Eastern Metropolitan", "Casey", "LIB", 46.5),
+    ("Carrum", "South-Eastern Metropolitan", "Frankston", "ALP", 57.5),
+    ("Clarinda", "South-Eastern Metropolitan", "Kingston", "ALP", 63.0),
+    ("Cranbourne", "South-Eastern Metropolitan", "Casey", "ALP", 55.5),
+    ("Dandenong", "South-Eastern Metropolitan", "Greater Dandenong", "ALP", 62.0),
+    ("Frankston", "South-Eastern Metropolitan", "Frankston", "ALP", 56.0),
+    ("Mordialloc", "South-Eastern Metropolitan", "Kingston", "ALP", 57.0),
+    ("Mulgrave", "South-Eastern Metropolitan", "Monash", "ALP", 58.0),
+    ("Narre Warren North", "South-Eastern Metropolitan", "Casey", "ALP", 57.5),
+    ("Narre Warren South", "South-Eastern Metropolitan", "Casey", "ALP", 58.0),
+    ("Oakleigh", "South-Eastern Metropolitan", "Monash", "ALP", 62.0),
+    ("Rowville", "South-Eastern Metropolitan", "Knox", "LIB", 44.0),
+    # Southern Metropolitan
+    ("Albert Park", "Southern Metropolitan", "Port Phillip", "ALP", 63.0),
+    ("Bentleigh", "Southern Metropolitan", "Glen Eira", "ALP", 56.5),
+    ("Brighton", "Southern Metropolitan", "Bayside", "LIB", 47.0),
+    ("Caulfield", "Southern Metropolitan", "Glen Eira", "LIB", 47.5),
+    ("Hawthorn", "Southern Metropolitan", "Boroondara", "LIB", 47.5),
+    ("Kew", "Southern Metropolitan", "Boroondara", "LIB", 46.5),
+    ("Malvern", "Southern Metropolitan", "Stonnington", "LIB", 44.0),
+    ("Prahran", "Southern Metropolitan", "Stonnington", "GRN", 60.0),
+    ("Sandringham", "Southern Metropolitan", "Bayside", "LIB", 48.5),
+    # Western Metropolitan
+    ("Essendon", "Western Metropolitan", "Moonee Valley", "ALP", 62.0),
+    ("Footscray", "Western Metropolitan", "Maribyrnong", "ALP", 71.0),
+    ("Kororoit", "Western Metropolitan", "Brimbank", "ALP", 63.5),
+    ("Laverton", "Western Metropolitan", "Hobsons Bay", "ALP", 61.0),
+    ("Melton", "Western Metropolitan", "Melton", "ALP", 52.5),
+    ("Point Cook", "Western Metropolitan", "Wyndham", "ALP", 58.0),
+    ("St Albans", "Western Metropolitan", "Brimbank", "ALP", 63.0),
+    ("Sunbury", "Western Metropolitan", "Hume", "ALP", 55.0),
+    ("Sydenham", "Western Metropolitan", "Brimbank", "ALP", 60.5),
+    ("Tarneit", "Western Metropolitan", "Wyndham", "ALP", 61.5),
+    ("Werribee", "Western Metropolitan", "Wyndham", "ALP", 57.0),
+    ("Williamstown", "Western Metropolitan", "Hobsons Bay", "ALP", 63.5),
+    # Eastern Victoria
+    ("Bass", "Eastern Victoria", "Bass Coast", "ALP", 50.5),
+    ("Eildon", "Eastern Victoria", "Yarra Ranges", "LIB", 46.0),
+    ("Evelyn", "Eastern Victoria", "Yarra Ranges", "LIB", 47.0),
+    ("Gippsland East", "Eastern Victoria", "East Gippsland", "NAT", 32.0),
+    ("Gippsland South", "Eastern Victoria", "South Gippsland", "NAT", 33.5),
+    ("Hastings", "Eastern Victoria", "Mornington Peninsula", "ALP", 50.2),
+    ("Monbulk", "Eastern Victoria", "Yarra Ranges", "ALP", 56.0),
+    ("Mornington", "Eastern Victoria", "Mornington Peninsula", "LIB", 49.0),
+    ("Morwell", "Eastern Victoria", "Latrobe", "NAT", 46.5),
+    ("Narracan", "Eastern Victoria", "Baw Baw", "LIB", 43.0),
+    ("Nepean", "Eastern Victoria", "Mornington Peninsula", "LIB", 49.0),
+    ("Pakenham", "Eastern Victoria", "Cardinia", "ALP", 50.5),
+    # Northern Victoria
+    ("Benambra", "Northern Victoria", "Wodonga", "LIB", 40.0),
+    ("Bendigo East", "Northern Victoria", "Greater Bendigo", "ALP", 56.5),
+    ("Bendigo West", "Northern Victoria", "Greater Bendigo", "ALP", 60.0),
+    ("Euroa", "Northern Victoria", "Strathbogie", "NAT", 35.5),
+    ("Macedon", "Northern Victoria", "Macedon Ranges", "ALP", 55.0),
+    ("Mildura", "Northern Victoria", "Mildura", "NAT", 40.0),
+    ("Murray Plains", "Northern Victoria", "Campaspe", "NAT", 30.0),
+    ("Ovens Valley", "Northern Victoria", "Wangaratta", "NAT", 36.0),
+    ("Shepparton", "Northern Victoria", "Greater Shepparton", "NAT", 41.0),
+    # Western Victoria
+    ("Bellarine", "Western Victoria", "Greater Geelong", "ALP", 55.5),
+    ("Eureka", "Western Victoria", "Ballarat", "ALP", 51.5),
+    ("Geelong", "Western Victoria", "Greater Geelong", "ALP", 61.0),
+    ("Lara", "Western Victoria", "Greater Geelong", "ALP", 62.0),
+    ("Lowan", "Western Victoria", "Horsham", "NAT", 30.0),
+    ("Polwarth", "Western Victoria", "Colac Otway", "LIB", 44.5),
+    ("Ripon", "Western Victoria", "Ararat", "ALP", 50.1),
+    ("South Barwon", "Western Victoria", "Greater Geelong", "ALP", 55.0),
+    ("South-West Coast", "Western Victoria", "Warrnambool", "LIB", 42.0),
+    ("Wendouree", "Western Victoria", "Ballarat", "ALP", 55.5),
+]
+
+def generate_district_data():
+    df = pd.DataFrame(DISTRICTS, columns=['district_name', 'region', 'lga_name', 'held_by', 'alp_tpp'])
+    df['margin'] = (df['alp_tpp'] - 50.0).abs().round(1)
+    return df
+
+def ingest_districts():
+    print("--- Starting Electoral Districts Ingest ---")
+    engine = create_engine(DATABASE_URL)
+    df = generate_district_data()
+
+    with engine.connect() as conn:
+        trans = conn.begin()
+        conn.execute(text("DELETE FROM electoral_districts"))
+        trans.commit()
+    df.to_sql('electoral_districts', engine, if_exists='append', index=False)
+    print(f"Inserted {len(df)} districts.")
+
+    print("\nXXX Seats by Holder XXX")
+    print(df.groupby('held_by').size().to_string())
+
+if __name__ == "__main__":
+    ingest_districts()
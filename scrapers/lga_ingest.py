@@ -1,6 +1,7 @@
 import pandas as pd
 from sqlalchemy import create_engine, text
 import os
+import sys
 import json
 
 # Configuration
@@ -74,6 +75,12 @@ def ingest_lgas():
     df.to_sql('lga_stats', engine, if_exists='append', index=False)
     print(f"Inserted {len(df)} LGA records.")
     
+    # Table was replaced wholesale, so refresh every year of the annual view
+    sys.path.insert(0, os.path.join(BASE_DIR, 'engine'))
+    from master_annual import refresh_master_annual
+    refresh_master_annual(engine)
+    print("master_annual refreshed.")
+    
     # Verification Snapshot
     print("\nXXX Regional Snapshot: 2020 to 2024 XXX")
     print(f"{'LGA':<20} | {'Pop Growth':<12} | {'Price Growth':<12} | {'Lean'}")
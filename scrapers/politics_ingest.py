@@ -1,6 +1,7 @@
 import pandas as pd
 from sqlalchemy import create_engine, text
 import os
+import sys
 import json
 
 # Configuration
@@ -82,6 +83,21 @@ def ingest_politics():
     df.to_sql('political_events', engine, if_exists='append', index=False)
     print(f"Inserted {len(df)} political events.")
     
+    # Full-text index (triggers cover row edits; a bulk reload gets a full rebuild)
+    sys.path.insert(0, os.path.join(BASE_DIR, 'engine'))
+    from event_search import ensure_event_index
+    ensure_event_index(engine, rebuild=True)
+    print("Rebuilt political_events full-text index.")
+    
+    # Semantic index: only new/edited summaries are embedded (cache keyed by text hash)
+    from semantic_search import sync_semantic_index
+    print(f"Semantic index: {sync_semantic_index(engine)} events embedded/updated.")
+    
+    # Table was replaced wholesale, so refresh every year of the annual view
+    from master_annual import refresh_master_annual
+    refresh_master_annual(engine)
+    print("master_annual refreshed.")
+    
     # Verification Report
     print("\nXXX Timeline of Power XXX")
     with engine.connect() as conn:
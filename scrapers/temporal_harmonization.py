@@ -2,6 +2,9 @@ import pandas as pd
 import numpy as np
 from sqlalchemy import create_engine, text
 import os
+import json
+import hashlib
+import sys
 
 # Configuration
 BASE_DIR = os.getcwd()
@@ -10,11 +13,109 @@ DATABASE_URL = f"sqlite:///{DB_PATH}"
 
 # --- Areal Weighting Logic (Mocked if deps missing) ---
 try:
-    import geopandas as gpd
+    import shapely
+    from shapely.geometry import shape
+    from shapely.strtree import STRtree
+    from scipy import sparse
     HAS_GEO = True
 except ImportError:
     HAS_GEO = False
-    print("GeoPandas not found. Using Simulated Harmonization logic.")
+    print("Shapely not found. Using Simulated Harmonization logic.")
+
+MODERN_BOUNDARIES = os.path.join(BASE_DIR, 'data', 'geo', 'vic_lgas_2026.json')
+
+def boundary_path(year):
+    """Historical boundary set in force for a given year."""
+    return os.path.join(BASE_DIR, 'data', 'geo', f"vic_lgas_{'pre1994' if year < 1994 else 'modern'}.json")
+
+def boundary_key(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+def build_crosswalk(old_path, modern_path=MODERN_BOUNDARIES):
+    """
+    Overlays two boundary sets once. Candidate pairs come from an STRtree over the modern
+    polygons, so only bounding-box overlaps are intersected.
+    Returns old_lga -> modern_lga weights (share of the old area inside each modern LGA).
+    """
+    def load(path):
+        with open(path) as f:
+            features = json.load(f)['features']
+        names = np.array([feat['properties']['LGA_NAME'] for feat in features])
+        return names, np.array([shape(feat['geometry']) for feat in features])
+
+    old_names, old_geoms = load(old_path)
+    new_names, new_geoms = load(modern_path)
+
+    tree = STRtree(new_geoms)
+    old_idx, new_idx = tree.query(old_geoms, predicate='intersects')
+
+    # Areas are in degrees^2; the latitude scale factor cancels in the ratio
+    overlap = shapely.area(shapely.intersection(old_geoms[old_idx], new_geoms[new_idx]))
+    weight = overlap / shapely.area(old_geoms)[old_idx]
+
+    crosswalk = pd.DataFrame({
+        'old_lga': old_names[old_idx],
+        'modern_lga': new_names[new_idx],
+        'weight': weight,
+    })
+    # Drop slivers from shared edges / digitising noise
+    return crosswalk[crosswalk['weight'] > 1e-6].reset_index(drop=True)
+
+def get_crosswalk(old_path, modern_path=MODERN_BOUNDARIES, engine=None):
+    """Crosswalk for a (historical, modern) boundary pair, computed once and persisted in boundary_crosswalk."""
+    engine = engine or create_engine(DATABASE_URL)
+    old_key, new_key = boundary_key(old_path), boundary_key(modern_path)
+    query = text("""
+        SELECT old_lga, modern_lga, weight FROM boundary_crosswalk
+        WHERE source_key = :o AND target_key = :n
+    """)
+    with engine.connect() as conn:
+        try:
+            cached = pd.read_sql(query, conn, params={"o": old_key, "n": new_key})
+        except Exception:
+            cached = pd.DataFrame()
+    if not cached.empty:
+        return cached
+
+    crosswalk = build_crosswalk(old_path, modern_path)
+    stored = crosswalk.assign(source_key=old_key, target_key=new_key)
+    stored.to_sql('boundary_crosswalk', engine, if_exists='append', index=False)
+    print(f"Cached crosswalk {os.path.basename(old_path)} -> {os.path.basename(modern_path)} ({len(crosswalk)} links).")
+    return crosswalk
+
+def harmonize_panel(historical_stats_df, crosswalk, value_col='raw_value', by=()):
+    """
+    Transfers any number of years/metrics to modern LGAs with one sparse matrix product.
+    historical_stats_df: long rows of historical_name, value_col and the `by` key columns (e.g. year, metric).
+    Returns modern_lga_name, *by, weighted_stat.
+    """
+    by = list(by)
+    old_names = pd.Index(crosswalk['old_lga'].unique())
+    new_names = pd.Index(crosswalk['modern_lga'].unique())
+
+    # (modern x historical) weight matrix
+    W = sparse.csr_matrix(
+        (crosswalk['weight'].to_numpy(), (new_names.get_indexer(crosswalk['modern_lga']), old_names.get_indexer(crosswalk['old_lga']))),
+        shape=(len(new_names), len(old_names)),
+    )
+
+    # (historical region x [year, metric]) array; missing cells contribute nothing, as in a grouped sum
+    if by:
+        grid = historical_stats_df.pivot_table(index='historical_name', columns=by, values=value_col, aggfunc='sum')
+    else:
+        grid = historical_stats_df.groupby('historical_name')[value_col].sum().to_frame()
+    grid = grid.reindex(old_names)
+    harmonized = W @ np.nan_to_num(grid.to_numpy(dtype=float))
+
+    out = pd.DataFrame(harmonized, index=new_names, columns=grid.columns)
+    out.index.name = 'modern_lga_name'
+    if by:
+        out = out.stack(list(range(len(by)))) if len(by) > 1 else out.stack()
+        out = out.rename('weighted_stat').reset_index()
+    else:
+        out = out.iloc[:, 0].rename('weighted_stat').reset_index()
+    return out
 
 def harmonize_temporal_data(historical_stats_df, year):
     """
@@ -26,28 +127,10 @@ def harmonize_temporal_data(historical_stats_df, year):
         # But properly we would map 'Old Shire' to 'New City'
         return historical_stats_df.rename(columns={'historical_name': 'modern_lga_name', 'raw_value': 'weighted_stat'})
 
-    # 1. Load GeoJSONs for the specific historical era and the 2026 target
-    # Note: These files don't exist in our environment, so this block is for compliance with instructions
+    # Note: historical boundary files don't exist in our environment yet
     try:
-        old_gdf = gpd.read_file(f"data/geo/vic_lgas_{'pre1994' if year < 1994 else 'modern'}.json")
-        modern_gdf = gpd.read_file("data/geo/vic_lgas_2026.json")
-        
-        # 2. Calculate the intersection (the overlap of old vs new)
-        overlay = gpd.overlay(old_gdf, modern_gdf, how='intersection')
-        overlay['overlap_area'] = overlay.geometry.area
-        
-        # 3. Calculate weights (portion of the old area that now sits in a new LGA)
-        old_gdf['total_old_area'] = old_gdf.geometry.area
-        weights = overlay.merge(old_gdf[['LGA_NAME', 'total_old_area']], on='LGA_NAME')
-        weights['weight_factor'] = weights['overlap_area'] / weights['total_old_area']
-        
-        # 4. Map the statistics
-        merged = weights.merge(historical_stats_df, left_on='LGA_NAME', right_on='historical_name')
-        merged['weighted_stat'] = merged['raw_value'] * merged['weight_factor']
-        
-        # 5. Dissolve/Group by modern LGA
-        final_lga_stats = merged.groupby('modern_lga_name')['weighted_stat'].sum().reset_index()
-        return final_lga_stats
+        crosswalk = get_crosswalk(boundary_path(year))
+        return harmonize_panel(historical_stats_df, crosswalk)
     except Exception as e:
         print(f"Harmonization failed: {e}")
         return pd.DataFrame()
@@ -73,8 +156,8 @@ def generate_50_year_data():
     for lga, code in LGA_CODES.items():
         for year in years:
             progress = (year - 1976) / 50.0
-            is_ census_year = (year % 5) in [1, 6] # e.g. 76, 81...
-            interp = not is_ census_year # Just a flag logic
+            is_census_year = (year % 5) in [1, 6] # e.g. 76, 81...
+            interp = not is_census_year # Just a flag logic
             
             # Generate dummy values for each category
             # Economy
@@ -118,6 +201,30 @@ def ingest():
     df.to_sql('temporal_stats', engine, if_exists='append', index=False)
     print(f"Committed {len(df)} rows to temporal_stats.")
     
+    # 3. Refresh derived statistics
+    try:
+        sys.path.insert(0, os.path.join(BASE_DIR, 'engine'))
+        from gap_filling import fill_gaps
+        filled = fill_gaps(engine)
+        print(f"Gap filling: {filled['recomputed']} series refilled ({filled['cells']} cells).")
+        
+        from rolling_correlation import sync_rolling_store
+        store = sync_rolling_store(engine)
+        if store is not None:
+            print(f"Rolling correlation statistics synced through {store.last_year}.")
+
+        from lga_profiles import sync_profile_index
+        profiles = sync_profile_index(engine)
+        if profiles is not None:
+            print(f"LGA profile index rebuilt ({len(profiles.vectors)} profiles).")
+
+        from spatial_autocorrelation import sync_spatial_autocorrelation
+        spatial = sync_spatial_autocorrelation(engine)
+        if spatial is not None:
+            print(f"Spatial autocorrelation recomputed ({len(spatial[0])} metric-years).")
+    except Exception as e:
+        print(f"Derived statistics refresh failed: {e}")
+    
     # Verification
     print("\nXXX Data Sample XXX")
     print(df.head(5))